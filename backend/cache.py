@@ -0,0 +1,156 @@
+"""In-process caching primitives shared by the backend."""
+
+from collections import OrderedDict
+import time
+
+
+class ByteLRU:
+    """LRU mapping bounded by entry count and by total payload bytes.
+
+    Entries may carry a TTL in seconds; expired entries are dropped when
+    they are next looked up or when :meth:`sweep` runs.
+    """
+
+    def __init__(self, max_bytes, max_entries=None, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.clock = clock
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self._live(key) is not None
+
+    def _live(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, expires_at = entry
+        if expires_at is not None and expires_at <= self.clock():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def get(self, key, default=None):
+        entry = self._live(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key, value, size, ttl=None):
+        """Store *value* accounted as *size* bytes, evicting LRU entries."""
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return False
+        expires_at = self.clock() + ttl if ttl is not None else None
+        self._entries[key] = (value, size, expires_at)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes or (
+            self.max_entries is not None and len(self._entries) > self.max_entries
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return True
+
+    def delete(self, key):
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def sweep(self):
+        """Drop every expired entry and return how many were removed."""
+        now = self.clock()
+        expired = [
+            key
+            for key, (_, _, expires_at) in self._entries.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+
+class MemoryCache:
+    """In-memory stand-in for the ``redis.asyncio`` client subset we use.
+
+    Used as a fallback when Redis is unreachable. Entries are evicted in LRU
+    order once either ``max_entries`` or ``max_bytes`` is exceeded, ``ex``
+    expiries are honoured, and expired entries are swept lazily at most once
+    per ``sweep_interval`` seconds.
+    """
+
+    # Rough per-entry bookkeeping cost on top of key and value lengths.
+    ENTRY_OVERHEAD = 64
+
+    def __init__(
+        self,
+        max_entries=10_000,
+        max_bytes=64 * 1024 * 1024,
+        sweep_interval=30.0,
+        clock=time.monotonic,
+    ):
+        self.store = ByteLRU(max_bytes, max_entries=max_entries, clock=clock)
+        self.sweep_interval = sweep_interval
+        self._last_sweep = clock()
+
+    def _maybe_sweep(self):
+        now = self.store.clock()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self.store.sweep()
+
+    async def get(self, key):
+        self._maybe_sweep()
+        return self.store.get(key)
+
+    async def mget(self, keys, *args):
+        self._maybe_sweep()
+        return [self.store.get(key) for key in [*keys, *args]]
+
+    async def set(self, key, value, ex=None, nx=False):
+        self._maybe_sweep()
+        if nx and key in self.store:
+            return None
+        size = len(key) + len(value) + self.ENTRY_OVERHEAD
+        self.store.set(key, value, size, ttl=ex)
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.store.delete(key) for key in keys)
+
+    async def ping(self):
+        return True
+
+    def stats(self):
+        """Return hit, miss, eviction and size counters."""
+        return {
+            "hits": self.store.hits,
+            "misses": self.store.misses,
+            "evictions": self.store.evictions,
+            "expirations": self.store.expirations,
+            "entries": len(self.store),
+            "bytes": self.store.total_bytes,
+        }
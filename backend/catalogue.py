@@ -0,0 +1,146 @@
+"""Process-wide, score-ordered word sets of every video, for scan-mode
+recommendations."""
+
+from array import array
+from collections import Counter
+import threading
+
+from sqlalchemy import select
+
+from backend.wordsets import decode
+
+class _Snapshot:
+    __slots__ = ("order", "offsets", "ranks", "rank_of", "rank_count")
+
+    def __init__(self, order, offsets, ranks, rank_of, rank_count):
+        # Video ids by descending score; the i-th one's ranks are
+        # ``ranks[offsets[i]:offsets[i + 1]]``.
+        self.order = order
+        self.offsets = offsets
+        self.ranks = ranks
+        # Rank of each word id; 0 for words in no video.
+        self.rank_of = rank_of
+        self.rank_count = rank_count
+
+
+_EMPTY = _Snapshot(array("I"), array("I", [0]), array("H"), array("I"), 0)
+
+
+class VideoCatalogue:
+    """Each video's distinct words, walked in descending ``score`` order.
+
+    Loaded from the encoded sets in ``video_word_sets``, one row per video.
+    Words are renumbered by rarity: rank 1 is the word found in the fewest
+    videos. Every video's ranks are stored sorted, back to back in one
+    array, so a video's rarest words come first. Rare words are the least
+    likely to be known, which means a video with too many unknown words is
+    usually rejected after its first few ranks. Ranks take two bytes each
+    while there are fewer than 65536 distinct words in videos.
+
+    :meth:`top` holds the caller's known words as a bitmap over ranks and
+    stops as soon as ``limit`` videos qualify. Its cost follows the number
+    of videos examined, not the catalogue size.
+
+    The catalogue is a snapshot labelled with the ``catalogue_version`` read
+    before it was loaded, so it is never older than its label. :meth:`ensure`
+    reloads it when asked for a later version; readers keep the snapshot
+    they started with.
+    """
+
+    def __init__(self, videos, video_stats, video_word_sets):
+        self.videos = videos
+        self.video_stats = video_stats
+        self.video_word_sets = video_word_sets
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.version = None
+            self._snapshot = _EMPTY
+
+    def __len__(self):
+        return len(self._snapshot.order)
+
+    def memory_bytes(self) -> int:
+        snap = self._snapshot
+        return sum(
+            a.itemsize * len(a)
+            for a in (snap.order, snap.offsets, snap.ranks, snap.rank_of)
+        )
+
+    def _current(self, version):
+        return self.version is not None and self.version >= version
+
+    def ensure(self, db, version):
+        """Load through ``db`` (a sync ``Session``) unless already at
+        ``version`` or later."""
+        if self._current(version):
+            return
+        with self._lock:
+            if not self._current(version):
+                self._snapshot = self._load(db.connection())
+                self.version = version
+
+    def _load(self, conn):
+        videos, stats, sets = self.videos, self.video_stats, self.video_word_sets
+        rows = conn.execute(
+            select(videos.c.id, sets.c.word_ids)
+            .join(stats, stats.c.video_id == videos.c.id)
+            .outerjoin(sets, sets.c.video_id == videos.c.id)
+            .order_by(videos.c.score.desc(), videos.c.id)
+        ).all()
+
+        frequencies = Counter()
+        for _, blob in rows:
+            if blob:
+                frequencies.update(decode(blob))
+        rank_of = array("I", [0]) * (max(frequencies, default=0) + 1)
+        for rank, word_id in enumerate(
+            sorted(frequencies, key=lambda w: (frequencies[w], w)), start=1
+        ):
+            rank_of[word_id] = rank
+
+        order = array("I")
+        offsets = array("I", [0])
+        ranks = array("H" if len(frequencies) <= 0xFFFF else "I")
+        lookup = rank_of.__getitem__
+        for video_id, blob in rows:
+            if blob:
+                ranks.extend(sorted(map(lookup, decode(blob))))
+            order.append(video_id)
+            offsets.append(len(ranks))
+        return _Snapshot(order, offsets, ranks, rank_of, len(frequencies))
+
+    def top(self, known_word_ids, limit: int, max_new_words: int):
+        """Return ``([(video_id, new_word_count)], videos_examined)``.
+
+        Videos come best scored first (ties by id) and have at most
+        ``max_new_words`` words outside ``known_word_ids``.
+        """
+        snap = self._snapshot
+        order, offsets, ranks = snap.order, snap.offsets, snap.ranks
+        rank_of = snap.rank_of
+        known = bytearray(snap.rank_count + 1)
+        for word_id in known_word_ids:
+            if word_id < len(rank_of):
+                known[rank_of[word_id]] = 1
+        # Words in no video land on rank 0, which no video contains.
+
+        found = []
+        examined = 0
+        if limit <= 0:
+            return found, examined
+        for i in range(len(order)):
+            examined += 1
+            unknown = 0
+            for rank in ranks[offsets[i]:offsets[i + 1]]:
+                if not known[rank]:
+                    unknown += 1
+                    if unknown > max_new_words:
+                        break
+            else:
+                found.append((order[i], unknown))
+                if len(found) == limit:
+                    break
+        return found, examined
@@ -0,0 +1,217 @@
+"""Bulk-load timed transcripts into the backend's video tables.
+
+``python -m backend.manage ingest-videos videos.ndjson`` reads one video
+per line::
+
+    {"id": 42, "title": "Greetings", "thumbnail_url": "https://...",
+     "score": 3, "segments": [{"start_sec": 0, "end_sec": 4,
+     "text": "Hello and welcome."}, ...]}
+
+Videos are loaded ``chunk_size`` at a time, one transaction per chunk: the
+chunk's words are resolved in bulk, its ``videos`` rows upserted, and its
+``video_transcripts``, ``transcript_tokens`` and ``video_words`` rows
+replaced with ``executemany`` inserts. Loading a video again replaces what
+an earlier load wrote, so re-running a file is idempotent, and only one
+chunk is held in memory at a time.
+"""
+
+from dataclasses import dataclass, field
+import json
+import time
+
+from sqlalchemy import func, select, text
+
+from backend.main import (
+    SessionLocal,
+    TranscriptToken,
+    Video,
+    VideoTranscript,
+    VideoWord,
+    _upsert,
+    rebuild_video_stats,
+    remove_token_blobs,
+    resolve_words,
+    segment_tokens,
+)
+
+CHUNK_VIDEOS = 500
+
+
+@dataclass
+class VideoIngestReport:
+    """Counts and timing for one :func:`ingest_videos` run."""
+
+    videos: int = 0
+    segments: int = 0
+    tokens: int = 0
+    errors: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        """Return a one-line human readable throughput report."""
+
+        rate = self.videos / self.seconds if self.seconds else 0.0
+        token_rate = self.tokens / self.seconds if self.seconds else 0.0
+        return (
+            f"{self.videos} videos, {self.segments} segments, {self.tokens} tokens "
+            f"loaded in {self.seconds:.2f}s ({rate:.0f} videos/s, "
+            f"{token_rate:.0f} tokens/s), {len(self.errors)} lines rejected"
+        )
+
+
+def _int(entry, key, default=None):
+    value = entry.get(key, default)
+    if type(value) is not int:
+        raise ValueError(f"invalid {key} {value!r}")
+    return value
+
+
+def parse_video(line):
+    """Parse one input line into a video dict with validated segments."""
+    entry = json.loads(line)
+    if not isinstance(entry, dict):
+        raise ValueError("expected a JSON object")
+    title = entry.get("title")
+    if not isinstance(title, str) or not title:
+        raise ValueError("title is required")
+    segments = entry.get("segments")
+    if not isinstance(segments, list):
+        raise ValueError("segments must be a list")
+    parsed = []
+    for segment in segments:
+        if not isinstance(segment, dict) or not isinstance(segment.get("text"), str):
+            raise ValueError("each segment needs text, start_sec and end_sec")
+        start, end = _int(segment, "start_sec"), _int(segment, "end_sec")
+        if end < start:
+            raise ValueError(f"segment ends before it starts at {start}")
+        parsed.append((segment["text"], start, end))
+    return {
+        "id": _int(entry, "id"),
+        "title": title,
+        "thumbnail_url": str(entry.get("thumbnail_url") or ""),
+        "score": _int(entry, "score", 0),
+        "segments": parsed,
+    }
+
+
+def load_videos(db, videos):
+    """Replace the transcripts, tokens and word sets of ``videos``.
+
+    ``videos`` are :func:`parse_video` dicts with distinct ids. Commits.
+    Returns ``(segments, tokens)`` written.
+    """
+    timed = [
+        [segment_tokens(*segment) for segment in video["segments"]]
+        for video in videos
+    ]
+    # Resolved before this transaction writes anything: the word dictionary
+    # reads through its own connection.
+    word_ids = resolve_words(
+        db, {word for segments in timed for tokens in segments for word, _, _ in tokens}
+    )
+
+    ids = [video["id"] for video in videos]
+    db.execute(
+        _upsert(
+            db,
+            Video.__table__,
+            [
+                {key: video[key] for key in ("id", "title", "thumbnail_url", "score")}
+                for video in videos
+            ],
+            ["id"],
+            ["title", "thumbnail_url", "score"],
+        )
+    )
+    for model in (VideoTranscript, TranscriptToken, VideoWord):
+        db.execute(model.__table__.delete().where(model.video_id.in_(ids)))
+
+    transcripts, tokens, video_words = [], [], []
+    for video, segments in zip(videos, timed):
+        video_id = video["id"]
+        seen = set()
+        for (line, start, end), segment in zip(video["segments"], segments):
+            transcripts.append(
+                {"video_id": video_id, "text": line, "start_sec": start, "end_sec": end}
+            )
+            for word, token_start, token_end in segment:
+                word_id = word_ids[word]
+                seen.add(word_id)
+                tokens.append(
+                    {
+                        "video_id": video_id,
+                        "word_id": word_id,
+                        "start_sec": token_start,
+                        "end_sec": token_end,
+                    }
+                )
+        video_words.extend(
+            {"video_id": video_id, "word_id": word_id} for word_id in sorted(seen)
+        )
+    for model, rows in (
+        (VideoTranscript, transcripts),
+        (TranscriptToken, tokens),
+        (VideoWord, video_words),
+    ):
+        # Core table inserts: the ORM's bulk path costs more than the write.
+        if rows:
+            db.execute(model.__table__.insert(), rows)
+    rebuild_video_stats(db, video_ids=ids)
+    return len(transcripts), len(tokens)
+
+
+def _advance_video_sequence(db):
+    # Explicit ids do not advance a PostgreSQL serial, so later inserts
+    # without an id would collide with ingested videos.
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT setval(pg_get_serial_sequence('videos', 'id'), :top)"),
+            {"top": db.scalar(select(func.max(Video.id)))},
+        )
+        db.commit()
+
+
+def ingest_videos(lines, chunk_size=CHUNK_VIDEOS, on_chunk=None):
+    """Load NDJSON video ``lines`` and return a :class:`VideoIngestReport`.
+
+    Lines that fail to parse are recorded in ``report.errors`` as
+    ``(line_number, message)`` and skipped. A video repeated in the input
+    ends up as its last occurrence. ``on_chunk`` is called with each
+    committed chunk's video ids, e.g. to evict cached ``/tokens`` bodies.
+    """
+    started = time.perf_counter()
+    report = VideoIngestReport()
+    chunk = {}
+
+    def flush():
+        with SessionLocal() as db:
+            segments, tokens = load_videos(db, list(chunk.values()))
+        for video_id in chunk:
+            remove_token_blobs(video_id)
+        if on_chunk is not None:
+            on_chunk(list(chunk))
+        report.videos += len(chunk)
+        report.segments += segments
+        report.tokens += tokens
+        chunk.clear()
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            video = parse_video(line)
+        except ValueError as exc:
+            report.errors.append((number, str(exc)))
+            continue
+        # A repeat within the chunk replaces the earlier entry; one in a
+        # later chunk replaces the committed rows.
+        chunk.pop(video["id"], None)
+        chunk[video["id"]] = video
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    with SessionLocal() as db:
+        _advance_video_sequence(db)
+    report.seconds = time.perf_counter() - started
+    return report
@@ -1,46 +1,89 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
+from contextlib import asynccontextmanager
 from sqlalchemy import (
     Column,
     Integer,
+    LargeBinary,
     String,
     create_engine,
     Enum,
     DateTime,
+    Float,
     func,
     case,
     ForeignKey,
+    Index,
+    bindparam,
+    column,
+    event,
+    exists,
+    insert,
+    select,
+    table,
+    type_coerce,
+    union_all,
 )
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-from passlib.context import CryptContext
-from datetime import datetime
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import asyncio
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
 import enum
+import hashlib
 import json
 import os
-import redis.asyncio as redis
+import re
+import uuid
 
+from backend.cache import ByteLRU, MemoryCache
+from backend.catalogue import VideoCatalogue
+from backend.metrics import (
+    REGISTRY,
+    MetricsMiddleware,
+    cache_backend,
+    cache_fallbacks,
+    cache_result,
+    instrument_engine,
+    recommendation_videos_examined,
+    record_memory_cache,
+)
+from backend.passwords import PasswordHasher
+from backend.scheduler import INITIAL_EASE, level_schedule, review
+from backend.words import WordDictionary
+from backend import wordsets
+from fastapi.middleware.cors import CORSMiddleware
 
-class MemoryCache:
-    """Simple in-memory cache as a fallback when Redis is unavailable."""
-
-    def __init__(self):
-        self.store = {}
-
-    async def get(self, key):
-        return self.store.get(key)
 
-    async def set(self, key, value, ex=None):
-        self.store[key] = value
 
-    async def delete(self, key):
-        self.store.pop(key, None)
+@asynccontextmanager
+async def lifespan(app):
+    """Open the request engine and cache client on startup; release them on
+    shutdown. Schema changes are applied separately by
+    ``python -m backend.manage init-db``."""
+    get_sessionmaker()
+    await get_redis()
+    try:
+        yield
+    finally:
+        password_hasher.shutdown()
+        if hasattr(app.state, "sessionmaker"):
+            await app.state.async_engine.dispose()
+            del app.state.sessionmaker, app.state.async_engine
+        if hasattr(app.state, "redis"):
+            if not isinstance(app.state.redis, MemoryCache):
+                await app.state.redis.aclose()
+            del app.state.redis
 
-    async def ping(self):
-        return True
-from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[os.getenv("CORS_ORIGINS", "*")],
@@ -48,6 +91,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"]
 )
+app.add_middleware(MetricsMiddleware)
 
 # Database setup
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./users.db")
@@ -56,8 +100,58 @@ if DATABASE_URL.startswith("postgresql"):
     connect_args = {}
 else:
     connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+# The synchronous engine is used by migrations, seeding and the maintenance
+# CLI and only connects when one of them runs; request handlers go through
+# the async engine created by ``get_sessionmaker``.
+engine = instrument_engine(
+    create_engine(DATABASE_URL, connect_args=connect_args), "sync"
+)
 SessionLocal = sessionmaker(bind=engine)
+
+
+def _async_database_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url.split(":", 1)[1]
+    if url.startswith(("postgresql:", "postgresql+psycopg2:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+def _sqlite_pragmas(dbapi_conn, _):
+    # Concurrent requests mean concurrent SQLite connections: let readers
+    # proceed during writes and wait for, rather than fail on, the write lock.
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.close()
+
+
+def get_sessionmaker():
+    """Return the request session factory, creating the async engine on first use."""
+    if not hasattr(app.state, "sessionmaker"):
+        # aiosqlite would otherwise open a new connection (and thread) per
+        # session for file databases, so SQLite is pooled explicitly.
+        async_engine = create_async_engine(
+            _async_database_url(DATABASE_URL),
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_pre_ping=True,
+        )
+        if DATABASE_URL.startswith("sqlite"):
+            event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+        instrument_engine(async_engine.sync_engine, "async")
+        app.state.async_engine = async_engine
+        app.state.sessionmaker = async_sessionmaker(async_engine, expire_on_commit=False)
+    return app.state.sessionmaker
+
+
+async def get_db():
+    async with get_sessionmaker()() as session:
+        yield session
+
+
 Base = declarative_base()
 
 class User(Base):
@@ -65,6 +159,9 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
+    # Bumped whenever a word moves in or out of ``unknown``; cached
+    # recommendations are keyed on it.
+    vocab_version = Column(Integer, default=0, server_default="0", nullable=False)
 
 class MasteryLevel(enum.IntEnum):
     unknown = 0
@@ -78,12 +175,27 @@ class Word(Base):
 
 class UserWord(Base):
     __tablename__ = 'user_words'
+    __table_args__ = (
+        Index('uq_user_words_user_word', 'user_id', 'word_id', unique=True),
+        Index('ix_user_words_user_mastery', 'user_id', 'mastery_level', 'word_id'),
+        Index('ix_user_words_user_updated', 'user_id', 'updated_at'),
+        Index('ix_user_words_user_due', 'user_id', 'due_at'),
+    )
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, index=True, nullable=False)
+    # Lookups by user alone use the leading column of the indexes above.
+    user_id = Column(Integer, nullable=False)
     word_id = Column(Integer, ForeignKey('words.id'), index=True, nullable=False)
     seen_count = Column(Integer, default=0, nullable=False)
     last_seen_at = Column(DateTime)
     mastery_level = Column(Enum(MasteryLevel), default=MasteryLevel.unknown, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+    # SM-2 review schedule; see backend.scheduler.
+    ease = Column(Float, default=INITIAL_EASE, nullable=False)
+    interval_days = Column(Integer, default=0, nullable=False)
+    repetitions = Column(Integer, default=0, nullable=False)
+    due_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 class Video(Base):
     __tablename__ = 'videos'
@@ -94,12 +206,18 @@ class Video(Base):
 
 class VideoWord(Base):
     __tablename__ = 'video_words'
+    __table_args__ = (
+        Index('ix_video_words_video_word', 'video_id', 'word_id'),
+    )
     id = Column(Integer, primary_key=True)
-    video_id = Column(Integer, index=True, nullable=False)
+    video_id = Column(Integer, nullable=False)
     word_id = Column(Integer, ForeignKey('words.id'), index=True, nullable=False)
 
 class VideoTranscript(Base):
     __tablename__ = 'video_transcripts'
+    __table_args__ = (
+        Index('ix_video_transcripts_video_start', 'video_id', 'start_sec'),
+    )
     id = Column(Integer, primary_key=True)
     video_id = Column(Integer, index=True, nullable=False)
     text = Column(String, nullable=False)
@@ -108,13 +226,82 @@ class VideoTranscript(Base):
 
 class TranscriptToken(Base):
     __tablename__ = 'transcript_tokens'
+    __table_args__ = (
+        Index('ix_transcript_tokens_video_start', 'video_id', 'start_sec'),
+        Index('ix_transcript_tokens_video_word', 'video_id', 'word_id'),
+    )
     id = Column(Integer, primary_key=True)
-    video_id = Column(Integer, index=True, nullable=False)
+    video_id = Column(Integer, nullable=False)
     word_id = Column(Integer, ForeignKey('words.id'), index=True, nullable=False)
     start_sec = Column(Integer, nullable=False)
     end_sec = Column(Integer, nullable=False)
 
-Base.metadata.create_all(bind=engine)
+class VideoStat(Base):
+    __tablename__ = 'video_stats'
+    video_id = Column(Integer, primary_key=True)
+    word_count = Column(Integer, index=True, nullable=False)
+
+class UserVideoStat(Base):
+    """Per-user count of unknown words in a video.
+
+    Rows only exist for videos in which the user knows at least one word;
+    for every other video the count is ``VideoStat.word_count``.
+    """
+    __tablename__ = 'user_video_stats'
+    __table_args__ = (
+        Index('ix_user_video_stats_user_unknown', 'user_id', 'unknown_count'),
+    )
+    user_id = Column(Integer, primary_key=True)
+    video_id = Column(Integer, primary_key=True)
+    unknown_count = Column(Integer, nullable=False)
+
+class VideoWordSet(Base):
+    """A video's distinct word ids encoded by :mod:`backend.wordsets`.
+
+    Derived from ``video_words`` by :func:`rebuild_video_stats`; one row per
+    video instead of one per word.
+    """
+    __tablename__ = 'video_word_sets'
+    video_id = Column(Integer, primary_key=True)
+    word_ids = Column(LargeBinary, nullable=False)
+
+class CatalogueVersion(Base):
+    """Single row counting changes to videos and their word sets.
+
+    Bumped by :func:`rebuild_video_stats`, which every ingest runs.
+    """
+    __tablename__ = 'catalogue_version'
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+
+
+# ``words`` only ever grows, so every process keeps an id <-> text dictionary
+# and endpoints attach texts from it instead of joining the table.
+word_dictionary = WordDictionary(Word.__table__)
+
+# Every video's word set in score order, for scan-mode recommendations.
+video_catalogue = VideoCatalogue(
+    Video.__table__, VideoStat.__table__, VideoWordSet.__table__
+)
+
+
+# Runs of word characters, keeping inner apostrophes and hyphens ("let's").
+TOKEN_RE = re.compile(r"\w+(?:['’-]\w+)*")
+
+
+def segment_tokens(text: str, start_sec: int, end_sec: int):
+    """Split a timed transcript segment into ``(word, start_sec, end_sec)``.
+
+    Words are lower-cased :data:`TOKEN_RE` matches, so punctuation is
+    dropped; the segment's duration is divided evenly between them.
+    """
+    parts = TOKEN_RE.findall(text.lower())
+    span = (end_sec - start_sec) / max(len(parts), 1)
+    return [
+        (part, int(start_sec + i * span), int(start_sec + (i + 1) * span))
+        for i, part in enumerate(parts)
+    ]
+
 
 # Insert a minimal set of sample data if the database is empty
 def seed_data():
@@ -132,73 +319,639 @@ def seed_data():
                 VideoTranscript(video_id=1, text="Learning is fun", start_sec=2, end_sec=5),
             ]
             db.add_all(transcripts)
-            words = {}
-            tokens = []
-            for t in transcripts:
-                parts = t.text.split()
-                span = (t.end_sec - t.start_sec) / max(len(parts), 1)
-                for i, tok in enumerate(parts):
-                    token = tok.lower()
-                    if token not in words:
-                        w = Word(text=token)
-                        db.add(w)
-                        db.flush()
-                        words[token] = w.id
-                    tokens.append(
-                        TranscriptToken(
-                            video_id=1,
-                            word_id=words[token],
-                            start_sec=int(t.start_sec + i * span),
-                            end_sec=int(t.start_sec + (i + 1) * span),
-                        )
-                    )
+            timed = [
+                token
+                for t in transcripts
+                for token in segment_tokens(t.text, t.start_sec, t.end_sec)
+            ]
+            words = resolve_words(db, [word for word, _, _ in timed])
+            tokens = [
+                TranscriptToken(
+                    video_id=1, word_id=words[word], start_sec=start, end_sec=end
+                )
+                for word, start, end in timed
+            ]
             db.add_all(
                 [VideoWord(video_id=1, word_id=w_id) for w_id in words.values()]
             )
             db.add_all(tokens)
-            db.commit()
+            db.flush()
+            rebuild_video_stats(db, video_ids=[1])
+            compile_token_blob(db, 1)
+
+def _is_known(level) -> bool:
+    return level is not None and level != MasteryLevel.unknown
 
-if os.getenv("SEED_DATA") == "true":
-    seed_data()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def rebuild_video_stats(db, video_ids=None):
+    """Recompute ``video_stats``, ``user_video_stats`` and
+    ``video_word_sets`` from scratch.
+
+    Limited to ``video_ids`` when given, e.g. after a video is (re)ingested.
+    """
+    stats_q = db.query(VideoStat)
+    user_stats_q = db.query(UserVideoStat)
+    word_counts = (
+        select(VideoWord.video_id, func.count())
+        .join(Word, VideoWord.word_id == Word.id)
+        .group_by(VideoWord.video_id)
+    )
+    if video_ids is not None:
+        stats_q = stats_q.filter(VideoStat.video_id.in_(video_ids))
+        user_stats_q = user_stats_q.filter(UserVideoStat.video_id.in_(video_ids))
+        word_counts = word_counts.where(VideoWord.video_id.in_(video_ids))
+    stats_q.delete(synchronize_session=False)
+    user_stats_q.delete(synchronize_session=False)
+    db.execute(
+        insert(VideoStat).from_select(["video_id", "word_count"], word_counts)
+    )
+
+    known_counts = (
+        select(
+            UserWord.user_id,
+            VideoWord.video_id,
+            (VideoStat.word_count - func.count()).label("unknown_count"),
+        )
+        .join(VideoWord, VideoWord.word_id == UserWord.word_id)
+        .join(Word, VideoWord.word_id == Word.id)
+        .join(VideoStat, VideoStat.video_id == VideoWord.video_id)
+        .where(UserWord.mastery_level != MasteryLevel.unknown)
+        .group_by(UserWord.user_id, VideoWord.video_id, VideoStat.word_count)
+    )
+    if video_ids is not None:
+        known_counts = known_counts.where(VideoWord.video_id.in_(video_ids))
+    db.execute(
+        insert(UserVideoStat).from_select(
+            ["user_id", "video_id", "unknown_count"], known_counts
+        )
+    )
+    rebuild_video_word_sets(db, video_ids)
+    bump_catalogue_version(db)
+    db.commit()
+
+
+# Encoded sets written per INSERT while rebuilding video_word_sets.
+WORD_SET_BATCH = 1000
+
+
+def rebuild_video_word_sets(db, video_ids=None):
+    """Re-encode ``video_word_sets`` from ``video_words``; the caller commits."""
+    sets_q = db.query(VideoWordSet)
+    pairs = (
+        select(VideoWord.video_id, VideoWord.word_id)
+        .join(Word, VideoWord.word_id == Word.id)
+        .order_by(VideoWord.video_id)
+    )
+    if video_ids is not None:
+        sets_q = sets_q.filter(VideoWordSet.video_id.in_(video_ids))
+        pairs = pairs.where(VideoWord.video_id.in_(video_ids))
+    sets_q.delete(synchronize_session=False)
+
+    rows = []
+    for video_id, group in groupby(
+        db.execute(pairs.execution_options(yield_per=WORD_SET_BATCH * 100)),
+        key=itemgetter(0),
+    ):
+        rows.append(
+            {"video_id": video_id, "word_ids": wordsets.encode(w for _, w in group)}
+        )
+        if len(rows) == WORD_SET_BATCH:
+            db.execute(insert(VideoWordSet.__table__), rows)
+            rows = []
+    if rows:
+        db.execute(insert(VideoWordSet.__table__), rows)
+
+
+def catalogue_version(db) -> int:
+    """Return the current ``catalogue_version``; 0 before the first bump."""
+    return db.scalar(
+        select(CatalogueVersion.version).where(CatalogueVersion.id == 1)
+    ) or 0
+
+
+def bump_catalogue_version(db):
+    """Move every cached recommendation to a fresh key; the caller commits."""
+    stmt = _dialect_insert(db, CatalogueVersion.__table__).values(id=1, version=1)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"version": CatalogueVersion.__table__.c.version + 1},
+        )
+    )
+
+
+def lock_user(db, user_id: int):
+    """Lock the ``users`` row until the caller's transaction ends.
+
+    Writers of a user's words take this first, so two of them cannot both
+    read a word as new and count it into ``user_video_stats`` twice.
+    SQLite ignores ``FOR UPDATE``; there a no-op update takes its database
+    write lock instead.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        users = User.__table__
+        db.execute(users.update().where(users.c.id == user_id).values(id=users.c.id))
+    else:
+        db.execute(select(User).where(User.id == user_id).with_for_update())
+
+
+def apply_vocabulary_changes(db, user_id: int, learned, forgotten):
+    """Adjust ``user_video_stats`` after words changed known/unknown state.
+
+    ``learned`` words moved out of ``unknown`` and ``forgotten`` words moved
+    back into it. Only videos containing one of those words are touched,
+    and the user's ``vocab_version`` is bumped; the caller owns the
+    transaction.
+    """
+    learned, forgotten = set(learned), set(forgotten)
+    if not learned and not forgotten:
+        return
+    users = User.__table__
+    db.execute(
+        users.update()
+        .where(users.c.id == user_id)
+        .values(vocab_version=users.c.vocab_version + 1)
+    )
+    deltas = (
+        db.query(
+            VideoWord.video_id,
+            func.sum(case((VideoWord.word_id.in_(learned), -1), else_=1)),
+            VideoStat.word_count,
+        )
+        .join(Word, VideoWord.word_id == Word.id)
+        .join(VideoStat, VideoStat.video_id == VideoWord.video_id)
+        .filter(VideoWord.word_id.in_(learned | forgotten))
+        .group_by(VideoWord.video_id, VideoStat.word_count)
+        .all()
+    )
+    if not deltas:
+        return
+    current = dict(
+        db.query(UserVideoStat.video_id, UserVideoStat.unknown_count)
+        .filter(
+            UserVideoStat.user_id == user_id,
+            UserVideoStat.video_id.in_([vid for vid, _, _ in deltas]),
+        )
+        .all()
+    )
+    rows = [
+        {
+            "user_id": user_id,
+            "video_id": vid,
+            "unknown_count": current.get(vid, word_count) + delta,
+        }
+        for vid, delta, word_count in deltas
+        if delta
+    ]
+    if rows:
+        db.execute(
+            _upsert(
+                db,
+                UserVideoStat.__table__,
+                rows,
+                ["user_id", "video_id"],
+                ["unknown_count"],
+            )
+        )
+
+
+RECOMPUTE_BATCH = 5000
+
+
+def recompute_schedules(db, user_ids=None, batch_size=RECOMPUTE_BATCH):
+    """Reset review schedules to the ones implied by each row's mastery level.
+
+    Rows are treated as last reviewed at ``last_seen_at`` (or ``updated_at``
+    if never seen) and rewritten in ``id`` order, ``batch_size`` at a time,
+    without touching ``updated_at``. Review history kept in ``ease`` is
+    discarded. The caller owns the transaction. Returns the number of rows
+    rewritten.
+    """
+    # A bare table, so the ORM's ``updated_at`` onupdate does not fire.
+    target = table(
+        "user_words",
+        column("id"),
+        *(column(name, UserWord.__table__.c[name].type) for name in SCHEDULE_COLUMNS),
+    )
+    stmt = (
+        target.update()
+        .where(target.c.id == bindparam("row_id"))
+        .values({name: bindparam(f"new_{name}") for name in SCHEDULE_COLUMNS})
+    )
+    query = select(
+        UserWord.id,
+        UserWord.mastery_level,
+        func.coalesce(UserWord.last_seen_at, UserWord.updated_at),
+    ).order_by(UserWord.id).limit(batch_size)
+    if user_ids is not None:
+        query = query.where(UserWord.user_id.in_(user_ids))
+    last_id, total = 0, 0
+    while True:
+        rows = db.execute(query.where(UserWord.id > last_id)).all()
+        if not rows:
+            return total
+        db.execute(
+            stmt,
+            [
+                {
+                    "row_id": row_id,
+                    **{
+                        f"new_{name}": value
+                        for name, value in level_schedule(level, reviewed_at).items()
+                    },
+                }
+                for row_id, level, reviewed_at in rows
+            ],
+        )
+        last_id = rows[-1][0]
+        total += len(rows)
+
+
+password_hasher = PasswordHasher()
 
 async def get_redis():
     if not hasattr(app.state, "redis"):
+        import redis.asyncio as redis
+
         redis_url = os.getenv("REDIS_URL", "redis://localhost")
         try:
-            app.state.redis = redis.from_url(redis_url)
-            await app.state.redis.ping()
+            client = redis.from_url(redis_url)
+            await client.ping()
+            app.state.redis = client
+            cache_backend.set("redis", value=1)
         except Exception:
-            app.state.redis = MemoryCache()
+            cache_fallbacks.inc()
+            cache_backend.set("memory", value=1)
+            app.state.redis = MemoryCache(
+                max_entries=int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", "10000")),
+                max_bytes=int(
+                    os.getenv("MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+                ),
+            )
     return app.state.redis
 
-def record_word_interaction(db, user_id: int, word_id: int, correct: bool = False):
-    word = db.query(UserWord).filter_by(user_id=user_id, word_id=word_id).first()
-    if not word:
-        word = UserWord(user_id=user_id, word_id=word_id, seen_count=0,
-                        mastery_level=MasteryLevel.unknown)
-        db.add(word)
-    word.seen_count += 1
-    word.last_seen_at = datetime.utcnow()
-    if correct:
-        new_level = min(word.mastery_level.value + 1, MasteryLevel.mastered.value)
+
+# Cache fills: concurrent misses on one key share a single in-process load,
+# and a short Redis lock (``<key>:lock``) lets one process at a time load
+# while the others poll for the result.
+CACHE_LOCK_TTL = 5
+CACHE_LOCK_POLL = 0.05
+_cache_flights = {}
+
+
+def _as_str(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+async def _cached_value(r, key, fresh):
+    cached = await r.get(key)
+    if not cached:
+        return None
+    value = json.loads(cached)
+    if fresh is not None and not await fresh(value):
+        return None
+    return value
+
+
+async def _fill_cache(r, key, loader, ex, fresh):
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    deadline = asyncio.get_running_loop().time() + CACHE_LOCK_TTL
+    while not await r.set(lock_key, token, nx=True, ex=CACHE_LOCK_TTL):
+        await asyncio.sleep(CACHE_LOCK_POLL)
+        cached = await _cached_value(r, key, fresh)
+        if cached is not None:
+            return cached
+        if asyncio.get_running_loop().time() > deadline:
+            token = None
+            break
+    try:
+        result = await loader()
+        # A change committed during the load can leave ``result`` stale. It
+        # is cached all the same: recommendation keys name the versions they
+        # were loaded at, and ``fresh`` rejects pages whose version tokens
+        # moved.
+        await r.set(key, json.dumps(result), ex=ex)
+    finally:
+        # Released even if the load failed, so waiters retry at once rather
+        # than after CACHE_LOCK_TTL. A load that outlived the TTL may have
+        # lost the lock to another process; only release our own.
+        if token is not None and _as_str(await r.get(lock_key)) == token:
+            await r.delete(lock_key)
+    return result
+
+
+async def cached_json(key, loader, ex, fresh=None):
+    """Return the JSON value cached at ``key``, loading it on a miss.
+
+    ``loader`` is an async callable that runs at most once per key at a time
+    in this process. ``fresh``, if given, is an async predicate; cached
+    values it rejects are treated as misses.
+    """
+    r = await get_redis()
+    cached = await _cached_value(r, key, fresh)
+    # Counted by key family: "user_words" for user_words:{user_id}:...
+    cache_result(key.partition(":")[0], cached is not None)
+    if cached is not None:
+        return cached
+    flight = _cache_flights.get(key)
+    if flight is None:
+        flight = asyncio.ensure_future(_fill_cache(r, key, loader, ex, fresh))
+        _cache_flights[key] = flight
+        flight.add_done_callback(
+            lambda done: _cache_flights.pop(key, None)
+            if _cache_flights.get(key) is done
+            else None
+        )
+    return await asyncio.shield(flight)
+
+
+# /api/user/words pages are cached per (user, after, limit). Each page
+# records a version token for every block of USER_WORDS_BLOCK word ids it
+# covers, so a mutation only has to replace the tokens of the blocks it
+# touched. The last page also records a per-user "tail" token, bumped on
+# every mutation, because it vouches for all word ids past its end.
+USER_WORDS_PAGE_SIZE = 500
+USER_WORDS_MAX_PAGE_SIZE = 5000
+USER_WORDS_BLOCK = 1024
+USER_WORDS_PAGE_BLOCKS = 64
+USER_WORDS_TTL = 3600
+# Delta watermarks trail the clock so that writes committed slightly after
+# their ``updated_at`` are re-sent rather than missed.
+SYNC_WATERMARK_LAG = timedelta(seconds=60)
+
+
+def _user_words_version_keys(user_id: int, first: int, last: int, tail: bool):
+    keys = [
+        f"user_words:{user_id}:v:{block}"
+        for block in range(first // USER_WORDS_BLOCK, last // USER_WORDS_BLOCK + 1)
+    ]
+    if tail:
+        keys.append(f"user_words:{user_id}:v:tail")
+    return keys
+
+
+async def _current_versions(r, keys, mint=False):
+    versions = [_as_str(v) for v in await r.mget(keys)]
+    if mint:
+        for i, key in enumerate(keys):
+            if versions[i] is None:
+                token = uuid.uuid4().hex
+                if await r.set(key, token, nx=True, ex=USER_WORDS_TTL):
+                    versions[i] = token
+                else:
+                    versions[i] = _as_str(await r.get(key))
+    return versions
+
+
+async def invalidate_user_words(user_id: int, word_ids):
+    """Expire the cached ``/api/user/words`` pages covering ``word_ids``.
+
+    Call after the change is committed.
+    """
+    blocks = {word_id // USER_WORDS_BLOCK for word_id in word_ids}
+    r = await get_redis()
+    for key in [f"user_words:{user_id}:v:{block}" for block in blocks] + [
+        f"user_words:{user_id}:v:tail"
+    ]:
+        await r.set(key, uuid.uuid4().hex, ex=USER_WORDS_TTL)
+
+
+def _dialect_insert(db, table):
+    """Return an ``INSERT`` supporting ``ON CONFLICT`` for the session's dialect."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
     else:
-        new_level = max(word.mastery_level.value - 1, MasteryLevel.unknown.value)
-    word.mastery_level = MasteryLevel(new_level)
-    db.commit()
-    return word
+        raise NotImplementedError(f"Upsert not supported for {dialect}")
+    return dialect_insert(table)
 
-def get_mastered_words(db, user_id: int):
-    return (
-        db.query(UserWord, Word.text)
-        .join(Word, UserWord.word_id == Word.id)
-        .filter(
-            UserWord.user_id == user_id,
-            UserWord.mastery_level >= MasteryLevel.learning,
+
+# Bound on the rows or bound parameters in one words INSERT or IN list.
+WORD_BATCH = 5000
+
+
+def resolve_words(db, texts):
+    """Return ``{text: id}`` for ``texts``, inserting the words that are new.
+
+    Known words come from :data:`word_dictionary`; the rest are created
+    with ``INSERT ... ON CONFLICT DO NOTHING`` statements of up to
+    ``WORD_BATCH`` rows in the caller's transaction and read back through
+    it, since the dictionary only sees committed words.
+    """
+    texts = set(texts)
+    ids = word_dictionary.ids(db, texts)
+    missing = sorted(texts - ids.keys())
+    for start in range(0, len(missing), WORD_BATCH):
+        batch = missing[start:start + WORD_BATCH]
+        db.execute(
+            _dialect_insert(db, Word.__table__)
+            .values([{"text": text} for text in batch])
+            .on_conflict_do_nothing(index_elements=["text"])
+        )
+        ids.update(
+            db.execute(select(Word.text, Word.id).where(Word.text.in_(batch))).all()
+        )
+    return ids
+
+
+def existing_word_ids(db, word_ids):
+    """Return the ids among ``word_ids`` that have a ``words`` row.
+
+    Checked against :data:`word_dictionary` first, then through ``db`` for
+    words created by the caller's transaction, which the dictionary cannot
+    see.
+    """
+    word_ids = list(set(word_ids))
+    found = {
+        word_id
+        for word_id, text in zip(word_ids, word_dictionary.texts(db, word_ids))
+        if text is not None
+    }
+    unseen = set(word_ids) - found
+    if unseen:
+        found.update(db.scalars(select(Word.id).where(Word.id.in_(unseen))))
+    return found
+
+
+def _check_word_ids(db, word_ids):
+    unknown = set(word_ids) - existing_word_ids(db, word_ids)
+    if unknown:
+        raise ValueError(f"unknown word_id {', '.join(map(str, sorted(unknown)))}")
+
+
+async def word_texts(word_ids):
+    """Return the text of each id, opening a session only on a dictionary miss."""
+    texts = word_dictionary.lookup(word_ids)
+    if None in texts:
+        async with get_sessionmaker()() as db:
+            texts = await db.run_sync(
+                lambda sync_db: word_dictionary.texts(sync_db, word_ids)
+            )
+    return texts
+
+
+def _upsert(db, table, rows, index_elements, update_columns):
+    """Build an ``INSERT ... ON CONFLICT DO UPDATE`` for the session's dialect."""
+    stmt = _dialect_insert(db, table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={col: stmt.excluded[col] for col in update_columns},
+    )
+
+
+SCHEDULE_COLUMNS = ("ease", "interval_days", "repetitions", "due_at")
+
+
+def _next_level(level: MasteryLevel, correct: bool) -> MasteryLevel:
+    if correct:
+        return MasteryLevel(min(level.value + 1, MasteryLevel.mastered.value))
+    return MasteryLevel(max(level.value - 1, MasteryLevel.unknown.value))
+
+
+def record_word_interactions(db, user_id: int, answers):
+    """Apply a batch of quiz answers for ``user_id`` in a single transaction.
+
+    Existing ``UserWord`` rows are loaded with one query, the mastery and
+    review-schedule transitions are replayed in memory in answer order (so
+    a word answered twice moves twice) and the final state is written back
+    with one upsert.
+    Returns the written rows as dicts keyed by column name. Callers must
+    :func:`invalidate_user_words` once this returns. Raises ``ValueError``,
+    writing nothing, if a word id has no ``words`` row.
+    """
+    if not answers:
+        return []
+    word_ids = {ans.word_id for ans in answers}
+    _check_word_ids(db, word_ids)
+    lock_user(db, user_id)
+    existing = (
+        db.query(
+            UserWord.word_id,
+            UserWord.seen_count,
+            UserWord.mastery_level,
+            UserWord.ease,
+            UserWord.interval_days,
+            UserWord.repetitions,
         )
+        .filter(UserWord.user_id == user_id, UserWord.word_id.in_(word_ids))
+        .with_for_update()
         .all()
     )
+    state = {row.word_id: row._asdict() for row in existing}
+    before = {word_id: entry["mastery_level"] for word_id, entry in state.items()}
+    now = datetime.utcnow()
+    for ans in answers:
+        entry = state.setdefault(
+            ans.word_id,
+            {
+                "seen_count": 0,
+                "mastery_level": MasteryLevel.unknown,
+                "ease": INITIAL_EASE,
+                "interval_days": 0,
+                "repetitions": 0,
+            },
+        )
+        entry["seen_count"] += 1
+        entry["mastery_level"] = _next_level(entry["mastery_level"], ans.correct)
+        entry["ease"], entry["interval_days"], entry["repetitions"] = review(
+            entry["ease"], entry["interval_days"], entry["repetitions"], ans.correct
+        )
+    rows = [
+        {
+            "user_id": user_id,
+            "word_id": word_id,
+            "seen_count": entry["seen_count"],
+            "last_seen_at": now,
+            "mastery_level": entry["mastery_level"],
+            "updated_at": now,
+            "ease": entry["ease"],
+            "interval_days": entry["interval_days"],
+            "repetitions": entry["repetitions"],
+            "due_at": now + timedelta(days=entry["interval_days"]),
+        }
+        for word_id, entry in state.items()
+    ]
+    db.execute(
+        _upsert(
+            db,
+            UserWord.__table__,
+            rows,
+            ["user_id", "word_id"],
+            [
+                "seen_count",
+                "last_seen_at",
+                "mastery_level",
+                "updated_at",
+                *SCHEDULE_COLUMNS,
+            ],
+        )
+    )
+    apply_vocabulary_changes(
+        db,
+        user_id,
+        learned=[
+            r["word_id"] for r in rows
+            if _is_known(r["mastery_level"]) and not _is_known(before.get(r["word_id"]))
+        ],
+        forgotten=[
+            r["word_id"] for r in rows
+            if not _is_known(r["mastery_level"]) and _is_known(before.get(r["word_id"]))
+        ],
+    )
+    db.commit()
+    return rows
+
+def record_word_interaction(db, user_id: int, word_id: int, correct: bool = False):
+    record_word_interactions(
+        db, user_id, [QuizAnswer(word_id=word_id, correct=correct)]
+    )
+    return db.query(UserWord).filter_by(user_id=user_id, word_id=word_id).first()
+
+KNOWN_LEVELS = [MasteryLevel.learning, MasteryLevel.mastered]
+
+
+def _with_texts(db, user_words):
+    texts = word_dictionary.texts(db, [uw.word_id for uw in user_words])
+    return list(zip(user_words, texts))
+
+
+def get_mastered_words(db, user_id: int, after=None, until=None, limit=None):
+    """Return ``(UserWord, text)`` for known words, ordered by ``word_id``.
+
+    ``after`` and ``until`` bound ``word_id`` (exclusive and inclusive).
+    """
+    query = db.query(UserWord).filter(
+        UserWord.user_id == user_id, UserWord.mastery_level.in_(KNOWN_LEVELS)
+    )
+    if after is not None:
+        query = query.filter(UserWord.word_id > after)
+    if until is not None:
+        query = query.filter(UserWord.word_id <= until)
+    return _with_texts(db, query.order_by(UserWord.word_id).limit(limit).all())
+
+
+def get_changed_words(db, user_id: int, since: datetime, after=None, limit=None):
+    """Return ``(UserWord, text)`` for rows updated after ``since``, at any
+    mastery level, ordered by ``word_id``."""
+    query = db.query(UserWord).filter(
+        UserWord.user_id == user_id, UserWord.updated_at > since
+    )
+    if after is not None:
+        query = query.filter(UserWord.word_id > after)
+    return _with_texts(db, query.order_by(UserWord.word_id).limit(limit).all())
+
+
+def _has_known_words_after(db, user_id: int, word_id: int) -> bool:
+    return db.query(
+        exists().where(
+            UserWord.user_id == user_id,
+            UserWord.mastery_level.in_(KNOWN_LEVELS),
+            UserWord.word_id > word_id,
+        )
+    ).scalar()
 
 class Credentials(BaseModel):
     username: str
@@ -223,139 +976,540 @@ class UserWordUpdate(BaseModel):
 def health_check():
     return {"status": "ok"}
 
+@app.get('/metrics')
+def metrics():
+    """Expose request, SQL and cache metrics in Prometheus text format."""
+    cache = getattr(app.state, "redis", None)
+    if isinstance(cache, MemoryCache):
+        record_memory_cache(cache.stats())
+    return Response(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 @app.post('/signup')
-def signup(creds: SignupRequest):
-    with SessionLocal() as db:
-        if db.query(User).filter(User.username == creds.username).first():
-            raise HTTPException(status_code=400, detail="User already exists")
-        hashed = pwd_context.hash(creds.password)
-        user = User(username=creds.username, password_hash=hashed)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        if creds.quiz_answers:
-            for ans in creds.quiz_answers:
-                record_word_interaction(db, user.id, ans.word_id, ans.correct)
+async def signup(creds: SignupRequest, db: AsyncSession = Depends(get_db)):
+    if await db.scalar(select(User.id).where(User.username == creds.username)):
+        raise HTTPException(status_code=400, detail="User already exists")
+    hashed = await password_hasher.hash(creds.password)
+    user = User(username=creds.username, password_hash=hashed)
+    db.add(user)
+    if not creds.quiz_answers:
+        await db.commit()
+        return {"status": "created"}
+    # One transaction, so an answer for an unknown word creates no user.
+    await db.flush()
+    try:
+        await db.run_sync(record_word_interactions, user.id, creds.quiz_answers)
+    except ValueError as exc:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail=str(exc))
+    await invalidate_user_words(user.id, [a.word_id for a in creds.quiz_answers])
     return {"status": "created"}
 
 @app.post('/login')
-def login(creds: Credentials):
-    with SessionLocal() as db:
-        user = db.query(User).filter(User.username == creds.username).first()
-        if not user or not pwd_context.verify(creds.password, user.password_hash):
-            raise HTTPException(status_code=400, detail="Invalid credentials")
+async def login(creds: Credentials, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.username == creds.username))
+    if not user:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+    valid, new_hash = await password_hasher.verify(creds.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     return {"status": "ok", "user_id": user.id}
 
-@app.get('/api/user/words')
-async def user_words(user_id: int):
+def _user_word_dict(uw: UserWord, text: str):
+    return {
+        "word_id": uw.word_id,
+        "text": text,
+        "mastery_level": uw.mastery_level.name,
+        "seen_count": uw.seen_count,
+        "last_seen_at": uw.last_seen_at.isoformat() if uw.last_seen_at else None,
+    }
+
+async def _user_words_page(user_id: int, after: int, limit: int):
+    """Load one page of known words with ``word_id > after``.
+
+    A page spans at most ``USER_WORDS_PAGE_BLOCKS`` blocks of word ids, so
+    sparse vocabularies take a few short pages rather than one page whose
+    validity depends on an unbounded range.
+    """
     r = await get_redis()
-    cache_key = f"user_words:{user_id}"
-    cached = await r.get(cache_key)
-    if cached:
-        return json.loads(cached)
-    with SessionLocal() as db:
-        rows = get_mastered_words(db, user_id)
-        result = [
-            {
-                "word_id": uw.word_id,
-                "text": text,
-                "mastery_level": uw.mastery_level.name,
-                "seen_count": uw.seen_count,
-                "last_seen_at": uw.last_seen_at.isoformat() if uw.last_seen_at else None,
-            }
-            for uw, text in rows
-        ]
-    await r.set(cache_key, json.dumps(result), ex=3600)
-    return result
+    until = after + USER_WORDS_BLOCK * USER_WORDS_PAGE_BLOCKS
+    # Tokens are read before the rows so a concurrent mutation either shows
+    # up in the rows or replaces a token afterwards.
+    keys = _user_words_version_keys(user_id, after + 1, until, tail=True)
+    versions = await _current_versions(r, keys, mint=True)
+    async with get_sessionmaker()() as db:
+        rows = await db.run_sync(get_mastered_words, user_id, after, until, limit)
+        end = rows[-1][0].word_id if len(rows) == limit else until
+        more = len(rows) == limit or await db.run_sync(
+            _has_known_words_after, user_id, end
+        )
+    span = len(_user_words_version_keys(user_id, after + 1, end, tail=False))
+    return {
+        "words": [_user_word_dict(uw, text) for uw, text in rows],
+        "next_after": end if more else None,
+        "versions": versions[:span] + ([] if more else versions[-1:]),
+    }
 
 
-@app.patch('/api/user/words/{word_id}')
-async def update_user_word(word_id: int, upd: UserWordUpdate):
-    with SessionLocal() as db:
-        entry = (
-            db.query(UserWord)
-            .filter_by(user_id=upd.user_id, word_id=word_id)
-            .first()
-        )
-        if not entry:
-            entry = UserWord(
-                user_id=upd.user_id,
-                word_id=word_id,
-                seen_count=0,
-                mastery_level=upd.mastery_level,
-            )
-            db.add(entry)
-        else:
-            entry.mastery_level = upd.mastery_level
-        db.commit()
-        text = db.query(Word.text).filter(Word.id == word_id).scalar()
-        result = {
-            "word_id": entry.word_id,
-            "text": text,
-            "mastery_level": entry.mastery_level.name,
-            "seen_count": entry.seen_count,
-            "last_seen_at": entry.last_seen_at.isoformat()
-            if entry.last_seen_at
-            else None,
+def _user_words_page_fresh(user_id: int, after: int):
+    async def fresh(page):
+        end = page["next_after"]
+        keys = _user_words_version_keys(
+            user_id,
+            after + 1,
+            end if end is not None else after + USER_WORDS_BLOCK * USER_WORDS_PAGE_BLOCKS,
+            tail=end is None,
+        )
+        return await _current_versions(await get_redis(), keys) == page["versions"]
+
+    return fresh
+
+
+def _sync_watermark() -> str:
+    return (datetime.utcnow() - SYNC_WATERMARK_LAG).isoformat()
+
+
+@app.get('/api/user/words')
+async def user_words(
+    user_id: int,
+    after: int = Query(0, ge=0),
+    limit: int = Query(USER_WORDS_PAGE_SIZE, ge=1, le=USER_WORDS_MAX_PAGE_SIZE),
+    since: Optional[datetime] = None,
+):
+    """Page through a user's vocabulary in ``word_id`` order.
+
+    Without ``since`` only learning and mastered words are returned. With
+    ``since`` (a ``watermark`` from an earlier sync) every row changed after
+    it is returned, including words that fell back to ``unknown``. Follow
+    ``next_after`` until it is null and keep the first page's
+    ``watermark`` for the next delta sync.
+    """
+    watermark = _sync_watermark()
+    if since is not None:
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        async with get_sessionmaker()() as db:
+            rows = await db.run_sync(get_changed_words, user_id, since, after, limit)
+        return {
+            "words": [_user_word_dict(uw, text) for uw, text in rows],
+            "next_after": rows[-1][0].word_id if len(rows) == limit else None,
+            "watermark": watermark,
         }
+    page = await cached_json(
+        f"user_words:{user_id}:{after}:{limit}",
+        lambda: _user_words_page(user_id, after, limit),
+        ex=USER_WORDS_TTL,
+        fresh=_user_words_page_fresh(user_id, after),
+    )
+    return {
+        "words": page["words"],
+        "next_after": page["next_after"],
+        "watermark": watermark,
+    }
 
-    r = await get_redis()
-    await r.delete(f"user_words:{upd.user_id}")
+
+def set_word_mastery(db, user_id: int, word_id: int, mastery_level: MasteryLevel):
+    """Set ``mastery_level`` for one word, creating the row if needed.
+
+    A level change also resets the word's review schedule to the one that
+    level implies. Raises ``ValueError`` if the word does not exist.
+    """
+    _check_word_ids(db, [word_id])
+    lock_user(db, user_id)
+    entry = db.query(UserWord).filter_by(user_id=user_id, word_id=word_id).first()
+    previous = entry.mastery_level if entry else None
+    if not entry:
+        entry = UserWord(user_id=user_id, word_id=word_id, seen_count=0)
+        db.add(entry)
+    entry.mastery_level = mastery_level
+    if previous != mastery_level:
+        for key, value in level_schedule(mastery_level, datetime.utcnow()).items():
+            setattr(entry, key, value)
+    if _is_known(previous) != _is_known(mastery_level):
+        changed = [word_id]
+        apply_vocabulary_changes(
+            db,
+            user_id,
+            learned=changed if _is_known(mastery_level) else [],
+            forgotten=[] if _is_known(mastery_level) else changed,
+        )
+    db.commit()
+    return _user_word_dict(entry, word_dictionary.text(db, word_id))
+
+
+@app.patch('/api/user/words/{word_id}')
+async def update_user_word(
+    word_id: int, upd: UserWordUpdate, db: AsyncSession = Depends(get_db)
+):
+    try:
+        result = await db.run_sync(
+            set_word_mastery, upd.user_id, word_id, upd.mastery_level
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    await invalidate_user_words(upd.user_id, [word_id])
     return result
 
 
 @app.post('/api/user/quiz')
-def submit_quiz(sub: QuizSubmission):
-    with SessionLocal() as db:
-        user = db.get(User, sub.user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        for ans in sub.answers:
-            record_word_interaction(db, sub.user_id, ans.word_id, ans.correct)
+async def submit_quiz(sub: QuizSubmission, db: AsyncSession = Depends(get_db)):
+    if not await db.get(User, sub.user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    try:
+        await db.run_sync(record_word_interactions, sub.user_id, sub.answers)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    await invalidate_user_words(sub.user_id, [a.word_id for a in sub.answers])
     return {"status": "recorded"}
 
 
-@app.get('/api/videos/recommendations')
-def video_recommendations(user_id: int, limit: int = 20):
-    with SessionLocal() as db:
-        subq = (
-            db.query(
-                VideoWord.video_id.label("vid"),
-                func.sum(
-                    case(
-                        (
-                            (UserWord.id.is_(None))
-                            | (UserWord.mastery_level == MasteryLevel.unknown),
-                            1,
-                        ),
-                        else_=0,
-                    )
-                ).label("unknown_count"),
+REVIEW_QUEUE_SIZE = 20
+REVIEW_QUEUE_MAX_SIZE = 500
+
+
+def get_due_words(db, user_id: int, now: datetime, limit: int):
+    """Return ``(UserWord, text)`` for words due by ``now``, most overdue first."""
+    query = (
+        db.query(UserWord)
+        .filter(UserWord.user_id == user_id, UserWord.due_at <= now)
+        .order_by(UserWord.due_at, UserWord.id)
+        .limit(limit)
+    )
+    return _with_texts(db, query.all())
+
+
+@app.get('/api/user/review-queue')
+async def review_queue(
+    user_id: int,
+    limit: int = Query(REVIEW_QUEUE_SIZE, ge=1, le=REVIEW_QUEUE_MAX_SIZE),
+    db: AsyncSession = Depends(get_db),
+):
+    """Return up to ``limit`` words due for review, most overdue first.
+
+    The rows come from a range of the ``(user_id, due_at)`` index, so the
+    cost grows with the words returned, not with the user's vocabulary.
+    Answers go to ``POST /api/user/quiz``, which reschedules them.
+    """
+    rows = await db.run_sync(get_due_words, user_id, datetime.utcnow(), limit)
+    return {
+        "words": [
+            {
+                **_user_word_dict(uw, text),
+                "due_at": uw.due_at.isoformat(),
+                "interval_days": uw.interval_days,
+            }
+            for uw, text in rows
+        ]
+    }
+
+
+# Bulk word-state import: NDJSON lines are applied in chunks of
+# IMPORT_CHUNK_ROWS within a single transaction.
+IMPORT_CHUNK_ROWS = 1000
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "100000"))
+EXPORT_KEYS = ("word_id", "text", "mastery_level", "seen_count", "last_seen_at")
+
+
+def _parse_word_state(line: bytes):
+    """Parse one import line into ``(word_id, text, mastery_level)``."""
+    entry = json.loads(line)
+    if not isinstance(entry, dict):
+        raise ValueError("expected a JSON object")
+    level = entry.get("mastery_level")
+    if isinstance(level, str) and level in MasteryLevel.__members__:
+        level = MasteryLevel[level]
+    elif type(level) is int and level in set(MasteryLevel):
+        level = MasteryLevel(level)
+    else:
+        raise ValueError(f"invalid mastery_level {level!r}")
+    word_id, text = entry.get("word_id"), entry.get("text")
+    if word_id is not None:
+        if type(word_id) is not int:
+            raise ValueError(f"invalid word_id {word_id!r}")
+        return word_id, None, level
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("word_id or text is required")
+    return None, text.strip().lower(), level
+
+
+def import_word_states(db, user_id: int, entries):
+    """Apply one chunk of parsed ``(line, word_id, text, level)`` imports.
+
+    Texts are resolved to ``Word`` ids with one query and missing words are
+    created with one insert; the ``UserWord`` rows are then written with one
+    upsert, with the review schedule their new level implies. A later line
+    for the same word supersedes an earlier one. The caller owns the
+    transaction and must :func:`invalidate_user_words` after committing.
+    Returns one result dict per line.
+    """
+    results = {}
+    texts = {text for _, word_id, text, _ in entries if word_id is None}
+    ids_by_text = resolve_words(db, texts) if texts else {}
+    valid = existing_word_ids(
+        db, [word_id for _, word_id, _, _ in entries if word_id is not None]
+    )
+
+    latest = {}
+    for line, word_id, text, level in entries:
+        if word_id is None:
+            word_id = ids_by_text[text]
+        elif word_id not in valid:
+            results[line] = {
+                "line": line,
+                "word_id": word_id,
+                "status": "error",
+                "error": "unknown word_id",
+            }
+            continue
+        if word_id in latest:
+            earlier = latest[word_id][0]
+            results[earlier] = {"line": earlier, "word_id": word_id, "status": "superseded"}
+        latest[word_id] = (line, level)
+
+    before = {}
+    if latest:
+        lock_user(db, user_id)
+        before = dict(
+            db.query(UserWord.word_id, UserWord.mastery_level)
+            .filter(UserWord.user_id == user_id, UserWord.word_id.in_(latest))
+            .with_for_update()
+            .all()
+        )
+    now = datetime.utcnow()
+    rows = []
+    for word_id, (line, level) in latest.items():
+        if before.get(word_id) == level:
+            status = "unchanged"
+        else:
+            status = "updated" if word_id in before else "created"
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "word_id": word_id,
+                    "seen_count": 0,
+                    "mastery_level": level,
+                    "updated_at": now,
+                    **level_schedule(level, now),
+                }
             )
-            .join(Word, VideoWord.word_id == Word.id)
-            .outerjoin(
-                UserWord,
-                (VideoWord.word_id == UserWord.word_id)
-                & (UserWord.user_id == user_id),
+        results[line] = {"line": line, "word_id": word_id, "status": status}
+    if rows:
+        db.execute(
+            _upsert(
+                db,
+                UserWord.__table__,
+                rows,
+                ["user_id", "word_id"],
+                ["mastery_level", "updated_at", *SCHEDULE_COLUMNS],
             )
-            .group_by(VideoWord.video_id)
-            .subquery()
         )
+        apply_vocabulary_changes(
+            db,
+            user_id,
+            learned=[
+                r["word_id"] for r in rows
+                if _is_known(r["mastery_level"]) and not _is_known(before.get(r["word_id"]))
+            ],
+            forgotten=[
+                r["word_id"] for r in rows
+                if not _is_known(r["mastery_level"]) and _is_known(before.get(r["word_id"]))
+            ],
+        )
+    return [results[line] for line, *_ in entries]
+
+
+async def _ndjson_lines(request: Request):
+    """Yield ``(line_number, line)`` for each non-blank line of the body."""
+    buffer = b""
+    number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if buffer.strip():
+        yield number + 1, buffer
+
+
+@app.post('/api/user/words/import')
+async def import_user_words(
+    user_id: int, request: Request, db: AsyncSession = Depends(get_db)
+):
+    """Set many word states from an NDJSON body in one transaction.
+
+    Each line is ``{"word_id": ...}`` or ``{"text": ...}`` plus a
+    ``mastery_level`` given by name or number; unknown texts become new
+    words. The response is NDJSON: one result per input line in order,
+    then a summary line. Malformed lines are reported and skipped. The
+    body is consumed before results are streamed back, so clients that
+    finish sending before reading cannot deadlock against the server. It
+    is also parsed before the database is touched: a slow upload must not
+    hold the user's lock, or SQLite's write lock, while it arrives.
+    """
+    results, entries = [], []
+    async for number, line in _ndjson_lines(request):
+        if len(entries) + len(results) >= IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=413, detail=f"At most {IMPORT_MAX_ROWS} rows per import"
+            )
+        try:
+            entries.append((number, *_parse_word_state(line)))
+        except ValueError as exc:
+            results.append({"line": number, "status": "error", "error": str(exc)})
+
+    if not await db.get(User, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    for start in range(0, len(entries), IMPORT_CHUNK_ROWS):
+        results.extend(await db.run_sync(
+            import_word_states, user_id, entries[start:start + IMPORT_CHUNK_ROWS]
+        ))
+    await db.commit()
+    touched = {r["word_id"] for r in results if r["status"] in ("created", "updated")}
+    if touched:
+        await invalidate_user_words(user_id, touched)
 
-        videos = (
-            db.query(
-                Video.id,
-                Video.title,
-                Video.thumbnail_url,
-                Video.score,
-                subq.c.unknown_count,
+    results.sort(key=lambda r: r["line"])
+    summary = Counter(r["status"] for r in results)
+
+    async def body():
+        for start in range(0, len(results), IMPORT_CHUNK_ROWS):
+            yield "".join(
+                json.dumps(r) + "\n" for r in results[start:start + IMPORT_CHUNK_ROWS]
             )
-            .join(subq, Video.id == subq.c.vid)
-            .filter(subq.c.unknown_count <= 1)
-            .order_by(Video.score.desc())
+        yield json.dumps({"summary": dict(summary)}) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@app.get('/api/user/words/export')
+async def export_user_words(
+    user_id: int, include_unknown: bool = False, db: AsyncSession = Depends(get_db)
+):
+    """Stream a user's word states as NDJSON that the import endpoint accepts."""
+    if not await db.get(User, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    stmt = (
+        select(
+            UserWord.word_id,
+            type_coerce(UserWord.mastery_level, String),
+            UserWord.seen_count,
+            UserWord.last_seen_at,
+        )
+        .where(UserWord.user_id == user_id)
+        .order_by(UserWord.word_id)
+    )
+    if not include_unknown:
+        stmt = stmt.where(UserWord.mastery_level.in_(KNOWN_LEVELS))
+    return StreamingResponse(
+        _stream_rows(stmt, EXPORT_KEYS, "ndjson", transform=_insert_word_texts),
+        media_type="application/x-ndjson",
+    )
+
+
+def adhoc_unknown_counts(db, user_id: int):
+    """Return ``{video_id: unknown_count}`` computed directly from the joins.
+
+    This is the reference the maintained ``user_video_stats`` table is
+    checked against.
+    """
+    rows = (
+        db.query(
+            VideoWord.video_id,
+            func.sum(
+                case(
+                    (
+                        (UserWord.id.is_(None))
+                        | (UserWord.mastery_level == MasteryLevel.unknown),
+                        1,
+                    ),
+                    else_=0,
+                )
+            ),
+        )
+        .join(Word, VideoWord.word_id == Word.id)
+        .outerjoin(
+            UserWord,
+            (VideoWord.word_id == UserWord.word_id)
+            & (UserWord.user_id == user_id),
+        )
+        .group_by(VideoWord.video_id)
+        .all()
+    )
+    return {vid: int(count) for vid, count in rows}
+
+
+def maintained_unknown_counts(db, user_id: int):
+    """Return ``{video_id: unknown_count}`` read from the maintained tables."""
+    counts = dict(db.query(VideoStat.video_id, VideoStat.word_count).all())
+    counts.update(
+        db.query(UserVideoStat.video_id, UserVideoStat.unknown_count)
+        .filter(UserVideoStat.user_id == user_id)
+        .all()
+    )
+    return counts
+
+
+def check_video_stats(db, user_ids=None):
+    """Return ``(user_id, video_id, expected, actual)`` for every mismatch."""
+    if user_ids is None:
+        user_ids = sorted(
+            {uid for (uid,) in db.query(UserWord.user_id).distinct()}
+            | {uid for (uid,) in db.query(UserVideoStat.user_id).distinct()}
+        )
+    mismatches = []
+    for uid in user_ids:
+        expected = adhoc_unknown_counts(db, uid)
+        actual = maintained_unknown_counts(db, uid)
+        for vid in sorted(expected.keys() | actual.keys()):
+            if expected.get(vid) != actual.get(vid):
+                mismatches.append((uid, vid, expected.get(vid), actual.get(vid)))
+    return mismatches
+
+
+RECOMMENDATION_MAX_NEW_WORDS = 1
+RECOMMENDATION_LIMIT = 20
+RECOMMENDATION_MAX_LIMIT = 1000
+
+
+async def compute_recommendations(
+    db, user_id: int, limit: int, max_new_words: int = RECOMMENDATION_MAX_NEW_WORDS
+):
+    """Videos with at most ``max_new_words`` unknown words for ``user_id``,
+    best scored first."""
+    columns = (Video.id, Video.title, Video.thumbnail_url, Video.score)
+    touched = (
+        select(*columns, UserVideoStat.unknown_count.label("unknown_count"))
+        .join(UserVideoStat, UserVideoStat.video_id == Video.id)
+        .where(
+            UserVideoStat.user_id == user_id,
+            UserVideoStat.unknown_count <= max_new_words,
+        )
+    )
+    untouched = (
+        select(*columns, VideoStat.word_count.label("unknown_count"))
+        .join(VideoStat, VideoStat.video_id == Video.id)
+        .where(
+            VideoStat.word_count <= max_new_words,
+            ~exists().where(
+                UserVideoStat.user_id == user_id,
+                UserVideoStat.video_id == Video.id,
+            ),
+        )
+    )
+    candidates = union_all(touched, untouched).subquery()
+    videos = (
+        await db.execute(
+            select(candidates)
+            .order_by(candidates.c.score.desc(), candidates.c.id)
             .limit(limit)
-            .all()
         )
+    ).all()
 
     return [
         {
@@ -368,43 +1522,417 @@ def video_recommendations(user_id: int, limit: int = 20):
     ]
 
 
+# Recommendations are cached under the user's vocab_version and the
+# catalogue version, read before the result is computed. Any change that
+# could alter a result bumps one of them, so stale entries are never read
+# again and simply expire.
+RECOMMENDATIONS_TTL = 3600
+
+
+async def _recommendation_versions(user_id: int):
+    """Return ``(vocab_version, catalogue_version)``, or ``None`` for an unknown user."""
+    catalogue = select(CatalogueVersion.version).where(CatalogueVersion.id == 1)
+    async with get_sessionmaker()() as db:
+        row = (
+            await db.execute(
+                select(
+                    User.vocab_version,
+                    func.coalesce(catalogue.scalar_subquery(), 0),
+                ).where(User.id == user_id)
+            )
+        ).first()
+    return tuple(row) if row is not None else None
+
+
+def scan_recommendations(db, user_id: int, limit: int, max_new_words: int,
+                         catalogue_version: int):
+    """:func:`compute_recommendations` by walking :data:`video_catalogue`.
+
+    Stops at the ``limit``-th qualifying video instead of reading the
+    user's stats for the whole catalogue, so it is cheap for users with
+    many qualifying videos and slowest for those with few.
+    """
+    video_catalogue.ensure(db, catalogue_version)
+    known = db.execute(
+        select(UserWord.word_id).where(
+            UserWord.user_id == user_id,
+            UserWord.mastery_level != MasteryLevel.unknown,
+        )
+    ).scalars()
+    found, examined = video_catalogue.top(known, limit, max_new_words)
+    recommendation_videos_examined.observe(examined)
+    rows = {
+        v.id: v
+        for v in db.execute(
+            select(Video.id, Video.title, Video.thumbnail_url).where(
+                Video.id.in_([video_id for video_id, _ in found])
+            )
+        )
+    }
+    return [
+        {
+            "id": video_id,
+            "title": rows[video_id].title,
+            "thumbnail_url": rows[video_id].thumbnail_url,
+            "new_word_count": unknown,
+        }
+        for video_id, unknown in found
+        if video_id in rows
+    ]
+
+
+# The catalogue load in progress, if any. Loads run one at a time: the
+# catalogue's thread lock would block the event loop if a second load on it
+# waited for a first one suspended on I/O.
+_catalogue_flight = None
+
+
+def _clear_catalogue_flight(done):
+    global _catalogue_flight
+    if _catalogue_flight is done:
+        _catalogue_flight = None
+
+
+async def _ensure_catalogue(db: AsyncSession, version: int):
+    """Bring :data:`video_catalogue` up to ``version`` through ``db``."""
+    global _catalogue_flight
+    while video_catalogue.version is None or video_catalogue.version < version:
+        flight = _catalogue_flight
+        if flight is None:
+            flight = _catalogue_flight = asyncio.ensure_future(
+                db.run_sync(lambda sync_db: video_catalogue.ensure(sync_db, version))
+            )
+            flight.add_done_callback(_clear_catalogue_flight)
+        await asyncio.shield(flight)
+
+
+async def _load_recommendations(user_id, limit, max_new_words, mode,
+                                catalogue_version=None):
+    async with get_sessionmaker()() as db:
+        if mode != "scan":
+            return await compute_recommendations(db, user_id, limit, max_new_words)
+        if catalogue_version is None:
+            catalogue_version = await db.scalar(
+                select(CatalogueVersion.version).where(CatalogueVersion.id == 1)
+            ) or 0
+        await _ensure_catalogue(db, catalogue_version)
+        return await db.run_sync(
+            lambda sync_db: scan_recommendations(
+                sync_db, user_id, limit, max_new_words, catalogue_version
+            )
+        )
+
+
+@app.get('/api/videos/recommendations')
+async def video_recommendations(
+    user_id: int,
+    limit: int = Query(RECOMMENDATION_LIMIT, ge=1, le=RECOMMENDATION_MAX_LIMIT),
+    max_new_words: int = Query(RECOMMENDATION_MAX_NEW_WORDS, ge=0),
+    mode: Literal["stats", "scan"] = "stats",
+):
+    """Videos with at most ``max_new_words`` words the user does not know.
+
+    ``mode=stats`` reads the maintained per-user unknown counts;
+    ``mode=scan`` walks the videos in score order and stops once ``limit``
+    qualify. Both return the same videos.
+    """
+    versions = await _recommendation_versions(user_id)
+    if versions is None:
+        # No users row to carry a version; nothing would invalidate an entry.
+        return await _load_recommendations(user_id, limit, max_new_words, mode)
+    vocab_version, catalogue_version = versions
+    return await cached_json(
+        f"recommendations:{user_id}:{vocab_version}:{catalogue_version}"
+        f":{mode}:{max_new_words}:{limit}",
+        lambda: _load_recommendations(
+            user_id, limit, max_new_words, mode, catalogue_version
+        ),
+        ex=RECOMMENDATIONS_TTL,
+    )
+
+
+# Precompiled /tokens responses. Each artifact is the ETag on the first line
+# followed by the exact JSON body the streaming endpoint would produce.
+TOKEN_BLOB_DIR = Path(os.getenv("TOKEN_BLOB_DIR", "./data/token_blobs"))
+TOKEN_BLOB_TTL = int(os.getenv("TOKEN_BLOB_TTL", "300"))
+TOKEN_KEYS = ("word_id", "text", "start_sec", "end_sec")
+# Entries expire after TOKEN_BLOB_TTL so that other processes pick up a
+# re-ingested video even though only the local cache is evicted directly.
+token_blob_cache = ByteLRU(
+    max_bytes=int(os.getenv("TOKEN_BLOB_CACHE_BYTES", str(64 * 1024 * 1024)))
+)
+
+
+def _token_rows_stmt():
+    """Token rows without their text; see :func:`_insert_word_texts`."""
+    return select(
+        TranscriptToken.word_id,
+        TranscriptToken.start_sec,
+        TranscriptToken.end_sec,
+    )
+
+
+def _insert_texts(rows, texts):
+    return [(row[0], text, *row[1:]) for row, text in zip(rows, texts)]
+
+
+async def _insert_word_texts(rows):
+    """Put each row's word text after its leading ``word_id``."""
+    return _insert_texts(rows, await word_texts([row[0] for row in rows]))
+
+
+def _token_blob_path(video_id: int, version: int) -> Path:
+    return TOKEN_BLOB_DIR / f"{video_id}.{version}.json"
+
+
+def remove_token_blobs(video_id: int, below=None):
+    """Delete ``video_id``'s artifacts, or only those labelled below ``below``."""
+    for path in TOKEN_BLOB_DIR.glob(f"{video_id}.*.json"):
+        label = path.name.split(".")[1]
+        if below is None or (label.isdigit() and int(label) < below):
+            path.unlink(missing_ok=True)
+
+
+def compile_token_blob(db, video_id: int, version=None):
+    """Write the precompiled ``/tokens`` artifact for ``video_id`` to disk.
+
+    The artifact is labelled with ``version``, a ``catalogue_version`` read
+    before its rows (the current one by default). Ingests bump that in the
+    transaction that replaces a video's tokens, so a compile racing one
+    writes under a label nobody asks for afterwards. Artifacts with older
+    labels are removed. Returns the packed artifact, or ``None`` (removing
+    any stale files) if the video has no tokens.
+    """
+    if version is None:
+        version = catalogue_version(db)
+    count, max_id = db.execute(
+        select(func.count(), func.max(TranscriptToken.id)).where(
+            TranscriptToken.video_id == video_id
+        )
+    ).one()
+    if not count:
+        remove_token_blobs(video_id)
+        return None
+    rows = db.execute(
+        _token_rows_stmt()
+        .where(TranscriptToken.video_id == video_id)
+        .order_by(TranscriptToken.start_sec, TranscriptToken.id)
+    ).all()
+    rows = _insert_texts(rows, word_dictionary.texts(db, [row[0] for row in rows]))
+    body = "[" + ",".join(json.dumps(dict(zip(TOKEN_KEYS, row))) for row in rows) + "]"
+    etag = _etag(TranscriptToken.__tablename__, video_id, count, max_id, None, None, "rows")
+    packed = etag.encode() + b"\n" + body.encode()
+    path = _token_blob_path(video_id, version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(packed)
+    os.replace(tmp, path)
+    remove_token_blobs(video_id, below=version)
+    return packed
+
+
+def _read_token_blob(video_id: int, version: int):
+    # A plain read: the bytes are cached and sent whole, so mapping the
+    # file would only add a copy out of the mapping.
+    try:
+        return _token_blob_path(video_id, version).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+async def load_token_blob(video_id: int):
+    """Return ``(etag, body)`` for ``video_id`` or ``None`` if it has no tokens.
+
+    Looks in the in-process LRU, then Redis, then the on-disk artifact,
+    compiling the artifact from SQL only when it is missing. Redis keys and
+    artifacts are labelled with the ``catalogue_version``, as
+    recommendation keys are, so neither outlives a re-ingest.
+    """
+    blob = token_blob_cache.get(video_id)
+    cache_result("token_blob", blob is not None)
+    if blob is not None:
+        return blob
+    async with get_sessionmaker()() as db:
+        version = await db.run_sync(catalogue_version)
+        r = await get_redis()
+        key = f"video_tokens:{video_id}:{version}"
+        packed = await r.get(key)
+        cache_result("video_tokens", packed is not None)
+        if packed is None:
+            packed = await run_in_threadpool(_read_token_blob, video_id, version)
+            if packed is None:
+                packed = await db.run_sync(compile_token_blob, video_id, version)
+                if packed is None:
+                    return None
+            await r.set(key, packed, ex=86400)
+    etag, _, body = packed.partition(b"\n")
+    blob = (etag.decode(), body)
+    token_blob_cache.set(video_id, blob, len(packed), ttl=TOKEN_BLOB_TTL)
+    return blob
+
+
+async def evict_token_blobs(video_ids):
+    """Drop cached ``/tokens`` artifacts after they were recompiled in place."""
+    async with get_sessionmaker()() as db:
+        version = await db.run_sync(catalogue_version)
+    r = await get_redis()
+    for video_id in video_ids:
+        token_blob_cache.delete(video_id)
+        await r.delete(f"video_tokens:{video_id}:{version}")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _etag(*parts) -> str:
+    return '"%s"' % hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest()
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (t.strip() for t in header.split(","))
+
+
+async def _stream_rows(stmt, keys, layout, chunk_size=1000, transform=None):
+    """Yield the JSON encoding of ``stmt``'s rows as they are fetched.
+
+    ``rows`` produces an array of objects, ``ndjson`` one object per line
+    and ``columnar`` one object of parallel arrays keyed by ``keys``. Each
+    batch of rows is passed through the async ``transform``, if given,
+    before encoding. The generator owns its session because it outlives the
+    request's ``get_db`` dependency.
+    """
+    async with get_sessionmaker()() as db:
+        result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+
+        async def partitions():
+            async for partition in result.partitions():
+                yield await transform(partition) if transform else partition
+
+        if layout == "ndjson":
+            async for partition in partitions():
+                yield "".join(
+                    json.dumps(dict(zip(keys, row)), default=_json_default) + "\n"
+                    for row in partition
+                )
+            return
+        if layout == "columnar":
+            columns = {key: [] for key in keys}
+            async for partition in partitions():
+                for row in partition:
+                    for key, value in zip(keys, row):
+                        columns[key].append(value)
+            yield json.dumps(columns)
+            return
+        yield "["
+        sep = ""
+        async for partition in partitions():
+            yield sep + ",".join(json.dumps(dict(zip(keys, row))) for row in partition)
+            sep = ","
+        yield "]"
+
+
+async def _video_content_response(
+    db,
+    request,
+    model,
+    video_id,
+    stmt,
+    keys,
+    start_sec,
+    end_sec,
+    layout,
+    not_found,
+    transform=None,
+):
+    """Serve a video's immutable timeline rows with ETag revalidation.
+
+    Rows are windowed on ``start_sec <= row.start_sec < end_sec`` so that
+    consecutive windows partition the timeline.
+    """
+    count, max_id = (
+        await db.execute(
+            select(func.count(), func.max(model.id)).where(model.video_id == video_id)
+        )
+    ).one()
+    if not count:
+        raise HTTPException(status_code=404, detail=not_found)
+    etag = _etag(
+        model.__tablename__, video_id, count, max_id, start_sec, end_sec, layout
+    )
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    stmt = stmt.where(model.video_id == video_id)
+    if start_sec is not None:
+        stmt = stmt.where(model.start_sec >= start_sec)
+    if end_sec is not None:
+        stmt = stmt.where(model.start_sec < end_sec)
+    stmt = stmt.order_by(model.start_sec, model.id)
+    return StreamingResponse(
+        _stream_rows(stmt, keys, layout, transform=transform),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
 @app.get('/api/videos/{video_id}/transcript')
-def video_transcript(video_id: int):
-    with SessionLocal() as db:
-        rows = (db.query(VideoTranscript)
-                .filter(VideoTranscript.video_id == video_id)
-                .order_by(VideoTranscript.start_sec)
-                .all())
-        if not rows:
-            raise HTTPException(status_code=404, detail="Transcript not found")
-        return [
-            {
-                "text": r.text,
-                "start_sec": r.start_sec,
-                "end_sec": r.end_sec,
-            }
-            for r in rows
-        ]
+async def video_transcript(
+    video_id: int,
+    request: Request,
+    start_sec: Optional[int] = None,
+    end_sec: Optional[int] = None,
+    layout: Literal["rows", "columnar"] = Query("rows", alias="format"),
+    db: AsyncSession = Depends(get_db),
+):
+    return await _video_content_response(
+        db,
+        request,
+        VideoTranscript,
+        video_id,
+        select(VideoTranscript.text, VideoTranscript.start_sec, VideoTranscript.end_sec),
+        ("text", "start_sec", "end_sec"),
+        start_sec,
+        end_sec,
+        layout,
+        "Transcript not found",
+    )
 
 
 @app.get('/api/videos/{video_id}/tokens')
-def video_tokens(video_id: int):
-    with SessionLocal() as db:
-        rows = (
-            db.query(TranscriptToken, Word.text)
-            .join(Word, TranscriptToken.word_id == Word.id)
-            .filter(TranscriptToken.video_id == video_id)
-            .order_by(TranscriptToken.start_sec)
-            .all()
-        )
-        if not rows:
+async def video_tokens(
+    video_id: int,
+    request: Request,
+    start_sec: Optional[int] = None,
+    end_sec: Optional[int] = None,
+    layout: Literal["rows", "columnar"] = Query("rows", alias="format"),
+    db: AsyncSession = Depends(get_db),
+):
+    if start_sec is None and end_sec is None and layout == "rows":
+        blob = await load_token_blob(video_id)
+        if blob is None:
             raise HTTPException(status_code=404, detail="Tokens not found")
-        return [
-            {
-                "word_id": t.word_id,
-                "text": text,
-                "start_sec": t.start_sec,
-                "end_sec": t.end_sec,
-            }
-            for t, text in rows
-        ]
+        etag, body = blob
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+    return await _video_content_response(
+        db,
+        request,
+        TranscriptToken,
+        video_id,
+        _token_rows_stmt(),
+        TOKEN_KEYS,
+        start_sec,
+        end_sec,
+        layout,
+        "Tokens not found",
+        transform=_insert_word_texts,
+    )
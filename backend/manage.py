@@ -0,0 +1,144 @@
+"""Maintenance commands for the FastAPI backend database."""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from backend.ingest import CHUNK_VIDEOS, ingest_videos
+from backend.main import (
+    SessionLocal,
+    TranscriptToken,
+    check_video_stats,
+    compile_token_blob,
+    engine,
+    evict_token_blobs,
+    rebuild_video_stats,
+    recompute_schedules,
+    seed_data,
+)
+from backend.migrations import upgrade
+
+
+def main() -> None:
+    """Command line interface for backend maintenance tasks."""
+
+    parser = argparse.ArgumentParser(description="Backend maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_p = subparsers.add_parser(
+        "init-db", help="Create the schema or apply pending revisions"
+    )
+    init_p.add_argument(
+        "--seed",
+        action="store_true",
+        default=os.getenv("SEED_DATA") == "true",
+        help="Insert sample data into an empty database (default: $SEED_DATA)",
+    )
+
+    rebuild_p = subparsers.add_parser(
+        "rebuild-video-stats",
+        help="Recompute the per-user unknown-word counts used for recommendations",
+    )
+    rebuild_p.add_argument(
+        "--video-id", type=int, nargs="+", help="Only rebuild these videos"
+    )
+
+    check_p = subparsers.add_parser(
+        "check-video-stats",
+        help="Compare the maintained counts against the ad-hoc join query",
+    )
+    check_p.add_argument(
+        "--user-id", type=int, nargs="+", help="Only check these users"
+    )
+
+    schedules_p = subparsers.add_parser(
+        "recompute-schedules",
+        help="Reset review schedules to the ones implied by mastery levels",
+    )
+    schedules_p.add_argument(
+        "--user-id", type=int, nargs="+", help="Only reset these users"
+    )
+
+    ingest_p = subparsers.add_parser(
+        "ingest-videos",
+        help="Load videos with timed transcript segments from NDJSON",
+    )
+    ingest_p.add_argument("path", help="NDJSON file, one video per line, or - for stdin")
+    ingest_p.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_VIDEOS,
+        help="Videos written per transaction",
+    )
+
+    blobs_p = subparsers.add_parser(
+        "compile-token-blobs",
+        help="Precompile /tokens responses and evict cached copies",
+    )
+    blobs_p.add_argument(
+        "--video-id", type=int, nargs="+", help="Only compile these videos"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "init-db":
+        applied = upgrade(engine)
+        for version, description in applied:
+            print(f"Applied revision {version}: {description}")
+        if not applied:
+            print("Schema up to date")
+        if args.seed:
+            seed_data()
+        return
+
+    if args.command == "ingest-videos":
+        # One loop for every chunk: the Redis client is bound to it.
+        loop = asyncio.new_event_loop()
+        source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+        try:
+            report = ingest_videos(
+                source,
+                chunk_size=args.chunk_size,
+                on_chunk=lambda ids: loop.run_until_complete(evict_token_blobs(ids)),
+            )
+        finally:
+            loop.close()
+            if source is not sys.stdin:
+                source.close()
+        for number, message in report.errors:
+            print(f"line {number}: {message}", file=sys.stderr)
+        print(report.summary())
+        return
+
+    with SessionLocal() as db:
+        if args.command == "rebuild-video-stats":
+            rebuild_video_stats(db, video_ids=args.video_id)
+            print("Video stats rebuilt")
+        elif args.command == "check-video-stats":
+            mismatches = check_video_stats(db, user_ids=args.user_id)
+            for user_id, video_id, expected, actual in mismatches:
+                print(
+                    f"user {user_id} video {video_id}: "
+                    f"expected {expected}, stored {actual}"
+                )
+            if mismatches:
+                print(f"{len(mismatches)} mismatches found")
+                sys.exit(1)
+            print("Video stats consistent")
+        elif args.command == "recompute-schedules":
+            count = recompute_schedules(db, user_ids=args.user_id)
+            db.commit()
+            print(f"Recomputed {count} review schedules")
+        elif args.command == "compile-token-blobs":
+            video_ids = args.video_id or [
+                vid for (vid,) in db.query(TranscriptToken.video_id).distinct()
+            ]
+            for video_id in video_ids:
+                compile_token_blob(db, video_id)
+            asyncio.run(evict_token_blobs(video_ids))
+            print(f"Compiled token blobs for {len(video_ids)} videos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Prometheus-style metrics for the backend.
+
+Counters, gauges and histograms are kept in process and rendered in the
+Prometheus text exposition format by ``GET /metrics``. Recording is a dict
+lookup and an add under a lock, cheap enough to stay on in production
+(``benchmarks/bench_metrics_overhead.py`` measures it).
+
+:class:`MetricsMiddleware` times each request by route template and
+:func:`instrument_engine` counts and times every SQL statement, attributing
+it to the request that ran it. Statements slower than
+``SLOW_QUERY_MS`` are logged to the ``backend.sql`` logger.
+"""
+
+from bisect import bisect_left
+import contextvars
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event
+
+slow_query_log = logging.getLogger("backend.sql")
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_MS", "200")) / 1000
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """The metrics rendered together by one ``/metrics`` scrape."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label combination."""
+
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def set_total(self, *labels, value):
+        """Copy in a running total that another object keeps."""
+        with self._lock:
+            self._values[labels] = value
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    """A value that can be set as well as increased."""
+
+    kind = "gauge"
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative ``le`` buckets per label set.
+
+    Each observation increments one bucket; the running totals are only
+    summed when the histogram is rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS,
+                 registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *labels):
+        state = self._values.get(labels)
+        return sum(state[0]) if state else 0
+
+    def samples(self):
+        with self._lock:
+            values = sorted(
+                (labels, (list(counts), total))
+                for labels, (counts, total) in self._values.items()
+            )
+        for labels, (counts, total) in values:
+            running = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                running += bucket
+                le = _labels(self.labelnames, labels, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{le} {running}"
+            plain = _labels(self.labelnames, labels)
+            yield f"{self.name}_sum{plain} {_number(total)}"
+            yield f"{self.name}_count{plain} {running}"
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template.",
+    ["method", "route"],
+)
+http_requests = Counter(
+    "http_requests_total", "Requests by route template and status.",
+    ["method", "route", "status"],
+)
+http_request_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+http_request_db_time = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request.", ["route"]
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "SQL statement latency.", ["engine"]
+)
+db_slow_queries = Counter(
+    "db_slow_queries_total",
+    "SQL statements slower than SLOW_QUERY_MS.",
+    ["engine"],
+)
+recommendation_videos_examined = Histogram(
+    "recommendation_videos_examined",
+    "Videos a scan-mode recommendation examined before it had enough.",
+    buckets=(10, 100, 1_000, 10_000, 100_000),
+)
+cache_requests = Counter(
+    "cache_requests_total", "Cache lookups by key family and result.",
+    ["cache", "result"],
+)
+cache_backend = Gauge(
+    "cache_backend", "1 for the cache backend in use.", ["backend"]
+)
+cache_fallbacks = Counter(
+    "cache_fallbacks_total",
+    "Times Redis was unreachable and the in-process cache was used instead.",
+)
+
+memory_cache_lookups = Counter(
+    "memory_cache_lookups_total",
+    "In-process fallback cache lookups by result.",
+    ["result"],
+)
+memory_cache_removals = Counter(
+    "memory_cache_removals_total",
+    "Entries the in-process fallback cache dropped, for space or on expiry.",
+    ["reason"],
+)
+memory_cache_entries = Gauge(
+    "memory_cache_entries", "Entries held by the in-process fallback cache."
+)
+memory_cache_bytes = Gauge(
+    "memory_cache_bytes", "Approximate bytes held by the in-process fallback cache."
+)
+
+
+def record_memory_cache(stats):
+    """Copy :meth:`backend.cache.MemoryCache.stats` in before a scrape."""
+    memory_cache_lookups.set_total("hit", value=stats["hits"])
+    memory_cache_lookups.set_total("miss", value=stats["misses"])
+    memory_cache_removals.set_total("evicted", value=stats["evictions"])
+    memory_cache_removals.set_total("expired", value=stats["expirations"])
+    memory_cache_entries.set(value=stats["entries"])
+    memory_cache_bytes.set(value=stats["bytes"])
+
+
+def cache_result(cache, hit):
+    """Count one lookup of the ``cache`` key family."""
+    cache_requests.inc(cache, "hit" if hit else "miss")
+
+
+# [statements, seconds] for the request being served, shared with the
+# threads and greenlets that run its queries.
+_request_db = contextvars.ContextVar("request_db", default=None)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL use per route.
+
+    Routes are labelled by their template (``/api/videos/{video_id}/tokens``)
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        db = [0, 0.0]
+        token = _request_db.set(db)
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db.reset(token)
+            route = scope.get("route")
+            label = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            http_request_duration.observe(elapsed, method, label)
+            http_requests.inc(method, label, str(status))
+            http_request_queries.observe(db[0], label)
+            http_request_db_time.observe(db[1], label)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def instrument_engine(engine, name):
+    """Time every statement run on ``engine`` (a sync ``Engine``)."""
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        db_query_duration.observe(elapsed, name)
+        db = _request_db.get()
+        if db is not None:
+            db[0] += 1
+            db[1] += elapsed
+        if elapsed >= SLOW_QUERY_SECONDS:
+            db_slow_queries.inc(name)
+            slow_query_log.warning(
+                "slow query (%.1f ms) on %s: %s", elapsed * 1000, name, statement
+            )
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    return engine
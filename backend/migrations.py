@@ -0,0 +1,221 @@
+"""Schema revisions for the backend database.
+
+``python -m backend.manage init-db`` applies them. A database with no
+tables is created straight from the models and stamped at the latest
+revision; an existing one runs every revision newer than the version
+recorded in ``schema_version``. Revisions run in one transaction each and
+must tolerate objects that the models already created.
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    column,
+    func,
+    inspect,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.orm import Session
+
+from backend.main import (
+    Base,
+    rebuild_video_stats,
+    rebuild_video_word_sets,
+    recompute_schedules,
+)
+
+schema_version = Table(
+    "schema_version", MetaData(), Column("version", Integer, nullable=False)
+)
+
+
+def _baseline(conn):
+    """Tables as ``backend.main`` used to create them at import time."""
+    Base.metadata.create_all(conn)
+
+
+def _create_indexes(conn, *names):
+    indexes = {
+        index.name: index
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+    }
+    for name in names:
+        indexes[name].create(conn, checkfirst=True)
+
+
+def _dedupe_user_words(conn):
+    """Collapse duplicate ``(user_id, word_id)`` rows into one per pair.
+
+    The most recently seen row wins and keeps the summed ``seen_count``.
+    Returns the number of rows deleted.
+    """
+    # Only the columns that exist as of this revision.
+    uw = table(
+        "user_words",
+        column("id"),
+        column("user_id"),
+        column("word_id"),
+        column("seen_count"),
+        column("last_seen_at"),
+    )
+    groups = conn.execute(
+        select(uw.c.user_id, uw.c.word_id)
+        .group_by(uw.c.user_id, uw.c.word_id)
+        .having(func.count() > 1)
+    ).all()
+    removed = 0
+    for user_id, word_id in groups:
+        rows = conn.execute(
+            select(uw.c.id, uw.c.seen_count, uw.c.last_seen_at)
+            .where(uw.c.user_id == user_id, uw.c.word_id == word_id)
+            .order_by(uw.c.last_seen_at.desc().nulls_last(), uw.c.id.desc())
+        ).all()
+        keep, *drop = rows
+        conn.execute(
+            uw.update()
+            .where(uw.c.id == keep.id)
+            .values(seen_count=sum(r.seen_count or 0 for r in rows))
+        )
+        conn.execute(uw.delete().where(uw.c.id.in_([r.id for r in drop])))
+        removed += len(drop)
+    return removed
+
+
+def _composite_indexes(conn):
+    """Unique ``(user_id, word_id)`` on ``user_words`` plus the composite
+    indexes behind the per-user and per-video lookups."""
+    if _dedupe_user_words(conn):
+        # Duplicates were counted twice in the maintained per-user stats.
+        # The rebuild also writes tables that later revisions introduce.
+        for name in ("catalogue_version", "video_word_sets"):
+            Base.metadata.tables[name].create(conn, checkfirst=True)
+        rebuild_video_stats(Session(bind=conn))
+    _create_indexes(
+        conn,
+        "uq_user_words_user_word",
+        "ix_user_words_user_mastery",
+        "ix_video_words_video_word",
+        "ix_transcript_tokens_video_word",
+        "ix_transcript_tokens_video_start",
+        "ix_video_transcripts_video_start",
+    )
+    # Superseded by the leading column of the composite indexes.
+    for name in (
+        "ix_user_words_user_id",
+        "ix_video_words_video_id",
+        "ix_transcript_tokens_video_id",
+    ):
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def _add_column(conn, table, column, ddl):
+    """``ALTER TABLE`` unless the models already created the column."""
+    if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        return True
+    return False
+
+
+def _user_words_updated_at(conn):
+    """``user_words.updated_at`` for delta syncs of ``/api/user/words``."""
+    if _add_column(
+        conn,
+        "user_words",
+        "updated_at",
+        "TIMESTAMP NOT NULL DEFAULT '1970-01-01 00:00:00'",
+    ):
+        conn.execute(text(
+            "UPDATE user_words SET updated_at = COALESCE(last_seen_at, CURRENT_TIMESTAMP)"
+        ))
+    _create_indexes(conn, "ix_user_words_user_updated")
+
+
+def _user_words_schedule(conn):
+    """SM-2 review schedule columns on ``user_words`` and the due-date index."""
+    added = [
+        _add_column(conn, "user_words", name, ddl)
+        for name, ddl in (
+            ("ease", "FLOAT NOT NULL DEFAULT 2.5"),
+            ("interval_days", "INTEGER NOT NULL DEFAULT 0"),
+            ("repetitions", "INTEGER NOT NULL DEFAULT 0"),
+            ("due_at", "TIMESTAMP NOT NULL DEFAULT '1970-01-01 00:00:00'"),
+        )
+    ]
+    if any(added):
+        recompute_schedules(Session(bind=conn))
+    _create_indexes(conn, "ix_user_words_user_due")
+
+
+def _recommendation_versions(conn):
+    """``users.vocab_version`` and the ``catalogue_version`` counter that key
+    cached recommendations."""
+    _add_column(conn, "users", "vocab_version", "INTEGER NOT NULL DEFAULT 0")
+    Base.metadata.tables["catalogue_version"].create(conn, checkfirst=True)
+
+
+def _video_word_sets(conn):
+    """``video_word_sets``, encoded from the existing ``video_words``."""
+    Base.metadata.tables["video_word_sets"].create(conn, checkfirst=True)
+    rebuild_video_word_sets(Session(bind=conn))
+
+
+def _video_stats(conn):
+    """Fill ``video_stats`` and ``user_video_stats``, which the baseline
+    created empty next to existing videos and vocabularies."""
+    rebuild_video_stats(Session(bind=conn))
+
+
+# (version, description, upgrade function), in order. Append only.
+REVISIONS = [
+    (1, "baseline schema", _baseline),
+    (2, "composite indexes and unique user_words pairs", _composite_indexes),
+    (3, "user_words.updated_at", _user_words_updated_at),
+    (4, "user_words review schedule", _user_words_schedule),
+    (5, "recommendation cache versions", _recommendation_versions),
+    (6, "encoded video word sets", _video_word_sets),
+    (7, "video stats for existing data", _video_stats),
+]
+
+HEAD = REVISIONS[-1][0]
+
+
+def current_version(conn):
+    """Return the applied revision, or ``None`` for an unversioned database."""
+    if not inspect(conn).has_table("schema_version"):
+        return None
+    return conn.scalar(select(schema_version.c.version))
+
+
+def _stamp(conn, version):
+    conn.execute(schema_version.delete())
+    conn.execute(schema_version.insert().values(version=version))
+
+
+def upgrade(engine):
+    """Bring the schema up to ``HEAD`` and return the revisions applied."""
+    with engine.begin() as conn:
+        version = current_version(conn)
+        if version is None:
+            fresh = not inspect(conn).get_table_names()
+            schema_version.create(conn)
+            if fresh:
+                Base.metadata.create_all(conn)
+                _stamp(conn, HEAD)
+                return [(v, d) for v, d, _ in REVISIONS]
+            _stamp(conn, 0)
+            version = 0
+
+    applied = []
+    for number, description, apply in REVISIONS:
+        if number <= version:
+            continue
+        with engine.begin() as conn:
+            apply(conn)
+            _stamp(conn, number)
+        applied.append((number, description))
+    return applied
@@ -0,0 +1,120 @@
+"""Password hashing on a bounded pool of worker processes.
+
+bcrypt is deliberately slow, so hashing and verification run outside the
+request worker. When more than ``max_pending`` operations are queued or
+running, new ones are rejected with 503 and ``Retry-After`` instead of
+piling up behind the pool. A pool broken by a dying worker is replaced
+and the operation retried once.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import threading
+
+from fastapi import HTTPException
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "64"))
+HASH_RETRY_AFTER = int(os.getenv("HASH_RETRY_AFTER", "1"))
+
+_contexts = {}
+
+
+def _context(rounds):
+    from passlib.context import CryptContext
+
+    ctx = _contexts.get(rounds)
+    if ctx is None:
+        ctx = _contexts[rounds] = CryptContext(
+            schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds
+        )
+    return ctx
+
+
+def hash_password(password, rounds):
+    return _context(rounds).hash(password)
+
+
+def verify_password(password, hashed, rounds):
+    """Return ``(valid, new_hash)``; ``new_hash`` is set when the stored
+    hash uses a different cost than ``rounds`` and should be replaced."""
+    ctx = _context(rounds)
+    if not ctx.verify(password, hashed):
+        return False, None
+    if ctx.needs_update(hashed):
+        return True, ctx.hash(password)
+    return True, None
+
+
+class PasswordHasher:
+    """Async front end for :func:`hash_password` and :func:`verify_password`."""
+
+    def __init__(
+        self,
+        rounds=BCRYPT_ROUNDS,
+        workers=HASH_WORKERS,
+        max_pending=HASH_MAX_PENDING,
+        retry_after=HASH_RETRY_AFTER,
+    ):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _discard(self, pool):
+        # Once a worker dies the executor rejects all work; the next
+        # :meth:`_pool` call starts a fresh one.
+        with self._lock:
+            if self._executor is pool:
+                self._executor = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            self._discard(pool)
+            return await loop.run_in_executor(self._pool(), fn, *args)
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many concurrent password operations",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self.pending += 1
+        try:
+            return await self._run(fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password):
+        return await self._submit(hash_password, password, self.rounds)
+
+    async def verify(self, password, hashed):
+        return await self._submit(verify_password, password, hashed, self.rounds)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,36 @@
+"""SM-2 review scheduling for ``UserWord`` rows."""
+
+from datetime import timedelta
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+# SM-2 grades recall from 0 to 5; quizzes only report right or wrong.
+CORRECT_GRADE = 4
+INCORRECT_GRADE = 1
+# Schedule implied by each ``MasteryLevel`` value for rows without review
+# history: as if reviewed correctly ``level`` times in a row.
+LEVEL_INTERVALS = (0, 1, 6)
+
+
+def review(ease: float, interval_days: int, repetitions: int, correct: bool):
+    """Return ``(ease, interval_days, repetitions)`` after one answer."""
+    grade = CORRECT_GRADE if correct else INCORRECT_GRADE
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    if grade < 3:
+        return ease, 1, 0
+    if repetitions < len(LEVEL_INTERVALS) - 1:
+        interval_days = LEVEL_INTERVALS[repetitions + 1]
+    else:
+        interval_days = round(interval_days * ease)
+    return ease, interval_days, repetitions + 1
+
+
+def level_schedule(level: int, reviewed_at):
+    """Return the schedule columns for a row set directly to ``level``."""
+    interval_days = LEVEL_INTERVALS[level]
+    return {
+        "ease": INITIAL_EASE,
+        "interval_days": interval_days,
+        "repetitions": int(level),
+        "due_at": reviewed_at + timedelta(days=interval_days),
+    }
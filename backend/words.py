@@ -0,0 +1,200 @@
+"""Process-wide dictionary of the append-only ``words`` table."""
+
+from array import array
+import threading
+
+from sqlalchemy import select
+
+# Rows fetched per round trip while loading new words.
+LOAD_BATCH = 10_000
+
+
+class WordDictionary:
+    """Compact two-way mapping between ``words.id`` and ``words.text``.
+
+    Texts are stored back to back in one UTF-8 buffer and indexed by id
+    through an offsets array, so each word costs its encoded length plus a
+    few bytes rather than a ``str`` and a ``dict`` entry. The text to id
+    index is an open-addressing table over the same buffer and is only
+    built once something looks a word up by text.
+
+    ``words`` is append-only, so the highest id loaded is the dictionary's
+    version: a lookup that misses loads the rows above it. Ids that commit
+    out of order (a sequence value taken before ours but committed after
+    our load) are fetched individually and kept aside.
+
+    Methods that take ``db`` accept a synchronous ``Session`` and read
+    through a separate connection from its engine, so words inserted by
+    the session's own uncommitted transaction are never cached. The other
+    methods never touch the database.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._blob = bytearray()
+            # The text of id ``i`` is ``_blob[_offsets[i]:_offsets[i + 1]]``;
+            # ids that do not exist (yet) have an empty span.
+            self._offsets = array("I", [0])
+            self._late = {}
+            self._late_ids = {}
+            self._slots = None
+            self._count = 0
+
+    @property
+    def version(self) -> int:
+        """Highest word id loaded so far."""
+        return len(self._offsets) - 2 if len(self._offsets) > 1 else 0
+
+    def __len__(self):
+        return self._count
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the buffers, excluding out-of-order stragglers."""
+        slots = self._slots
+        return (
+            len(self._blob)
+            + self._offsets.itemsize * len(self._offsets)
+            + (slots.itemsize * len(slots) if slots is not None else 0)
+        )
+
+    def _text(self, word_id):
+        offsets = self._offsets
+        if 0 < word_id < len(offsets) - 1:
+            start, end = offsets[word_id], offsets[word_id + 1]
+            if start != end:
+                return self._blob[start:end].decode()
+        return self._late.get(word_id)
+
+    def _find(self, key: bytes):
+        slots = self._slots
+        mask = len(slots) - 1
+        i = hash(key) & mask
+        blob, offsets = self._blob, self._offsets
+        while True:
+            word_id = slots[i]
+            if not word_id:
+                return None
+            if blob[offsets[word_id]:offsets[word_id + 1]] == key:
+                return word_id
+            i = (i + 1) & mask
+
+    def _place(self, slots, key: bytes, word_id: int):
+        mask = len(slots) - 1
+        i = hash(key) & mask
+        while slots[i]:
+            i = (i + 1) & mask
+        slots[i] = word_id
+
+    def _build_index(self, capacity):
+        slots = array("I", [0]) * capacity
+        blob, offsets = self._blob, self._offsets
+        for word_id in range(1, len(offsets) - 1):
+            start, end = offsets[word_id], offsets[word_id + 1]
+            if start != end:
+                self._place(slots, bytes(blob[start:end]), word_id)
+        self._slots = slots
+
+    def _append(self, rows):
+        blob, offsets = self._blob, self._offsets
+        index = self._slots is not None
+        for word_id, text in rows:
+            if word_id < len(offsets) - 1:
+                self._add_late(word_id, text)
+                continue
+            encoded = text.encode()
+            if len(offsets) < word_id + 1:
+                offsets.extend([len(blob)] * (word_id + 1 - len(offsets)))
+            # Extend the buffer before publishing the offset so lock-free
+            # readers never see a span past the end of the buffer.
+            blob += encoded
+            offsets.append(len(blob))
+            self._count += 1
+            if index:
+                if 2 * self._count > len(self._slots):
+                    self._build_index(2 * len(self._slots))
+                else:
+                    self._place(self._slots, encoded, word_id)
+
+    def _refresh(self, conn):
+        rows = conn.execute(
+            select(self.table.c.id, self.table.c.text)
+            .where(self.table.c.id > self.version)
+            .order_by(self.table.c.id)
+            .execution_options(yield_per=LOAD_BATCH)
+        )
+        for partition in rows.partitions(LOAD_BATCH):
+            self._append(partition)
+
+    def _add_late(self, word_id, text):
+        if self._text(word_id) is None:
+            self._count += 1
+            self._late[word_id] = text
+            self._late_ids[text] = word_id
+
+    def _load_late(self, conn, column, values):
+        values = list(values)
+        for start in range(0, len(values), LOAD_BATCH):
+            for word_id, text in conn.execute(
+                select(self.table.c.id, self.table.c.text).where(
+                    column.in_(values[start:start + LOAD_BATCH])
+                )
+            ):
+                self._add_late(word_id, text)
+
+    def lookup(self, word_ids):
+        """Return the loaded text for each id, or ``None`` where not loaded."""
+        return [self._text(word_id) for word_id in word_ids]
+
+    def texts(self, db, word_ids):
+        """Return the text for each id, or ``None`` for ids that do not exist."""
+        found = self.lookup(word_ids)
+        if None in found:
+            with self._lock, db.get_bind().connect() as conn:
+                self._refresh(conn)
+                missing = {
+                    word_id
+                    for word_id, text in zip(word_ids, self.lookup(word_ids))
+                    if text is None and word_id <= self.version
+                }
+                if missing:
+                    self._load_late(conn, self.table.c.id, missing)
+            found = self.lookup(word_ids)
+        return found
+
+    def text(self, db, word_id: int):
+        return self.texts(db, [word_id])[0]
+
+    def find(self, texts):
+        """Return ``{text: id}`` for the loaded words among ``texts``."""
+        if self._slots is None:
+            with self._lock:
+                if self._slots is None:
+                    capacity = 1024
+                    while capacity < 2 * self._count:
+                        capacity *= 2
+                    self._build_index(capacity)
+        found = {}
+        for text in texts:
+            word_id = self._find(text.encode()) or self._late_ids.get(text)
+            if word_id is not None:
+                found[text] = word_id
+        return found
+
+    def ids(self, db, texts):
+        """Return ``{text: id}`` for the words among ``texts`` that exist."""
+        texts = set(texts)
+        found = self.find(texts)
+        if len(found) < len(texts):
+            with self._lock, db.get_bind().connect() as conn:
+                self._refresh(conn)
+                found = self.find(texts)
+                missing = texts - found.keys()
+                if missing:
+                    self._load_late(conn, self.table.c.text, missing)
+                    found.update(self.find(missing))
+        return found
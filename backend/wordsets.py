@@ -0,0 +1,59 @@
+"""Compact encoding of a video's distinct word ids.
+
+A set is stored as its sorted ids, delta-encoded into little-endian
+unsigned 16-bit values. This is the layout of a roaring bitmap's array
+container: about two bytes a word, against the dozens a ``video_words`` row
+and its index entries take. Ids are positive and distinct, so no delta is
+0. A 0 marks an escape instead: the two values that follow hold the high
+and low halves of a delta too large for 16 bits.
+
+Decoding is ``array`` and ``itertools.accumulate``, both in C, unless the
+set contains an escape.
+"""
+
+from array import array
+from itertools import accumulate
+import sys
+
+_MAX_DELTA = 0xFFFF
+
+
+def encode(word_ids) -> bytes:
+    """Encode the distinct ids ``word_ids``, in any order.
+
+    Ids must be positive: a first id of 0 would encode as the escape.
+    """
+    word_ids = sorted(set(word_ids))
+    if word_ids and word_ids[0] <= 0:
+        raise ValueError(f"word ids must be positive, got {word_ids[0]}")
+    deltas = array("H")
+    previous = 0
+    for word_id in word_ids:
+        delta = word_id - previous
+        if delta > _MAX_DELTA:
+            deltas.extend((0, delta >> 16, delta & _MAX_DELTA))
+        else:
+            deltas.append(delta)
+        previous = word_id
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return deltas.tobytes()
+
+
+def decode(blob: bytes) -> array:
+    """Return the ids encoded in ``blob`` as a sorted ``array("I")``."""
+    deltas = array("H", blob)
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    if 0 not in deltas:
+        return array("I", accumulate(deltas))
+    word_ids = array("I")
+    previous = 0
+    values = iter(deltas)
+    for delta in values:
+        if not delta:
+            delta = next(values) << 16 | next(values)
+        previous += delta
+        word_ids.append(previous)
+    return word_ids
+
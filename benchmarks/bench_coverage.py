@@ -0,0 +1,73 @@
+"""Compare ``best_match`` against the precomputed coverage index.
+
+Usage::
+
+    python benchmarks/bench_coverage.py --sizes 10000 100000
+
+Transcripts are synthetic, Zipf-distributed over a 20k word vocabulary, and
+live in an in-memory SQLite database.
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from langdb.coverage import CoverageIndex
+from langdb.ingest import create_table
+from langdb.recommend_known import best_match, top_matches
+
+
+def synthetic_content(n_docs: int, vocab: list[str], seed: int = 0) -> sqlite3.Connection:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    conn = sqlite3.connect(":memory:")
+    create_table(conn)
+    conn.executemany(
+        "INSERT INTO content (title, transcript, grade_level) VALUES (?, ?, ?)",
+        (
+            (f"video{i}", " ".join(rng.choices(vocab, weights, k=rng.randint(50, 200))), 0.0)
+            for i in range(n_docs)
+        ),
+    )
+    return conn
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--known", type=int, default=2000, help="Known-word count")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    vocab = [f"w{i}" for i in range(20_000)]
+    known = set(vocab[: args.known])
+    print(f"{'docs':>8} {'build s':>8} {'scan ms':>9} {'index ms':>9} {'top10 ms':>9}")
+    for size in args.sizes:
+        conn = synthetic_content(size, vocab)
+        build_s, index = timed(lambda: CoverageIndex.build(conn), 1)
+        scan_s, expected = timed(lambda: best_match(conn, known), args.repeat)
+        index_s, got = timed(lambda: best_match(conn, known, index=index), args.repeat)
+        top_s, _ = timed(lambda: top_matches(conn, known, 10, index), args.repeat)
+        assert got == expected, "index disagrees with best_match"
+        print(
+            f"{size:>8} {build_s:>8.2f} {scan_s * 1000:>9.1f} "
+            f"{index_s * 1000:>9.1f} {top_s * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
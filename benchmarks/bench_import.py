@@ -0,0 +1,80 @@
+"""Bulk word-state import against one PATCH per word.
+
+Usage::
+
+    python benchmarks/bench_import.py --words 20000 --patch-sample 500
+
+Runs the app in process on a throwaway SQLite database. Half of the
+imported words already exist in the catalogue and half are created by the
+import. The PATCH time is measured on a sample and extrapolated.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+
+async def run(n_words, patch_sample):
+    from backend.main import SessionLocal, User, Word, app, engine
+    from backend.migrations import upgrade
+
+    upgrade(engine)
+    with SessionLocal() as db:
+        users = [User(username=f"bench{i}", password_hash="x") for i in range(2)]
+        existing = [Word(text=f"existing-{i}") for i in range(n_words // 2)]
+        db.add_all(users + existing)
+        db.commit()
+        import_user, patch_user = (u.id for u in users)
+        existing_ids = [w.id for w in existing]
+
+    lines = [{"word_id": w, "mastery_level": "learning"} for w in existing_ids] + [
+        {"text": f"new-{i}", "mastery_level": "mastered"}
+        for i in range(n_words - len(existing_ids))
+    ]
+    body = "\n".join(json.dumps(line) for line in lines)
+
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        app=app, base_url="http://bench", timeout=None
+    ) as client:
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/user/words/import", params={"user_id": import_user}, content=body
+        )
+        import_s = time.perf_counter() - start
+        summary = json.loads(response.text.splitlines()[-1])["summary"]
+
+        start = time.perf_counter()
+        for word_id in existing_ids[:patch_sample]:
+            await client.patch(
+                f"/api/user/words/{word_id}",
+                json={"user_id": patch_user, "mastery_level": 1},
+            )
+        patch_s = (time.perf_counter() - start) / patch_sample * n_words
+
+    print(f"import {n_words} words: {import_s:.2f}s ({n_words / import_s:.0f} rows/s) {summary}")
+    print(f"{n_words} PATCH calls (extrapolated from {patch_sample}): {patch_s:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=20000)
+    parser.add_argument("--patch-sample", type=int, default=500)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-import-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmpdir}/bench.db")
+    os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1")
+    asyncio.run(run(args.words, args.patch_sample))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Throughput and peak memory of ``manage.py ingest-videos``.
+
+Usage::
+
+    python benchmarks/bench_ingest_videos.py --sizes 1000 10000 50000
+
+Each size is loaded into a fresh SQLite database by a separate process so
+its peak RSS is its own. Videos are synthetic and generated lazily: 20-60
+segments of 5-15 words drawn from a Zipf-distributed 50k word vocabulary.
+Peak memory should stay flat as the catalogue grows; only the chunk being
+written is held at once.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import string
+import subprocess
+import sys
+import tempfile
+from itertools import accumulate
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+
+def synthetic_videos(n_videos: int, seed: int = 0):
+    rng = random.Random(seed)
+    vocab = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+        for _ in range(50_000)
+    ]
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    for video_id in range(1, n_videos + 1):
+        segments, at = [], 0
+        for _ in range(rng.randint(20, 60)):
+            words = rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(5, 15))
+            length = rng.randint(2, 6)
+            segments.append(
+                {"text": " ".join(words) + ".", "start_sec": at, "end_sec": at + length}
+            )
+            at += length
+        yield json.dumps(
+            {"id": video_id, "title": f"video {video_id}", "segments": segments}
+        )
+
+
+def run_one(size: int, chunk_size: int) -> None:
+    tmpdir = tempfile.mkdtemp(prefix="bench-ingest-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/bench.db"
+    os.environ["TOKEN_BLOB_DIR"] = f"{tmpdir}/token_blobs"
+    from backend.ingest import ingest_videos
+    from backend.main import engine
+    from backend.migrations import upgrade
+
+    upgrade(engine)
+    report = ingest_videos(synthetic_videos(size), chunk_size=chunk_size)
+    peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        json.dumps(
+            {
+                "videos": report.videos,
+                "tokens": report.tokens,
+                "seconds": report.seconds,
+                "peak_mib": peak_mib,
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--one", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.one:
+        run_one(args.one, args.chunk_size)
+        return
+
+    print(f"{'videos':>7} {'tokens':>10} {'seconds':>8} {'videos/s':>9} {'peak MiB':>9}")
+    for size in args.sizes:
+        out = subprocess.run(
+            [sys.executable, __file__, "--one", str(size), "--chunk-size", str(args.chunk_size)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(out.splitlines()[-1])
+        print(
+            f"{result['videos']:>7} {result['tokens']:>10} {result['seconds']:>8.1f} "
+            f"{result['videos'] / result['seconds']:>9.0f} {result['peak_mib']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""/health latency while the server is flooded with logins.
+
+Usage::
+
+    python benchmarks/bench_login_storm.py --concurrency 64 --duration 10
+
+Starts ``uvicorn backend.main:app`` on a fresh SQLite database, probes
+``/health`` on its own, then again while ``--concurrency`` clients loop
+on ``POST /login``. With hashing on the process pool the probe latency
+should stay flat; excess logins are shed with 503 rather than queued.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+PASSWORD = "correct horse battery staple"
+
+
+def seed(n_users, rounds):
+    from backend.main import SessionLocal, User, engine
+    from backend.migrations import upgrade
+    from backend.passwords import hash_password
+
+    upgrade(engine)
+    hashed = hash_password(PASSWORD, rounds)
+    with SessionLocal() as db:
+        db.add_all(User(username=f"storm{i}", password_hash=hashed) for i in range(n_users))
+        db.commit()
+
+
+async def probe(client, deadline, interval):
+    latencies = []
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def storm(client, n_users, deadline, statuses, offset):
+    i = offset
+    while time.perf_counter() < deadline:
+        creds = {"username": f"storm{i % n_users}", "password": PASSWORD}
+        try:
+            r = await client.post("/login", json=creds)
+            statuses[r.status_code] += 1
+        except httpx.TransportError:
+            statuses["error"] += 1
+        i += 1
+
+
+def summarize(label, latencies):
+    values = sorted(latencies)
+    p99 = values[max(0, int(len(values) * 0.99) - 1)]
+    print(f"{label:<14} {len(values):>6} {statistics.median(values) * 1000:>8.1f} "
+          f"{p99 * 1000:>8.1f}")
+
+
+async def drive(url, n_users, concurrency, duration, interval):
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        idle = await probe(client, time.perf_counter() + duration / 2, interval)
+
+        statuses = Counter()
+        deadline = time.perf_counter() + duration
+        results = await asyncio.gather(
+            probe(client, deadline, interval),
+            *(storm(client, n_users, deadline, statuses, i) for i in range(concurrency)),
+        )
+
+    print(f"{'/health':<14} {'count':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    summarize("idle", idle)
+    summarize("login storm", results[0])
+    logins = sum(statuses.values())
+    print(f"{logins} logins in {duration:.0f}s ({logins / duration:.0f}/s): "
+          + ", ".join(f"{k}={v}" for k, v in sorted(statuses.items(), key=str)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--interval", type=float, default=0.02)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="login-storm-")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmpdir}/storm.db",
+        REDIS_URL=os.getenv("REDIS_URL", "redis://127.0.0.1:1"),
+        TOKEN_BLOB_DIR=f"{tmpdir}/token_blobs",
+        BCRYPT_ROUNDS=str(args.rounds),
+    )
+    os.environ.update(env)
+    seed(args.users, args.rounds)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app",
+         "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"{url}/health")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        asyncio.run(drive(url, args.users, args.concurrency, args.duration, args.interval))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
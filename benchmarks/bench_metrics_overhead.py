@@ -0,0 +1,129 @@
+"""Cost of the metrics instrumentation per request and per SQL statement.
+
+Usage::
+
+    python benchmarks/bench_metrics_overhead.py --requests 20000 --queries 50000
+
+Requests are driven straight through the ASGI interface, without a server
+or network, against two copies of a trivial FastAPI app: one bare, one
+wrapped in ``MetricsMiddleware``. Statements are ``SELECT 1`` on in-memory
+SQLite engines with and without ``instrument_engine``. Both are close to
+the cheapest real work the backend does, so the relative overhead shown is
+an upper bound.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from backend.metrics import (
+    Counter,
+    Histogram,
+    MetricsMiddleware,
+    Registry,
+    instrument_engine,
+)
+
+
+def make_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app, n: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(i):
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/items/{i}",
+            "raw_path": f"/items/{i}".encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [],
+            "client": ("127.0.0.1", 1),
+            "server": ("127.0.0.1", 80),
+        }
+
+    for i in range(200):
+        await app(scope(i), receive, send)
+    start = time.perf_counter()
+    for i in range(n):
+        await app(scope(i), receive, send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def per_statement(engine, n: int) -> float:
+    with engine.connect() as conn:
+        stmt = text("SELECT 1")
+        for _ in range(200):
+            conn.execute(stmt)
+        start = time.perf_counter()
+        for _ in range(n):
+            conn.execute(stmt)
+        return (time.perf_counter() - start) / n * 1e6
+
+
+def best(fn, repeat):
+    return min(fn() for _ in range(repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    registry = Registry()
+    counter = Counter("c", "c", ["a"], registry=registry)
+    histogram = Histogram("h", "h", ["a"], registry=registry)
+    n = 1_000_000
+    inc_ns = timeit.timeit(lambda: counter.inc("x"), number=n) / n * 1e9
+    observe_ns = timeit.timeit(lambda: histogram.observe(0.003, "x"), number=n) / n * 1e9
+    print(f"Counter.inc       {inc_ns:8.0f} ns")
+    print(f"Histogram.observe {observe_ns:8.0f} ns")
+
+    bare_app, wrapped_app = make_app(False), make_app(True)
+    bare = best(lambda: asyncio.run(drive(bare_app, args.requests)), args.repeat)
+    wrapped = best(lambda: asyncio.run(drive(wrapped_app, args.requests)), args.repeat)
+    print(
+        f"request           {bare:8.1f} us bare, {wrapped:.1f} us instrumented "
+        f"(+{wrapped - bare:.1f} us, {100 * (wrapped / bare - 1):+.1f}%)"
+    )
+
+    plain_engine = create_engine("sqlite://")
+    timed_engine = instrument_engine(create_engine("sqlite://"), "bench")
+    plain = best(lambda: per_statement(plain_engine, args.queries), args.repeat)
+    timed = best(lambda: per_statement(timed_engine, args.queries), args.repeat)
+    print(
+        f"SELECT 1          {plain:8.1f} us bare, {timed:.1f} us instrumented "
+        f"(+{timed - plain:.1f} us, {100 * (timed / plain - 1):+.1f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare per-answer and batched quiz ingestion latency.
+
+Usage::
+
+    python benchmarks/bench_quiz.py --sizes 10 50 200 1000 --repeat 5
+
+Runs against a throwaway SQLite database unless ``DATABASE_URL`` is set.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-quiz-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmpdir}/bench.db")
+
+    from backend.main import (
+        SessionLocal,
+        QuizAnswer,
+        User,
+        Word,
+        record_word_interaction,
+        record_word_interactions,
+        engine,
+    )
+    from backend.migrations import upgrade
+
+    upgrade(engine)
+    with SessionLocal() as db:
+        words = [Word(text=f"bench-{i}") for i in range(max(args.sizes))]
+        db.add_all(words)
+        db.commit()
+        word_ids = [w.id for w in words]
+
+    def new_user(tag):
+        with SessionLocal() as db:
+            user = User(username=f"{tag}-{time.perf_counter_ns()}", password_hash="x")
+            db.add(user)
+            db.commit()
+            return user.id
+
+    print(f"{'answers':>8} {'per-answer ms':>14} {'batched ms':>11} {'speedup':>8}")
+    for size in args.sizes:
+        answers = [
+            QuizAnswer(word_id=word_ids[i % len(word_ids)], correct=i % 3 != 0)
+            for i in range(size)
+        ]
+        loop_times, batch_times = [], []
+        for _ in range(args.repeat):
+            user_id = new_user("loop")
+            with SessionLocal() as db:
+                start = time.perf_counter()
+                for ans in answers:
+                    record_word_interaction(db, user_id, ans.word_id, ans.correct)
+                loop_times.append(time.perf_counter() - start)
+
+            user_id = new_user("batch")
+            with SessionLocal() as db:
+                start = time.perf_counter()
+                record_word_interactions(db, user_id, answers)
+                batch_times.append(time.perf_counter() - start)
+
+        loop_ms = statistics.median(loop_times) * 1000
+        batch_ms = statistics.median(batch_times) * 1000
+        print(f"{size:>8} {loop_ms:>14.2f} {batch_ms:>11.2f} {loop_ms / batch_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare per-text Flesch–Kincaid scoring against the batch scorer.
+
+Usage::
+
+    python benchmarks/bench_readability.py --sizes 1000 10000 50000
+
+Transcripts are synthetic: 50-400 words drawn from a Zipf-distributed 20k
+word vocabulary, with a sentence break after roughly one word in twelve.
+``cold`` starts the batch scorer with an empty syllable memo; ``warm``
+reruns it with the memo filled.
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from langdb import readability
+from langdb.readability import flesch_kincaid_grade, flesch_kincaid_grades
+
+
+def synthetic_transcripts(n_docs: int, vocab: list[str], seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    docs = []
+    for _ in range(n_docs):
+        words = rng.choices(vocab, weights, k=rng.randint(50, 400))
+        docs.append(
+            " ".join(w + ("." if rng.random() < 1 / 12 else "") for w in words)
+        )
+    return docs
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocab = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+        for _ in range(20_000)
+    ]
+    print(f"{'docs':>7} {'per-text s':>11} {'cold s':>8} {'warm s':>8} {'speedup':>8}")
+    for size in args.sizes:
+        docs = synthetic_transcripts(size, vocab)
+        expected, reference_s = timed(lambda: [flesch_kincaid_grade(d) for d in docs])
+        readability._syllables.clear()
+        cold, cold_s = timed(lambda: flesch_kincaid_grades(docs))
+        warm, warm_s = timed(lambda: flesch_kincaid_grades(docs))
+        assert cold == warm == expected
+        print(
+            f"{size:>7} {reference_s:>11.2f} {cold_s:>8.2f} {warm_s:>8.2f} "
+            f"{reference_s / warm_s:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Measure nearest-grade lookup latency with and without the grade index.
+
+Usage::
+
+    python benchmarks/bench_recommend.py --rows 100000 --queries 200
+
+Seeds N synthetic rows into a temporary ``content`` table, times the old
+``ORDER BY ABS(grade_level - ?)`` full scan, then times
+``get_recommendation`` against the indexed table.
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from langdb.ingest import create_table
+from langdb.recommend import get_recommendation
+
+LEGACY_SQL = (
+    "SELECT title, transcript, grade_level, ABS(grade_level - ?) as diff "
+    "FROM content ORDER BY diff ASC LIMIT 1"
+)
+
+
+def latency_ms(fn, levels):
+    samples = []
+    for level in levels:
+        start = time.perf_counter()
+        fn(level)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    db_path = Path(tempfile.mkdtemp(prefix="bench-recommend-")) / "content.db"
+    with sqlite3.connect(db_path) as conn:
+        create_table(conn)
+        conn.execute("DROP INDEX idx_content_grade_level")
+        conn.executemany(
+            "INSERT INTO content (title, transcript, grade_level) VALUES (?, ?, ?)",
+            ((f"video{i}", "x" * 200, rng.uniform(0, 14)) for i in range(args.rows)),
+        )
+        conn.commit()
+        levels = [rng.uniform(-1, 13) for _ in range(args.queries)]
+
+        before = latency_ms(lambda lv: conn.execute(LEGACY_SQL, (lv + 1,)).fetchone(), levels)
+        create_table(conn)
+        after = latency_ms(lambda lv: get_recommendation(lv, conn), levels)
+
+    print(f"rows: {args.rows}, queries: {args.queries}")
+    print(f"full scan    p50 {before[0]:8.3f} ms   p99 {before[1]:8.3f} ms")
+    print(f"index probes p50 {after[0]:8.3f} ms   p99 {after[1]:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
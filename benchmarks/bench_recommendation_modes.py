@@ -0,0 +1,132 @@
+"""Latency of ``mode=stats`` against ``mode=scan`` recommendations.
+
+Usage::
+
+    python benchmarks/bench_recommendation_modes.py --videos 10000 30000 100000
+
+For each catalogue size a synthetic backend database is generated (see
+:mod:`synthetic`) with every user's ``user_video_stats`` filled in. Both
+modes are then timed uncached on the same users, and the results are
+checked to agree. Scan mode also reports the one-off catalogue load, its
+memory and how many videos each request examined.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from synthetic import Scale, fill_backend, vocabulary  # noqa: E402
+
+
+def _percentiles(durations):
+    ms = sorted(d * 1000 for d in durations)
+    return ms[len(ms) // 2], ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+
+
+def run(videos, args, workdir):
+    scale = Scale(
+        users=args.users, words=args.words, videos=videos,
+        tokens_per_video=args.tokens_per_video, known_words=args.known_words,
+    )
+    path = workdir / f"backend-{videos}.db"
+    started = time.perf_counter()
+    fill_backend(path, scale, vocabulary(scale.words, args.seed), args.seed)
+    print(f"\n{videos} videos: generated in {time.perf_counter() - started:.0f}s")
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from backend import main
+
+    sync_sessions = sessionmaker(bind=create_engine(f"sqlite:///{path}"))
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async_sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+    main.video_catalogue.clear()
+
+    with sync_sessions() as db:
+        started = time.perf_counter()
+        main.video_catalogue.ensure(db, videos)
+        load = time.perf_counter() - started
+    print(
+        f"  catalogue load {load:.1f}s, "
+        f"{main.video_catalogue.memory_bytes() / 2**20:.1f} MiB"
+    )
+
+    users = np.random.default_rng(args.seed).integers(1, args.users + 1, args.requests)
+
+    async def stats_mode():
+        durations, results = [], []
+        async with async_sessions() as db:
+            for user_id in users:
+                start = time.perf_counter()
+                results.append(await main.compute_recommendations(
+                    db, int(user_id), args.limit, args.max_new_words
+                ))
+                durations.append(time.perf_counter() - start)
+        return durations, results
+
+    stats_durations, stats_results = asyncio.run(stats_mode())
+    asyncio.run(async_engine.dispose())
+
+    scan_durations, scan_results, examined = [], [], []
+    observe = main.recommendation_videos_examined.observe
+    main.recommendation_videos_examined.observe = lambda value, *labels: examined.append(value)
+    try:
+        with sync_sessions() as db:
+            for user_id in users:
+                start = time.perf_counter()
+                scan_results.append(main.scan_recommendations(
+                    db, int(user_id), args.limit, args.max_new_words, videos
+                ))
+                scan_durations.append(time.perf_counter() - start)
+    finally:
+        main.recommendation_videos_examined.observe = observe
+
+    if stats_results != scan_results:
+        raise SystemExit("stats and scan modes disagree")
+    for name, durations in (("stats", stats_durations), ("scan", scan_durations)):
+        p50, p95 = _percentiles(durations)
+        print(f"  {name:<5} p50 {p50:8.2f} ms  p95 {p95:8.2f} ms")
+    returned = [len(r) for r in scan_results]
+    print(
+        f"  scan examined median {statistics.median(examined):.0f} "
+        f"(p95 {sorted(examined)[int(len(examined) * 0.95)]}) of {videos} videos; "
+        f"{sum(n == args.limit for n in returned)}/{len(returned)} requests filled "
+        f"the limit"
+    )
+    path.unlink()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, nargs="+", default=[10_000, 30_000, 100_000])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--words", type=int, default=50_000)
+    parser.add_argument("--tokens-per-video", type=int, default=150)
+    parser.add_argument("--known-words", type=int, default=800, help="median learner vocabulary")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--max-new-words", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-recommend-"))
+    # backend.main reads its settings at import; the benchmark uses its own engines.
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/unused.db")
+    os.environ.setdefault("TOKEN_BLOB_DIR", str(workdir / "token_blobs"))
+    for videos in args.videos:
+        run(videos, args, workdir)
+
+
+if __name__ == "__main__":
+    main()
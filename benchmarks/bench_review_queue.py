@@ -0,0 +1,94 @@
+"""Review-queue latency as a user's vocabulary grows.
+
+Usage::
+
+    python benchmarks/bench_review_queue.py --sizes 1000 10000 100000
+
+Each user has ``size`` scheduled words of which ``--due`` percent are due.
+The queue query should cost the same at every size; the ``scan`` column
+times the same question answered without the ``(user_id, due_at)`` index
+for comparison.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+
+def timed(fn, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def due_in(rng, due_percent):
+    """Days until due: overdue by up to a day, or due within two months."""
+    if rng.random() * 100 < due_percent:
+        return -rng.random()
+    return rng.uniform(1, 60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--due", type=float, default=5.0, help="percent of words due")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-review-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmpdir}/bench.db")
+    from sqlalchemy import insert, text
+    from backend.main import SessionLocal, UserWord, Word, engine, get_due_words
+    from backend.migrations import upgrade
+
+    upgrade(engine)
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        db.execute(insert(Word), [{"text": f"w{i}"} for i in range(max(args.sizes))])
+        for user_id, size in enumerate(args.sizes, start=1):
+            db.execute(
+                insert(UserWord),
+                [
+                    {
+                        "user_id": user_id,
+                        "word_id": word_id,
+                        "seen_count": 1,
+                        "due_at": now + timedelta(days=due_in(rng, args.due)),
+                    }
+                    for word_id in range(1, size + 1)
+                ],
+            )
+        db.commit()
+
+        print(f"{'words':>8} {'due':>7} {'queue ms':>9} {'scan ms':>8}")
+        for user_id, size in enumerate(args.sizes, start=1):
+            queue_ms = timed(lambda: get_due_words(db, user_id, now, args.limit))
+            scan = text(
+                "SELECT * FROM user_words NOT INDEXED WHERE user_id = :u"
+                " AND due_at <= :now ORDER BY due_at, id LIMIT :limit"
+            )
+            scan_ms = timed(
+                lambda: db.execute(
+                    scan, {"u": user_id, "now": str(now), "limit": args.limit}
+                ).all(),
+                repeat=5,
+            )
+            due = db.query(UserWord).filter(
+                UserWord.user_id == user_id, UserWord.due_at <= now
+            ).count()
+            print(f"{size:>8} {due:>7} {queue_ms:>9.2f} {scan_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Cold-start cost of the backend: import time and time to first /health.
+
+Usage::
+
+    python benchmarks/bench_startup.py --runs 5 --budget-ms 1500
+
+Each run imports ``backend.main`` in a fresh interpreter under
+``python -X importtime`` and then starts uvicorn, timing how long it takes
+until ``/health`` answers. Prints medians and the slowest top-level
+imports; with ``--budget-ms`` it exits non-zero when time to first
+``/health`` exceeds the budget, so CI can track regressions.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def import_profile(env):
+    """Return total import time and per top-level package cumulative times (µs)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            total += int(cumulative)
+        if depth <= 1:
+            packages[name.strip()] = int(cumulative)
+    return total, packages
+
+
+def time_to_health(env, port):
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                time.sleep(0.01)
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited before serving /health")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--budget-ms", type=float)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-startup-")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmpdir}/startup.db",
+        REDIS_URL=os.getenv("REDIS_URL", "redis://127.0.0.1:1"),
+        TOKEN_BLOB_DIR=f"{tmpdir}/token_blobs",
+        PYTHONPATH=str(ROOT),
+    )
+
+    imports, health = [], []
+    packages = defaultdict(list)
+    for _ in range(args.runs):
+        total, per_package = import_profile(env)
+        imports.append(total / 1000)
+        for name, micros in per_package.items():
+            packages[name].append(micros / 1000)
+        health.append(time_to_health(env, args.port) * 1000)
+
+    print(f"import backend.main   median {statistics.median(imports):8.1f} ms")
+    print(f"first /health         median {statistics.median(health):8.1f} ms")
+    print(f"\nslowest imports (median cumulative ms):")
+    slowest = sorted(packages.items(), key=lambda kv: -statistics.median(kv[1]))
+    for name, values in slowest[: args.top]:
+        print(f"  {name:<40} {statistics.median(values):8.1f}")
+
+    if args.budget_ms is not None and statistics.median(health) > args.budget_ms:
+        print(f"\nfirst /health exceeds the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
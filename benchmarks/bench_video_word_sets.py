@@ -0,0 +1,213 @@
+"""Memory and speed of encoded ``video_word_sets`` against ``video_words``.
+
+Usage::
+
+    python benchmarks/bench_video_word_sets.py --videos 10000 100000
+
+For each catalogue size, Zipf-distributed word sets are written to two
+SQLite files: one holding ``video_words`` with its indexes, the other
+``video_word_sets``. The benchmark reports:
+
+- bytes on disk per (video, word) pair, after ``VACUUM``;
+- encoding ``video_word_sets`` from ``video_words``;
+- reading every set back into memory from either table;
+- the unknown-word count of every video for one learner, as a SQL
+  anti-join over ``video_words``, by decoding the blobs and intersecting
+  in Python, and through the loaded :class:`VideoCatalogue`.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from array import array
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from synthetic import Zipf  # noqa: E402
+
+INSERT_CHUNK = 50_000
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def generate(videos, args):
+    rng = np.random.default_rng(args.seed)
+    zipf = Zipf(args.words)
+    lengths = np.clip(
+        rng.lognormal(np.log(args.tokens_per_video), 0.5, videos).astype(np.int64),
+        20, 5 * args.tokens_per_video,
+    )
+    for video_id, length in enumerate(lengths, start=1):
+        yield video_id, array("I", np.unique(zipf.sample(rng, int(length)) + 1).tolist())
+
+
+def run(videos, args, workdir):
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+    from backend import wordsets
+    from backend.catalogue import VideoCatalogue
+    from backend.main import (
+        Base, Video, VideoStat, VideoWord, VideoWordSet, Word,
+        rebuild_video_word_sets,
+    )
+
+    tables = [Word.__table__, Video.__table__, VideoStat.__table__]
+    rows_engine = create_engine(f"sqlite:///{workdir}/rows-{videos}.db")
+    sets_engine = create_engine(f"sqlite:///{workdir}/sets-{videos}.db")
+    # The rows file gets video_word_sets too, to encode into; it is dropped
+    # before sizes are measured.
+    Base.metadata.create_all(
+        rows_engine, tables=tables + [VideoWord.__table__, VideoWordSet.__table__]
+    )
+    Base.metadata.create_all(sets_engine, tables=tables + [VideoWordSet.__table__])
+
+    started = time.perf_counter()
+    sets = dict(generate(videos, args))
+    pairs = sum(len(s) for s in sets.values())
+    for engine in (rows_engine, sets_engine):
+        with engine.begin() as conn:
+            conn.execute(
+                Word.__table__.insert(),
+                [{"id": i, "text": f"w{i}"} for i in range(1, args.words + 1)],
+            )
+            conn.execute(Video.__table__.insert(), [
+                {"id": v, "title": "", "thumbnail_url": "", "score": v % 1000}
+                for v in sets
+            ])
+            conn.execute(VideoStat.__table__.insert(), [
+                {"video_id": v, "word_count": len(s)} for v, s in sets.items()
+            ])
+    with rows_engine.begin() as conn:
+        batch = []
+        for video_id, word_ids in sets.items():
+            batch.extend({"video_id": video_id, "word_id": w} for w in word_ids)
+            if len(batch) >= INSERT_CHUNK:
+                conn.execute(VideoWord.__table__.insert(), batch)
+                batch = []
+        conn.execute(VideoWord.__table__.insert(), batch)
+    print(
+        f"\n{videos} videos, {pairs} (video, word) pairs: "
+        f"generated in {time.perf_counter() - started:.0f}s"
+    )
+
+    with Session(rows_engine) as db:
+        encode_seconds, _ = timed(lambda: rebuild_video_word_sets(db))
+        encoded = db.execute(
+            VideoWordSet.__table__.select().order_by(VideoWordSet.video_id)
+        ).all()
+        db.rollback()
+    with sets_engine.begin() as conn:
+        conn.execute(VideoWordSet.__table__.insert(), [
+            {"video_id": v, "word_ids": b} for v, b in encoded
+        ])
+    print(f"  encode from video_words  {encode_seconds:7.2f} s")
+
+    sizes = {}
+    with rows_engine.begin() as conn:
+        conn.execute(text("DROP TABLE video_word_sets"))
+    for name, engine in (("video_words", rows_engine), ("video_word_sets", sets_engine)):
+        with engine.connect() as conn:
+            conn.execute(text("DROP TABLE words"))
+            conn.commit()
+            conn.exec_driver_sql("VACUUM")
+        engine.dispose()
+        sizes[name] = os.path.getsize(engine.url.database)
+    for name, size in sizes.items():
+        print(f"  {name:<16} on disk {size / 2**20:8.1f} MiB, {size / pairs:5.1f} B/pair")
+
+    def load_rows():
+        with rows_engine.connect() as conn:
+            result = conn.execute(text(
+                "SELECT video_id, word_id FROM video_words ORDER BY video_id"
+            ))
+            return {
+                video_id: array("I", map(itemgetter(1), group))
+                for video_id, group in groupby(result, key=itemgetter(0))
+            }
+
+    def load_sets():
+        with sets_engine.connect() as conn:
+            return {
+                video_id: wordsets.decode(blob)
+                for video_id, blob in conn.execute(text(
+                    "SELECT video_id, word_ids FROM video_word_sets"
+                ))
+            }
+
+    rows_seconds, from_rows = timed(load_rows)
+    sets_seconds, from_sets = timed(load_sets)
+    assert from_rows == from_sets
+    print(f"  load all from rows       {rows_seconds:7.2f} s")
+    print(f"  load all from sets       {sets_seconds:7.2f} s")
+    blob_bytes = sum(len(b) for _, b in encoded)
+    array_bytes = sum(4 * len(a) for a in from_sets.values())
+    print(
+        f"  in memory: blobs {blob_bytes / 2**20:.1f} MiB, "
+        f"uint32 arrays {array_bytes / 2**20:.1f} MiB"
+    )
+
+    catalogue = VideoCatalogue(Video.__table__, VideoStat.__table__, VideoWordSet.__table__)
+    with Session(sets_engine) as db:
+        catalogue_seconds, _ = timed(lambda: catalogue.ensure(db, 1))
+    print(
+        f"  VideoCatalogue load      {catalogue_seconds:7.2f} s, "
+        f"{catalogue.memory_bytes() / 2**20:.1f} MiB"
+    )
+
+    rng = np.random.default_rng(args.seed + 1)
+    known = sorted(set((Zipf(args.words).sample(rng, 4 * args.known_words) + 1).tolist()))
+    known = known[:args.known_words]
+    with rows_engine.begin() as conn:
+        conn.execute(text("CREATE TEMP TABLE known (word_id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO known VALUES (:w)"), [{"w": w} for w in known])
+        sql_seconds, sql_counts = timed(lambda: dict(conn.execute(text(
+            "SELECT video_id, count(*) FROM video_words"
+            " WHERE word_id NOT IN (SELECT word_id FROM known) GROUP BY video_id"
+        )).all()))
+    known_set = set(known)
+    blobs_seconds, blob_counts = timed(lambda: {
+        video_id: len(ids) - len(known_set.intersection(ids))
+        for video_id, blob in encoded
+        for ids in (wordsets.decode(blob),)
+    })
+    scan_seconds, (found, _) = timed(
+        lambda: catalogue.top(known, videos, args.tokens_per_video * 5)
+    )
+    assert {v: n for v, n in blob_counts.items() if n} == sql_counts
+    assert dict(found) == blob_counts
+    print(f"  unknown counts, SQL anti-join      {1000 * sql_seconds:8.1f} ms")
+    print(f"  unknown counts, decode + intersect {1000 * blobs_seconds:8.1f} ms")
+    print(f"  unknown counts, VideoCatalogue     {1000 * scan_seconds:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--words", type=int, default=200_000)
+    parser.add_argument("--tokens-per-video", type=int, default=300)
+    parser.add_argument("--known-words", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-word-sets-"))
+    # backend.main reads its settings at import; the benchmark uses its own engines.
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/unused.db")
+    os.environ.setdefault("TOKEN_BLOB_DIR", str(workdir / "token_blobs"))
+    for videos in args.videos:
+        run(videos, args, workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Requests per second on the Flask ``/recommend`` route.
+
+Usage::
+
+    python benchmarks/bench_webapp_recommend.py --threads 1 4 --duration 5
+
+Requests go over HTTP to Werkzeug's threaded server, which starts a
+thread for every request. ``fresh`` reproduces the old routes: a new
+rollback-journal connection for every database access, two per request.
+``reused`` is the app as shipped, with WAL connections taken from a pool
+and returned when each request ends. The connections still open after
+each run are reported, so a leak would show. ``--writer`` adds a thread
+that keeps an exclusive ingest-style write transaction open for most of
+the run, which stalls ``fresh`` readers and not ``reused`` ones.
+"""
+
+import argparse
+import http.client
+import logging
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from werkzeug.serving import make_server
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from langdb.ingest import create_table as create_content_table
+from langdb.manage_words import add_words, create_table as create_user_table
+from webapp import app as webapp
+
+
+class FreshConnections:
+    """Stand-in for the manager that connects on every call, as before."""
+
+    open_connections = None
+
+    def get(self, path):
+        return sqlite3.connect(path)
+
+    def release(self):
+        pass
+
+
+def make_dbs(directory: Path, n_docs: int, journal_mode: str) -> tuple[Path, Path]:
+    directory.mkdir()
+    content, users = directory / "content.db", directory / "user_words.db"
+    rng = random.Random(0)
+    for path in (content, users):
+        with sqlite3.connect(path) as conn:
+            conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    with sqlite3.connect(content) as conn:
+        create_content_table(conn)
+        conn.executemany(
+            "INSERT INTO content (title, transcript, grade_level) VALUES (?, ?, ?)",
+            (
+                (f"doc{i}", f"transcript {i}", rng.uniform(0, 16))
+                for i in range(n_docs)
+            ),
+        )
+    with sqlite3.connect(users) as conn:
+        create_user_table(conn)
+        add_words(conn, [f"word{i}" for i in range(200)])
+    return content, users
+
+
+def hold_writes(path: Path, stop: threading.Event) -> None:
+    conn = sqlite3.connect(path)
+    while not stop.is_set():
+        conn.execute("BEGIN EXCLUSIVE")
+        conn.execute(
+            "INSERT INTO content (title, transcript, grade_level) VALUES ('w', 'w', 1)"
+        )
+        time.sleep(0.2)
+        conn.commit()
+        time.sleep(0.01)
+    conn.close()
+
+
+def run(threads: int, duration: float, writer_db: Path | None) -> tuple[float, int]:
+    stop = threading.Event()
+    counts = [0] * threads
+    errors = [0] * threads
+    server = make_server("127.0.0.1", 0, webapp.app, threaded=True)
+    serving = threading.Thread(target=server.serve_forever)
+    serving.start()
+
+    def client(slot: int) -> None:
+        rng = random.Random(slot)
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        while not stop.is_set():
+            conn = http.client.HTTPConnection("127.0.0.1", server.port)
+            body = urlencode({"level": f"{rng.uniform(0, 14):.2f}"})
+            conn.request("POST", "/recommend", body, headers)
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            if response.status == 200:
+                counts[slot] += 1
+            else:
+                errors[slot] += 1
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    if writer_db is not None:
+        workers.append(threading.Thread(target=hold_writes, args=(writer_db, stop)))
+    for worker in workers:
+        worker.start()
+    time.sleep(duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    server.shutdown()
+    serving.join()
+    return sum(counts) / duration, sum(errors)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--docs", type=int, default=50_000)
+    parser.add_argument("--writer", action="store_true")
+    args = parser.parse_args()
+
+    webapp.app.logger.disabled = True
+    logging.getLogger("werkzeug").disabled = True
+    tmpdir = Path(tempfile.mkdtemp(prefix="bench-webapp-"))
+    modes = {
+        "fresh": (FreshConnections(), make_dbs(tmpdir / "fresh", args.docs, "DELETE")),
+        "reused": (webapp.ConnectionManager(), make_dbs(tmpdir / "reused", args.docs, "WAL")),
+    }
+    print(f"{'mode':>7} {'threads':>7} {'req/s':>8} {'errors':>7} {'open':>5}")
+    for name, (connections, (content, users)) in modes.items():
+        webapp.connections = connections
+        webapp.CONTENT_DB, webapp.USER_DB = content, users
+        webapp._initialised = False
+        for threads in args.threads:
+            rps, errors = run(threads, args.duration, content if args.writer else None)
+            still_open = connections.open_connections
+            print(
+                f"{name:>7} {threads:>7} {rps:>8.0f} {errors:>7} "
+                f"{'-' if still_open is None else still_open:>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Memory and lookup cost of the word dictionary against a plain ``dict``.
+
+Usage::
+
+    python benchmarks/bench_word_dictionary.py --words 1000000
+
+Words are synthetic lowercase strings of 3-12 letters in a throwaway
+SQLite database. Each structure is built twice: once for timing, and once
+under ``tracemalloc`` for its memory growth, which excludes the database
+driver's own buffers.
+"""
+
+import argparse
+import gc
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from backend.main import Word
+from backend.words import WordDictionary
+
+
+def synthetic_words(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 12))))
+    return list(words)
+
+
+def measured(build):
+    """Run ``build`` once timed and once traced.
+
+    ``build`` calls its argument between its two phases. Returns the traced
+    run's result, the seconds spent in each phase, and the bytes allocated
+    after the first phase and in total.
+    """
+    marks = []
+    start = time.perf_counter()
+    build(lambda: marks.append(time.perf_counter()))
+    elapsed = [marks[0] - start, time.perf_counter() - marks[0]]
+    gc.collect()
+    tracemalloc.start()
+    result = build(lambda: marks.append(tracemalloc.get_traced_memory()[0]))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, [marks[1], size]
+
+
+def per_call(fn, items, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=500, help="ids per id lookup")
+    args = parser.parse_args()
+
+    texts = synthetic_words(args.words)
+    engine = create_engine(f"sqlite:///{tempfile.mkdtemp(prefix='bench-words-')}/words.db")
+    Word.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Word.__table__), [{"text": t} for t in texts])
+    avg = sum(map(len, texts)) / len(texts)
+    print(f"{args.words} words, {avg:.1f} bytes on average")
+
+    rng = random.Random(1)
+    pages = [rng.sample(range(1, args.words + 1), args.page) for _ in range(50)]
+    probes = rng.sample(texts, 10_000)
+    del texts
+
+    with Session(engine) as db:
+
+        def dictionary(mark):
+            words = WordDictionary(Word.__table__)
+            words.texts(db, [1])
+            mark()
+            words.find(["warm"])
+            return words
+
+        def plain(mark):
+            rows = db.execute(select(Word.id, Word.text)).all()
+            by_id = {word_id: text for word_id, text in rows}
+            mark()
+            by_text = {text: word_id for word_id, text in rows}
+            del rows
+            return by_id, by_text
+
+        words, (load_s, index_s), (id_bytes, total_bytes) = measured(dictionary)
+        (by_id, by_text), plain_s, (_, plain_bytes) = measured(plain)
+
+    print(
+        f"dictionary: load {load_s:.2f}s + text index {index_s:.2f}s, "
+        f"{total_bytes / 2**20:.1f} MiB ({total_bytes / args.words:.1f} B/word; "
+        f"{id_bytes / 2**20:.1f} MiB before the text index)"
+    )
+    print(
+        f"plain dicts: load {sum(plain_s):.2f}s, {plain_bytes / 2**20:.1f} MiB "
+        f"({plain_bytes / args.words:.1f} B/word)"
+    )
+    print(
+        f"id page of {args.page}: dictionary "
+        f"{per_call(words.lookup, pages):.0f}us, "
+        f"dict {per_call(lambda page: [by_id[i] for i in page], pages):.0f}us"
+    )
+    print(
+        f"text lookup: dictionary {per_call(lambda t: words.find([t]), probes):.2f}us, "
+        f"dict {per_call(by_text.get, probes):.2f}us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Mixed read/write load test against a local uvicorn server.
+
+Usage::
+
+    python benchmarks/load_test.py --users 200 --concurrency 50 --duration 20
+
+Seeds a fresh SQLite database, starts ``uvicorn backend.main:app`` on it and
+drives a mix of vocabulary reads, recommendation reads, quiz submissions
+and word updates with httpx, then reports p50/p99 latency per route.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+MIX = [
+    ("GET /api/user/words", 0.5),
+    ("GET /api/videos/recommendations", 0.2),
+    ("POST /api/user/quiz", 0.2),
+    ("PATCH /api/user/words/{id}", 0.1),
+]
+
+
+def seed(n_users, n_words, n_videos, words_per_video, rng):
+    from backend.main import (
+        SessionLocal, User, Video, VideoWord, Word, engine, rebuild_video_stats,
+    )
+    from backend.migrations import upgrade
+
+    upgrade(engine)
+    with SessionLocal() as db:
+        db.add_all(User(username=f"load{i}", password_hash="x") for i in range(n_users))
+        db.add_all(Word(text=f"word{i}") for i in range(n_words))
+        db.add_all(
+            Video(title=f"video{i}", thumbnail_url="t", score=rng.randint(0, 1000))
+            for i in range(n_videos)
+        )
+        db.flush()
+        user_ids = [u for (u,) in db.query(User.id)]
+        word_ids = [w for (w,) in db.query(Word.id)]
+        for (video_id,) in db.query(Video.id).all():
+            db.add_all(
+                VideoWord(video_id=video_id, word_id=w)
+                for w in rng.sample(word_ids, words_per_video)
+            )
+        db.commit()
+        rebuild_video_stats(db)
+    return user_ids, word_ids
+
+
+async def worker(client, user_ids, word_ids, deadline, samples, rng):
+    names = [name for name, _ in MIX]
+    weights = [w for _, w in MIX]
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        user_id = rng.choice(user_ids)
+        start = time.perf_counter()
+        try:
+            r = await request(client, name, user_id, word_ids, rng)
+        except httpx.TransportError:
+            samples["errors"].append(0)
+            continue
+        samples[name].append(time.perf_counter() - start)
+        if r.status_code >= 500:
+            samples["errors"].append(0)
+
+
+async def request(client, name, user_id, word_ids, rng):
+    if name == "GET /api/user/words":
+        return await client.get("/api/user/words", params={"user_id": user_id})
+    if name == "GET /api/videos/recommendations":
+        return await client.get(
+            "/api/videos/recommendations", params={"user_id": user_id}
+        )
+    if name == "POST /api/user/quiz":
+        answers = [
+            {"word_id": rng.choice(word_ids), "correct": rng.random() < 0.7}
+            for _ in range(10)
+        ]
+        return await client.post(
+            "/api/user/quiz", json={"user_id": user_id, "answers": answers}
+        )
+    return await client.patch(
+        f"/api/user/words/{rng.choice(word_ids)}",
+        json={"user_id": user_id, "mastery_level": rng.randint(0, 2)},
+    )
+
+
+def report(samples, elapsed):
+    total = sum(len(v) for k, v in samples.items() if k != "errors")
+    print(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.0f} req/s), "
+          f"{len(samples['errors'])} errors")
+    print(f"{'route':<36} {'count':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    every = []
+    for name, _ in MIX:
+        values = sorted(samples[name])
+        every.extend(values)
+        if values:
+            print(f"{name:<36} {len(values):>6} "
+                  f"{statistics.median(values) * 1000:>8.1f} "
+                  f"{values[max(0, int(len(values) * 0.99) - 1)] * 1000:>8.1f}")
+    every.sort()
+    print(f"{'all':<36} {len(every):>6} {statistics.median(every) * 1000:>8.1f} "
+          f"{every[max(0, int(len(every) * 0.99) - 1)] * 1000:>8.1f}")
+
+
+async def drive(url, user_ids, word_ids, concurrency, duration, seed_value):
+    samples = defaultdict(list)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(
+            *(
+                worker(client, user_ids, word_ids, deadline, samples,
+                       random.Random(seed_value + i))
+                for i in range(concurrency)
+            )
+        )
+        report(samples, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--videos", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="load-test-")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmpdir}/load.db",
+        REDIS_URL=os.getenv("REDIS_URL", "redis://127.0.0.1:1"),
+        TOKEN_BLOB_DIR=f"{tmpdir}/token_blobs",
+    )
+    os.environ.update(env)
+    rng = random.Random(args.seed)
+    user_ids, word_ids = seed(args.users, args.words, args.videos, 30, rng)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app",
+         "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"{url}/health")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        asyncio.run(
+            drive(url, user_ids, word_ids, args.concurrency, args.duration, args.seed)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Scenario benchmarks over a synthetic dataset, with JSON results.
+
+Usage::
+
+    python benchmarks/suite.py --scale small --out results/base.json
+    python benchmarks/suite.py --scale small --compare results/base.json
+
+The dataset from :mod:`synthetic` is generated once into ``--data-dir``
+and reused while its scale and seed match. Each run works on a fresh copy,
+so the quiz scenario's writes never leak into the next run. Requests go
+through the ASGI app in process, with the in-process cache unless
+``REDIS_URL`` points at a server. Latency metrics are in milliseconds.
+
+With ``--compare`` every metric is printed next to the baseline's.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from synthetic import SCALES, Zipf, generate, vocabulary  # noqa: E402
+
+QUIZ_ANSWERS = 10
+KNOWN_SET_SIZE = 1_000
+
+
+def summarize(durations):
+    """Latency summary of per-operation ``durations`` in seconds."""
+    ms = sorted(d * 1000 for d in durations)
+    return {
+        "n": len(ms),
+        "mean_ms": statistics.fmean(ms),
+        "p50_ms": ms[len(ms) // 2],
+        "p95_ms": ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+        "p99_ms": ms[min(len(ms) - 1, int(len(ms) * 0.99))],
+        "ops_per_s": len(ms) / (sum(ms) / 1000),
+    }
+
+
+def measure(fn, args):
+    durations = []
+    for arg in args:
+        start = time.perf_counter()
+        fn(arg)
+        durations.append(time.perf_counter() - start)
+    return summarize(durations)
+
+
+def _ok(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.url}: {response.status_code}")
+    return response
+
+
+class Context:
+    def __init__(self, scale, seed, requests, workdir, client):
+        self.scale = scale
+        self.requests = requests
+        self.workdir = workdir
+        self.client = client
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.zipf = Zipf(scale.words)
+        self.words = vocabulary(scale.words, seed)
+
+    def stats_users(self, n):
+        return [self.rng.randint(1, self.scale.stats_user_count) for _ in range(n)]
+
+    def distinct(self, population, n):
+        return self.rng.sample(range(1, population + 1), min(n, population))
+
+
+def scenario_recommendations(ctx):
+    return measure(
+        lambda user_id: _ok(ctx.client.get(
+            "/api/videos/recommendations", params={"user_id": user_id}
+        )),
+        ctx.stats_users(ctx.requests),
+    )
+
+
+def scenario_user_words(ctx):
+    users = ctx.distinct(ctx.scale.users, ctx.requests)
+
+    def page(user_id):
+        _ok(ctx.client.get("/api/user/words", params={"user_id": user_id}))
+
+    return {"cold": measure(page, users), "warm": measure(page, users)}
+
+
+def scenario_quiz(ctx):
+    def submit(user_id):
+        word_ids = ctx.zipf.sample(ctx.np_rng, QUIZ_ANSWERS) + 1
+        answers = [
+            {"word_id": int(w), "correct": ctx.rng.random() < 0.7} for w in word_ids
+        ]
+        _ok(ctx.client.post(
+            "/api/user/quiz", json={"user_id": user_id, "answers": answers}
+        ))
+
+    return measure(submit, ctx.stats_users(ctx.requests))
+
+
+def scenario_tokens(ctx):
+    videos = ctx.distinct(ctx.scale.videos, ctx.requests)
+
+    def tokens(video_id):
+        _ok(ctx.client.get(f"/api/videos/{video_id}/tokens"))
+
+    return {"cold": measure(tokens, videos), "warm": measure(tokens, videos)}
+
+
+def scenario_best_match(ctx):
+    from langdb.connections import connect
+    from langdb.coverage import load_index
+    from langdb.recommend_known import best_match
+
+    conn = connect(ctx.workdir / "content.db")
+    index = load_index(ctx.workdir / "coverage.npz")
+    known_sets = [
+        {ctx.words[r] for r in ctx.zipf.distinct(ctx.np_rng, KNOWN_SET_SIZE)}
+        for _ in range(ctx.requests)
+    ]
+    result = measure(lambda known: best_match(conn, known, index=index), known_sets)
+    conn.close()
+    return result
+
+
+def scenario_ingest_transcripts(ctx):
+    from langdb.connections import connect
+    from langdb.ingest import create_table, ingest_transcripts
+
+    result = {}
+    with connect(ctx.workdir / "ingest.db") as conn:
+        create_table(conn)
+        for run in ("first", "unchanged"):
+            report = ingest_transcripts(conn, ctx.workdir / "transcripts", workers=None)
+            result[run] = {
+                "files": report.scanned,
+                "seconds": report.seconds,
+                "files_per_s": report.scanned / report.seconds,
+            }
+    return result
+
+
+SCENARIOS = {
+    "recommendations": scenario_recommendations,
+    "user_words": scenario_user_words,
+    "quiz": scenario_quiz,
+    "tokens": scenario_tokens,
+    "best_match": scenario_best_match,
+    "ingest_transcripts": scenario_ingest_transcripts,
+}
+
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _flatten(results, prefix=""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+def compare(baseline, current):
+    """Print each metric of ``current`` next to the one in ``baseline``."""
+    before = dict(_flatten(baseline["scenarios"]))
+    print(f"\n{'metric':<44} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, value in _flatten(current["scenarios"]):
+        if name.endswith(".n") or name.endswith(".files"):
+            continue
+        old = before.get(name)
+        change = f"{100 * (value / old - 1):+7.1f}%" if old else ""
+        old_text = f"{old:>10.2f}" if old is not None else f"{'-':>10}"
+        print(f"{name:<44} {old_text} {value:>10.2f} {change:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", type=Path, default=ROOT / "bench-data")
+    parser.add_argument("--requests", type=int, default=200, help="operations per scenario")
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, help="scenarios to run")
+    parser.add_argument("--out", type=Path, help="write the results here as JSON")
+    parser.add_argument("--compare", type=Path, help="baseline results to compare with")
+    args = parser.parse_args()
+
+    scale = SCALES[args.scale]
+    dataset = args.data_dir / f"{args.scale}-{args.seed}"
+    workdir = Path(tempfile.mkdtemp(prefix="bench-suite-"))
+    # Set before backend.main is imported: it reads them at import time.
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/backend.db"
+    os.environ["TOKEN_BLOB_DIR"] = str(workdir / "token_blobs")
+    os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1")
+
+    started = time.perf_counter()
+    generate(dataset, scale, args.seed)
+    print(f"dataset ready in {time.perf_counter() - started:.1f}s: {dataset}")
+    for name in ("backend.db", "content.db", "coverage.npz"):
+        shutil.copy(dataset / name, workdir / name)
+    shutil.copytree(dataset / "transcripts", workdir / "transcripts")
+
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    results = {
+        "meta": {
+            "commit": _git("rev-parse", "HEAD"),
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "scale": args.scale,
+            "seed": args.seed,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "scenarios": {},
+    }
+    with TestClient(app) as client:
+        ctx = Context(scale, args.seed, args.requests, workdir, client)
+        for name in args.only or SCENARIOS:
+            result = SCENARIOS[name](ctx)
+            results["scenarios"][name] = result
+            print(f"{name}: {json.dumps(result)}")
+    shutil.rmtree(workdir)
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), results)
+
+
+if __name__ == "__main__":
+    main()
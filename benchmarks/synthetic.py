@@ -0,0 +1,291 @@
+"""Seeded synthetic data for the benchmark suite.
+
+Usage::
+
+    python benchmarks/synthetic.py --scale small --out bench-data/small
+
+Writes into ``--out``:
+
+- ``backend.db``: ``words``, ``users``, ``user_words``, ``videos``,
+  ``video_words`` and their encoded ``video_word_sets``,
+  ``transcript_tokens`` and the recommendation stats;
+- ``transcripts/``: langdb transcript files;
+- ``content.db`` and ``coverage.npz``: those transcripts ingested into
+  langdb's ``content`` table, with the coverage index built;
+- ``dataset.json``: the scale and seed, so an existing dataset is reused
+  only when both match.
+
+Word frequencies follow Zipf's law, and the most frequent words are the
+shortest. Transcripts and video tokens draw their words from that
+distribution. A learner's vocabulary is a Zipf sample too, so learners
+know the frequent words first.
+
+``user_video_stats`` has a row for every (user, video) pair sharing a
+known word. Under Zipf that is nearly every pair, so the stats are only
+filled for the first ``stats_users`` users. Scenarios that depend on
+them pick their users from that range.
+"""
+
+import argparse
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+import json
+import os
+import random
+import shutil
+import string
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+INSERT_CHUNK = 20_000
+VIDEO_CHUNK = 500
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    words: int
+    videos: int
+    # Median tokens per video and words per learner vocabulary.
+    tokens_per_video: int = 300
+    known_words: int = 800
+    content_docs: int = 2_000
+    words_per_doc: int = 300
+    # Users given user_video_stats rows; None means all of them.
+    stats_users: int | None = None
+
+    @property
+    def stats_user_count(self) -> int:
+        return min(self.users, self.stats_users or self.users)
+
+
+SCALES = {
+    "tiny": Scale(users=100, words=5_000, videos=100, known_words=300, content_docs=200),
+    "small": Scale(users=2_000, words=30_000, videos=2_000),
+    "medium": Scale(
+        users=20_000, words=100_000, videos=10_000, content_docs=20_000,
+        stats_users=2_000,
+    ),
+    "production": Scale(
+        users=100_000, words=200_000, videos=50_000, content_docs=50_000,
+        stats_users=2_000,
+    ),
+}
+
+
+class Zipf:
+    """Sample ranks ``0..n-1`` with probability proportional to ``1 / (rank + 1) ** s``."""
+
+    def __init__(self, n: int, s: float = 1.0):
+        weights = 1.0 / np.arange(1, n + 1) ** s
+        self.cdf = np.cumsum(weights) / weights.sum()
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        ranks = np.searchsorted(self.cdf, rng.random(size), side="right")
+        return np.minimum(ranks, len(self.cdf) - 1)
+
+    def distinct(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Return ``size`` distinct ranks, in the order they were first drawn."""
+        picked = np.empty(0, dtype=np.int64)
+        while len(picked) < size:
+            draws = np.concatenate([picked, self.sample(rng, 2 * size)])
+            _, first = np.unique(draws, return_index=True)
+            picked = draws[np.sort(first)]
+        return picked[:size]
+
+
+def vocabulary(n: int, seed: int) -> list[str]:
+    """Return ``n`` distinct pseudo-words, shortest first."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < n:
+        length = min(2 + int(rng.expovariate(1 / 4)), 14)
+        words.add("".join(rng.choices(string.ascii_lowercase, k=length)))
+    return sorted(words, key=lambda w: (len(w), w))
+
+
+def _lognormal(rng, median, size, low, high):
+    values = rng.lognormal(np.log(median), 0.5, size)
+    return np.clip(values.astype(np.int64), low, high)
+
+
+def _insert(conn, table, rows):
+    rows = iter(rows)
+    while chunk := list(islice(rows, INSERT_CHUNK)):
+        conn.execute(table.insert(), chunk)
+
+
+def fill_backend(path: Path, scale: Scale, words: list[str], seed: int) -> None:
+    """Create ``path`` and fill the backend tables at ``scale``."""
+    from sqlalchemy import create_engine
+    from backend.main import (
+        MasteryLevel, TranscriptToken, User, UserVideoStat, UserWord, Video,
+        VideoStat, VideoWord, VideoWordSet, Word,
+    )
+    from backend import wordsets
+    from backend.migrations import upgrade
+
+    engine = create_engine(f"sqlite:///{path}")
+    upgrade(engine)
+    rng = np.random.default_rng(seed)
+    zipf = Zipf(len(words))
+    now = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        _insert(conn, Word.__table__, ({"id": i + 1, "text": w} for i, w in enumerate(words)))
+
+    # Each video's distinct word ids, kept for the stats below.
+    video_words = []
+    for first in range(0, scale.videos, VIDEO_CHUNK):
+        ids = range(first + 1, min(first + VIDEO_CHUNK, scale.videos) + 1)
+        lengths = _lognormal(rng, scale.tokens_per_video, len(ids), 20, 5 * scale.tokens_per_video)
+        videos, tokens, pairs, stats, sets = [], [], [], [], []
+        for video_id, length in zip(ids, lengths):
+            word_ids = zipf.sample(rng, int(length)) + 1
+            distinct = np.unique(word_ids)
+            video_words.append(distinct)
+            videos.append({
+                "id": video_id,
+                "title": f"video {video_id}",
+                "thumbnail_url": f"https://example.com/{video_id}.jpg",
+                "score": int(rng.integers(0, 1000)),
+            })
+            # About 2.5 tokens a second.
+            tokens.extend(
+                {
+                    "video_id": video_id,
+                    "word_id": int(word_id),
+                    "start_sec": i * 2 // 5,
+                    "end_sec": (i + 1) * 2 // 5,
+                }
+                for i, word_id in enumerate(word_ids)
+            )
+            pairs.extend({"video_id": video_id, "word_id": int(w)} for w in distinct)
+            stats.append({"video_id": video_id, "word_count": len(distinct)})
+            sets.append({"video_id": video_id, "word_ids": wordsets.encode(distinct.tolist())})
+        with engine.begin() as conn:
+            _insert(conn, Video.__table__, videos)
+            _insert(conn, TranscriptToken.__table__, tokens)
+            _insert(conn, VideoWord.__table__, pairs)
+            _insert(conn, VideoStat.__table__, stats)
+            _insert(conn, VideoWordSet.__table__, sets)
+
+    flat = np.concatenate(video_words)
+    offsets = np.cumsum([0] + [len(v) for v in video_words[:-1]])
+    word_counts = np.array([len(v) for v in video_words])
+    levels = [MasteryLevel.mastered, MasteryLevel.learning, MasteryLevel.unknown]
+    with engine.begin() as conn:
+        _insert(conn, User.__table__, (
+            {"id": i, "username": f"user{i}", "password_hash": "x"}
+            for i in range(1, scale.users + 1)
+        ))
+    # Capped well below the word count: drawing nearly every word of a Zipf
+    # distribution takes very many samples.
+    vocab_sizes = _lognormal(rng, scale.known_words, scale.users, 10, len(words) // 4)
+    for first in range(0, scale.users, VIDEO_CHUNK):
+        rows, user_stats = [], []
+        for user_id in range(first + 1, min(first + VIDEO_CHUNK, scale.users) + 1):
+            word_ids = zipf.distinct(rng, int(vocab_sizes[user_id - 1])) + 1
+            level_ids = rng.choice(3, len(word_ids), p=[0.6, 0.3, 0.1])
+            due = rng.uniform(-3, 30, len(word_ids))
+            for word_id, level, due_days in zip(word_ids, level_ids, due):
+                interval = max(0, int(due_days))
+                rows.append({
+                    "user_id": user_id,
+                    "word_id": int(word_id),
+                    "seen_count": 1 + interval % 7,
+                    "mastery_level": levels[level],
+                    "last_seen_at": now - timedelta(days=interval),
+                    "updated_at": now - timedelta(days=interval),
+                    "ease": 2.5,
+                    "interval_days": interval,
+                    "repetitions": min(interval, 5),
+                    "due_at": now + timedelta(days=float(due_days)),
+                })
+            if user_id <= scale.stats_user_count:
+                known = np.zeros(len(words) + 1, dtype=bool)
+                known[word_ids[level_ids != 2]] = True
+                known_counts = np.add.reduceat(known[flat], offsets)
+                user_stats.extend(
+                    {
+                        "user_id": user_id,
+                        "video_id": int(index) + 1,
+                        "unknown_count": int(word_counts[index] - known_counts[index]),
+                    }
+                    for index in np.flatnonzero(known_counts)
+                )
+        with engine.begin() as conn:
+            _insert(conn, UserWord.__table__, rows)
+            _insert(conn, UserVideoStat.__table__, user_stats)
+    engine.dispose()
+
+
+def write_transcripts(directory: Path, scale: Scale, words: list[str], seed: int) -> None:
+    """Write ``scale.content_docs`` transcript files of Zipf-distributed words."""
+    rng = np.random.default_rng(seed + 1)
+    zipf = Zipf(len(words))
+    directory.mkdir(parents=True, exist_ok=True)
+    lengths = _lognormal(rng, scale.words_per_doc, scale.content_docs, 5, 10 * scale.words_per_doc)
+    for doc, length in enumerate(lengths):
+        tokens = [words[rank] for rank in zipf.sample(rng, int(length))]
+        breaks = np.cumsum(rng.integers(5, 20, len(tokens)))
+        sentences = [
+            " ".join(tokens[start:end]).capitalize()
+            for start, end in zip(np.concatenate([[0], breaks]), breaks)
+            if start < len(tokens)
+        ]
+        (directory / f"doc{doc:06d}.txt").write_text(". ".join(sentences) + ".")
+
+
+def fill_content(out: Path) -> None:
+    """Ingest ``out/transcripts`` into ``out/content.db`` and build its index."""
+    from langdb.connections import connect
+    from langdb.coverage import build_index
+    from langdb.ingest import create_table, ingest_transcripts
+
+    conn = connect(out / "content.db")
+    create_table(conn)
+    ingest_transcripts(conn, out / "transcripts", workers=None)
+    build_index(conn, out / "coverage.npz")
+    # Closing checkpoints the WAL, so content.db alone can be copied.
+    conn.close()
+
+
+def generate(out: Path, scale: Scale, seed: int = 0) -> Path:
+    """Build the dataset in ``out`` unless one with the same scale and seed exists."""
+    meta = {"scale": asdict(scale), "seed": seed}
+    marker = out / "dataset.json"
+    if marker.exists() and json.loads(marker.read_text()) == meta:
+        return out
+    if out.exists():
+        shutil.rmtree(out)
+    out.mkdir(parents=True)
+    words = vocabulary(scale.words, seed)
+    fill_backend(out / "backend.db", scale, words, seed)
+    write_transcripts(out / "transcripts", scale, words, seed)
+    fill_content(out)
+    marker.write_text(json.dumps(meta, indent=2))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # backend.main reads its settings at import; nothing connects to these.
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{args.out}/backend.db")
+    os.environ.setdefault("TOKEN_BLOB_DIR", f"{args.out}/token_blobs")
+    generate(args.out, SCALES[args.scale], args.seed)
+    print(f"{args.scale} dataset in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
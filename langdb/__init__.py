@@ -1,8 +1,11 @@
 """Utility package for the language learning content database."""
 
 __all__ = [
+    "connections",
+    "coverage",
     "ingest",
     "manage_words",
+    "readability",
     "recommend",
     "recommend_known",
 ]
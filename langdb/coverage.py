@@ -0,0 +1,198 @@
+"""Precomputed vocabulary-coverage index for transcript recommendation.
+
+The index is built once from the ``content`` table (normally right after
+ingestion) and stores every transcript as a sorted array of word ids with
+per-word frequencies, plus the transposed word -> transcript postings.
+Scoring a learner then only needs their known words as a boolean mask over
+the vocabulary; all per-transcript sums are done with NumPy.
+"""
+
+from pathlib import Path
+import re
+import sqlite3
+
+import numpy as np
+
+INDEX_PATH = Path("data/coverage_index.npz")
+
+WORD_RE = re.compile(r"\b\w+\b")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split *text* into lower-case words the same way as ``coverage_score``."""
+
+    return WORD_RE.findall(text.lower())
+
+
+class CoverageIndex:
+    """Token-id arrays for every transcript in the content database."""
+
+    def __init__(
+        self,
+        vocabulary: np.ndarray,
+        content_ids: np.ndarray,
+        doc_offsets: np.ndarray,
+        doc_words: np.ndarray,
+        doc_counts: np.ndarray,
+        totals: np.ndarray,
+    ) -> None:
+        self.vocabulary = vocabulary
+        self.word_ids = {w: i for i, w in enumerate(vocabulary.tolist())}
+        self.content_ids = content_ids
+        self.doc_offsets = doc_offsets
+        self.doc_words = doc_words
+        self.doc_counts = doc_counts
+        self.totals = totals
+        self._doc_rows = np.repeat(
+            np.arange(len(content_ids), dtype=np.int32), np.diff(doc_offsets)
+        )
+        # Inverted postings: for word id ``w`` the rows and counts live in
+        # ``[word_offsets[w], word_offsets[w + 1])``.
+        order = np.argsort(doc_words, kind="stable")
+        self.post_rows = self._doc_rows[order]
+        self.post_counts = doc_counts[order]
+        self.word_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(doc_words, minlength=len(vocabulary)),
+            out=self.word_offsets[1:],
+        )
+
+    def __len__(self) -> int:
+        return len(self.content_ids)
+
+    @classmethod
+    def build(cls, conn: sqlite3.Connection) -> "CoverageIndex":
+        """Tokenise every transcript in ``conn`` into a new index."""
+
+        word_ids: dict[str, int] = {}
+        content_ids, offsets, words, counts, totals = [], [0], [], [], []
+        for content_id, transcript in conn.execute(
+            "SELECT id, transcript FROM content ORDER BY id"
+        ):
+            freq: dict[int, int] = {}
+            tokens = tokenize(transcript or "")
+            for tok in tokens:
+                wid = word_ids.setdefault(tok, len(word_ids))
+                freq[wid] = freq.get(wid, 0) + 1
+            ids = sorted(freq)
+            words.extend(ids)
+            counts.extend(freq[i] for i in ids)
+            offsets.append(len(words))
+            totals.append(len(tokens))
+            content_ids.append(content_id)
+        return cls(
+            np.array(list(word_ids), dtype=str),
+            np.array(content_ids, dtype=np.int64),
+            np.array(offsets, dtype=np.int64),
+            np.array(words, dtype=np.int32),
+            np.array(counts, dtype=np.int32),
+            np.array(totals, dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "CoverageIndex":
+        """Read an index previously written with :meth:`save`."""
+
+        with np.load(path) as data:
+            return cls(
+                data["vocabulary"],
+                data["content_ids"],
+                data["doc_offsets"],
+                data["doc_words"],
+                data["doc_counts"],
+                data["totals"],
+            )
+
+    def save(self, path: Path = INDEX_PATH) -> None:
+        """Write the index to *path* in NumPy ``.npz`` format."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as fh:
+            np.savez(
+                fh,
+                vocabulary=self.vocabulary,
+                content_ids=self.content_ids,
+                doc_offsets=self.doc_offsets,
+                doc_words=self.doc_words,
+                doc_counts=self.doc_counts,
+                totals=self.totals,
+            )
+
+    def known_mask(self, known_words: set[str]) -> np.ndarray:
+        """Return a boolean mask over the vocabulary for *known_words*."""
+
+        mask = np.zeros(len(self.vocabulary), dtype=bool)
+        ids = [self.word_ids[w] for w in known_words if w in self.word_ids]
+        mask[ids] = True
+        return mask
+
+    def scores(self, known_words: set[str]) -> np.ndarray:
+        """Return the ``coverage_score`` of every transcript, in index order."""
+
+        mask = self.known_mask(known_words)
+        known_ids = np.flatnonzero(mask)
+        starts = self.word_offsets[known_ids]
+        lengths = self.word_offsets[known_ids + 1] - starts
+        n_postings = int(lengths.sum())
+        if n_postings < len(self.doc_words):
+            # Few known words: walk only their postings lists.
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            positions += np.arange(n_postings)
+            rows = self.post_rows[positions]
+            weights = self.post_counts[positions]
+        else:
+            hits = mask[self.doc_words]
+            rows = self._doc_rows[hits]
+            weights = self.doc_counts[hits]
+        known = np.bincount(rows, weights=weights, minlength=len(self)).astype(
+            np.int64
+        )
+        scores = np.zeros(len(self), dtype=np.float64)
+        nonempty = self.totals > 0
+        scores[nonempty] = known[nonempty] / self.totals[nonempty]
+        return scores
+
+    def top_k(self, known_words: set[str], k: int = 1) -> list[tuple[int, float]]:
+        """Return ``(content_id, score)`` for the *k* best-covered transcripts.
+
+        Ties keep ingestion order, so ``top_k(words, 1)`` picks the same
+        transcript as :func:`langdb.recommend_known.best_match`.
+        """
+
+        scores = self.scores(known_words)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            threshold = scores[candidates].min()
+            candidates = np.flatnonzero(scores >= threshold)
+        else:
+            candidates = np.arange(len(scores))
+        order = candidates[np.argsort(-scores[candidates], kind="stable")][:k]
+        return [(int(self.content_ids[i]), float(scores[i])) for i in order]
+
+
+_cache: dict[Path, tuple[float, CoverageIndex]] = {}
+
+
+def load_index(path: Path = INDEX_PATH) -> CoverageIndex | None:
+    """Return the index at *path*, reloading it only when the file changes."""
+
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    cached = _cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, CoverageIndex.load(path))
+        _cache[path] = cached
+    return cached[1]
+
+
+def build_index(conn: sqlite3.Connection, path: Path = INDEX_PATH) -> CoverageIndex:
+    """Build the index from ``conn`` and write it to *path*."""
+
+    index = CoverageIndex.build(conn)
+    index.save(path)
+    return index
@@ -1,46 +1,30 @@
 """Utilities for ingesting transcript files into the content database."""
 
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
-import re
+import argparse
+import hashlib
+import io
+import os
 import sqlite3
+import time
+
+from langdb.connections import connect
+from langdb.coverage import INDEX_PATH, build_index
+from langdb.readability import (  # noqa: F401 - re-exported
+    count_syllables,
+    flesch_kincaid_grade,
+    flesch_kincaid_grades,
+)
 
 DB_PATH = Path("data/content.db")
 TRANSCRIPT_DIR = Path("transcripts")
 
 
-def count_syllables(word: str) -> int:
-    """Naive syllable counter used for Flesch–Kincaid calculations."""
-
-    word = word.lower()
-    vowels = "aeiouy"
-    count = 0
-    prev = False
-    for char in word:
-        if char in vowels:
-            if not prev:
-                count += 1
-            prev = True
-        else:
-            prev = False
-    if word.endswith("e") and count > 1:
-        count -= 1
-    return count or 1
-
-
-def flesch_kincaid_grade(text: str) -> float:
-    """Return the approximate grade level for *text* using Flesch–Kincaid."""
-
-    sentences = re.split(r"[.!?]+", text)
-    sentences = [s for s in sentences if s.strip()]
-    words = re.findall(r"\b\w+\b", text.lower())
-    syllables = sum(count_syllables(w) for w in words)
-    num_words = len(words)
-    num_sentences = len(sentences) or 1
-    return 0.39 * num_words / num_sentences + 11.8 * syllables / num_words - 15.59
-
-
 def create_table(conn: sqlite3.Connection) -> None:
-    """Create the ``content`` table if it does not already exist."""
+    """Create the ``content`` table and its indexes if they do not exist."""
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS content (
@@ -51,28 +35,212 @@ def create_table(conn: sqlite3.Connection) -> None:
         )
         """
     )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_content_grade_level ON content (grade_level)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ingested_files (
+            path TEXT PRIMARY KEY,
+            content_id INTEGER NOT NULL REFERENCES content (id),
+            content_hash TEXT NOT NULL,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL
+        )
+        """
+    )
     conn.commit()
 
 
-def ingest_transcripts(conn: sqlite3.Connection) -> None:
-    """Insert all ``.txt`` files in :data:`TRANSCRIPT_DIR` into ``conn``."""
-    for txt_file in TRANSCRIPT_DIR.glob("*.txt"):
-        text = txt_file.read_text()
-        grade = flesch_kincaid_grade(text)
-        conn.execute(
-            "INSERT INTO content (title, transcript, grade_level) VALUES (?, ?, ?)",
-            (txt_file.stem, text, grade),
+@dataclass
+class IngestReport:
+    """Counts and timing for one :func:`ingest_transcripts` run."""
+
+    scanned: int = 0
+    skipped: int = 0
+    inserted: int = 0
+    updated: int = 0
+    bytes_read: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        """Return a one-line human readable throughput report."""
+
+        processed = self.inserted + self.updated
+        rate = self.scanned / self.seconds if self.seconds else 0.0
+        mb_rate = self.bytes_read / 1e6 / self.seconds if self.seconds else 0.0
+        return (
+            f"{self.scanned} files scanned, {self.skipped} unchanged, "
+            f"{self.inserted} inserted, {self.updated} updated "
+            f"({processed} scored) in {self.seconds:.2f}s: "
+            f"{rate:.0f} files/s, {mb_rate:.1f} MB/s read"
         )
-    conn.commit()
+
+
+def _read_and_score(paths: list[Path]) -> list[tuple[Path, str, str, float]]:
+    """Return ``(path, sha256, text, grade)`` for each transcript file."""
+
+    data = [path.read_bytes() for path in paths]
+    # Decoded as ``Path.read_text`` would: the locale's encoding and
+    # universal newlines. The hash covers the raw bytes.
+    texts = [io.TextIOWrapper(io.BytesIO(raw)).read() for raw in data]
+    grades = flesch_kincaid_grades(texts)
+    return [
+        (path, hashlib.sha256(raw).hexdigest(), text, grade)
+        for path, raw, text, grade in zip(paths, data, texts, grades)
+    ]
+
+
+def _next_content_id(conn: sqlite3.Connection) -> int:
+    """Return the id ``AUTOINCREMENT`` would assign to the next ``content`` row.
+
+    Ids are assigned up front so ``content`` rows can be inserted with
+    ``executemany`` and still be referenced from ``ingested_files``; call it
+    inside a write transaction.
+    """
+
+    row = conn.execute(
+        "SELECT max(coalesce((SELECT seq FROM sqlite_sequence WHERE name = 'content'), 0),"
+        " coalesce((SELECT max(id) FROM content), 0))"
+    ).fetchone()
+    return row[0] + 1
+
+
+def ingest_transcripts(
+    conn: sqlite3.Connection,
+    directory: Path = TRANSCRIPT_DIR,
+    workers: int | None = 1,
+    batch_size: int = 500,
+) -> IngestReport:
+    """Ingest new and changed ``.txt`` files in *directory* into ``conn``.
+
+    Files whose size and mtime match the previous run are skipped without
+    being read. The rest are read and scored in groups of files, in a pool
+    of *workers* processes when more than one is requested, and written
+    back with ``executemany`` in transactions of *batch_size* files. A
+    file whose content hash changed updates its existing ``content`` row in
+    place.
+    """
+
+    started = time.perf_counter()
+    report = IngestReport()
+    known = {
+        path: (content_id, content_hash, mtime, size)
+        for path, content_id, content_hash, mtime, size in conn.execute(
+            "SELECT path, content_id, content_hash, mtime, size FROM ingested_files"
+        )
+    }
+    # Rows written before file tracking existed are adopted by title.
+    legacy = {
+        title: content_id
+        for title, content_id in conn.execute(
+            "SELECT title, min(id) FROM content "
+            "WHERE id NOT IN (SELECT content_id FROM ingested_files) GROUP BY title"
+        )
+    }
+
+    pending = []
+    stats = {}
+    for txt_file in sorted(directory.glob("*.txt")):
+        report.scanned += 1
+        st = txt_file.stat()
+        stats[str(txt_file)] = (st.st_mtime, st.st_size)
+        previous = known.get(str(txt_file))
+        if previous and previous[2:] == (st.st_mtime, st.st_size):
+            report.skipped += 1
+        else:
+            pending.append(txt_file)
+
+    def flush(batch):
+        inserts, updates, files = [], [], []
+        with conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            next_id = _next_content_id(conn)
+            for path, content_hash, text, grade in batch:
+                key = str(path)
+                mtime, size = stats[key]
+                report.bytes_read += size
+                previous = known.get(key)
+                if previous and previous[1] == content_hash:
+                    content_id = previous[0]
+                    report.skipped += 1
+                elif previous or path.stem in legacy:
+                    content_id = previous[0] if previous else legacy.pop(path.stem)
+                    updates.append((text, grade, content_id))
+                    report.updated += 1
+                else:
+                    content_id = next_id
+                    next_id += 1
+                    inserts.append((content_id, path.stem, text, grade))
+                    report.inserted += 1
+                files.append((key, content_id, content_hash, mtime, size))
+            conn.executemany(
+                "INSERT INTO content (id, title, transcript, grade_level) "
+                "VALUES (?, ?, ?, ?)",
+                inserts,
+            )
+            conn.executemany(
+                "UPDATE content SET transcript = ?, grade_level = ? WHERE id = ?",
+                updates,
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO ingested_files "
+                "(path, content_id, content_hash, mtime, size) VALUES (?, ?, ?, ?, ?)",
+                files,
+            )
+
+    def run(results):
+        batch = []
+        for result in results:
+            batch.append(result)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+    workers = workers or os.cpu_count() or 1
+    # Each group is one pool task and one flesch_kincaid_grades call.
+    size = max(1, min(64, len(pending) // (4 * workers)))
+    groups = [pending[i:i + size] for i in range(0, len(pending), size)]
+    if workers == 1 or len(pending) < 2:
+        run(chain.from_iterable(map(_read_and_score, groups)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            run(chain.from_iterable(pool.map(_read_and_score, groups)))
+
+    report.seconds = time.perf_counter() - started
+    return report
 
 
 def main() -> None:
     """Populate the content database from transcript files."""
 
+    parser = argparse.ArgumentParser(description="Ingest transcript files")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Scoring processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Files written per transaction",
+    )
+    args = parser.parse_args()
+
     DB_PATH.parent.mkdir(exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
+    with connect(DB_PATH) as conn:
         create_table(conn)
-        ingest_transcripts(conn)
+        report = ingest_transcripts(
+            conn, workers=args.workers, batch_size=args.batch_size
+        )
+        print(report.summary())
+        if report.inserted or report.updated or not INDEX_PATH.exists():
+            build_index(conn)
 
 
 if __name__ == "__main__":
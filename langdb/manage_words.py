@@ -4,6 +4,8 @@ import argparse
 from pathlib import Path
 import sqlite3
 
+from langdb.connections import connect
+
 USER_DB = Path("data/user_words.db")
 
 
@@ -21,10 +23,10 @@ def create_table(conn: sqlite3.Connection) -> None:
 
 def add_words(conn: sqlite3.Connection, words: list[str]) -> None:
     """Add *words* to ``conn`` if they are not already present."""
-    for w in words:
-        conn.execute(
-            "INSERT OR IGNORE INTO known_words (word) VALUES (?)", (w.lower(),)
-        )
+    conn.executemany(
+        "INSERT OR IGNORE INTO known_words (word) VALUES (?)",
+        ((w.lower(),) for w in words),
+    )
     conn.commit()
 
 
@@ -49,7 +51,7 @@ def main() -> None:
     args = parser.parse_args()
 
     USER_DB.parent.mkdir(exist_ok=True)
-    with sqlite3.connect(USER_DB) as conn:
+    with connect(USER_DB) as conn:
         create_table(conn)
         if args.command == "add":
             add_words(conn, args.words)
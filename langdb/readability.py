@@ -0,0 +1,97 @@
+"""Flesch–Kincaid readability scores for transcripts.
+
+:func:`flesch_kincaid_grade` is the reference definition. Ingestion uses
+:func:`flesch_kincaid_grades`, which scores many texts at once and returns
+bit-identical grades: syllables are counted once per distinct word through
+a process-wide memo, and the grades are computed over NumPy arrays of
+per-text totals.
+"""
+
+import re
+from typing import Sequence
+
+import numpy as np
+
+# Maximal runs of word characters: the same matches as ``\b\w+\b``.
+WORD_RE = re.compile(r"\w+")
+# One match per piece of ``re.split(r"[.!?]+", text)`` that is not blank.
+SENTENCE_RE = re.compile(r"[^.!?\s][^.!?]*")
+# The memo is dropped and rebuilt once it holds this many words.
+MEMO_LIMIT = 500_000
+
+_syllables: dict[str, int] = {}
+
+
+def count_syllables(word: str) -> int:
+    """Naive syllable counter used for Flesch–Kincaid calculations."""
+
+    word = word.lower()
+    vowels = "aeiouy"
+    count = 0
+    prev = False
+    for char in word:
+        if char in vowels:
+            if not prev:
+                count += 1
+            prev = True
+        else:
+            prev = False
+    if word.endswith("e") and count > 1:
+        count -= 1
+    return count or 1
+
+
+def flesch_kincaid_grade(text: str) -> float:
+    """Return the approximate grade level for *text* using Flesch–Kincaid."""
+
+    sentences = re.split(r"[.!?]+", text)
+    sentences = [s for s in sentences if s.strip()]
+    words = re.findall(r"\b\w+\b", text.lower())
+    syllables = sum(count_syllables(w) for w in words)
+    num_words = len(words)
+    num_sentences = len(sentences) or 1
+    return 0.39 * num_words / num_sentences + 11.8 * syllables / num_words - 15.59
+
+
+def _syllable_total(words: list[str]) -> int:
+    try:
+        return sum(map(_syllables.__getitem__, words))
+    except KeyError:
+        pass
+    if len(_syllables) > MEMO_LIMIT:
+        _syllables.clear()
+    for word in set(words).difference(_syllables):
+        _syllables[word] = count_syllables(word)
+    return sum(map(_syllables.__getitem__, words))
+
+
+def readability_totals(texts: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return per-text sentence, word and syllable counts as int64 arrays."""
+
+    sentences = np.empty(len(texts), dtype=np.int64)
+    words = np.empty(len(texts), dtype=np.int64)
+    syllables = np.empty(len(texts), dtype=np.int64)
+    for i, text in enumerate(texts):
+        tokens = WORD_RE.findall(text.lower())
+        sentences[i] = len(SENTENCE_RE.findall(text))
+        words[i] = len(tokens)
+        syllables[i] = _syllable_total(tokens)
+    return sentences, words, syllables
+
+
+def flesch_kincaid_grades(texts: Sequence[str]) -> list[float]:
+    """Return ``[flesch_kincaid_grade(t) for t in texts]``, computed in bulk.
+
+    Like the single-text version, raises ``ZeroDivisionError`` for a text
+    without words.
+    """
+
+    sentences, words, syllables = readability_totals(texts)
+    if not words.all():
+        raise ZeroDivisionError("text has no words")
+    # Same operations in the same order as flesch_kincaid_grade, on float64
+    # values converted exactly from the integer totals.
+    words = words.astype(np.float64)
+    sentences = np.maximum(sentences, 1).astype(np.float64)
+    grades = 0.39 * words / sentences + 11.8 * syllables.astype(np.float64) / words - 15.59
+    return grades.tolist()
@@ -4,18 +4,62 @@ import argparse
 from pathlib import Path
 import sqlite3
 
+from langdb.connections import connect
+
 DB_PATH = Path("data/content.db")
 
 
-def get_recommendation(level: float, conn: sqlite3.Connection):
-    """Return the record nearest to ``level + 1`` in readability."""
+def get_recommendations(
+    level: float,
+    conn: sqlite3.Connection,
+    k: int = 1,
+    window: float | None = None,
+) -> list[tuple]:
+    """Return the *k* records nearest to ``level + 1`` in readability.
+
+    Each record is ``(title, transcript, grade_level, diff)``. The lookup
+    walks ``idx_content_grade_level`` outwards from the target with two
+    bounded range probes, one below and one above, and merges them; ties
+    are broken by insertion order. With *window*, only records within that
+    distance of the target are considered. Records without a grade level
+    are never returned.
+    """
 
     target = level + 1
-    cur = conn.execute(
-        "SELECT title, transcript, grade_level, ABS(grade_level - ?) as diff FROM content ORDER BY diff ASC LIMIT 1",
-        (target,),
+    below_sql = "grade_level <= ?"
+    above_sql = "grade_level > ?"
+    below_args: tuple = (target,)
+    above_args: tuple = (target,)
+    if window is not None:
+        below_sql += " AND grade_level >= ?"
+        above_sql += " AND grade_level <= ?"
+        below_args += (target - window,)
+        above_args += (target + window,)
+    below = conn.execute(
+        "SELECT id, title, transcript, grade_level FROM content "
+        f"WHERE {below_sql} ORDER BY grade_level DESC, id ASC LIMIT ?",
+        below_args + (k,),
+    ).fetchall()
+    above = conn.execute(
+        "SELECT id, title, transcript, grade_level FROM content "
+        f"WHERE {above_sql} ORDER BY grade_level ASC, id ASC LIMIT ?",
+        above_args + (k,),
+    ).fetchall()
+    candidates = sorted(
+        (abs(grade - target), row_id, title, transcript, grade)
+        for row_id, title, transcript, grade in below + above
     )
-    return cur.fetchone()
+    return [
+        (title, transcript, grade, diff)
+        for diff, _, title, transcript, grade in candidates[:k]
+    ]
+
+
+def get_recommendation(level: float, conn: sqlite3.Connection):
+    """Return the record nearest to ``level + 1`` in readability."""
+
+    matches = get_recommendations(level, conn)
+    return matches[0] if matches else None
 
 
 def main() -> None:
@@ -25,19 +69,26 @@ def main() -> None:
     parser.add_argument(
         "--level", type=float, required=True, help="User language level"
     )
+    parser.add_argument(
+        "--top", type=int, default=1, help="Number of transcripts to show"
+    )
+    parser.add_argument(
+        "--window",
+        type=float,
+        help="Only consider grade levels within this distance of level + 1",
+    )
     args = parser.parse_args()
 
-    with sqlite3.connect(DB_PATH) as conn:
-        rec = get_recommendation(args.level, conn)
+    with connect(DB_PATH) as conn:
+        recs = get_recommendations(args.level, conn, args.top, args.window)
 
-    if rec:
-        title, transcript, grade_level, _ = rec
+    if not recs:
+        print("No content available")
+    for title, transcript, grade_level, _ in recs:
         print(f"Recommended content: {title}")
         print(f"Grade level: {grade_level:.2f}")
         print("--- Transcript ---")
         print(transcript)
-    else:
-        print("No content available")
 
 
 if __name__ == "__main__":
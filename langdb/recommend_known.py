@@ -1,9 +1,13 @@
 """Recommendation utilities using the learner's known vocabulary."""
 
+import argparse
 import re
 import sqlite3
 from pathlib import Path
 
+from langdb.connections import connect
+from langdb.coverage import CoverageIndex, load_index
+
 CONTENT_DB = Path("data/content.db")
 USER_DB = Path("data/user_words.db")
 
@@ -25,9 +29,20 @@ def coverage_score(transcript: str, known_words: set[str]) -> float:
     return known_count / len(words)
 
 
-def best_match(conn_content: sqlite3.Connection, known_words: set[str]):
-    """Return the transcript with the highest known-word coverage."""
+def best_match(
+    conn_content: sqlite3.Connection,
+    known_words: set[str],
+    index: CoverageIndex | None = None,
+):
+    """Return the transcript with the highest known-word coverage.
+
+    With a prebuilt *index* the scores come from :mod:`langdb.coverage`
+    instead of re-tokenising every transcript.
+    """
 
+    if index is not None:
+        matches = top_matches(conn_content, known_words, 1, index)
+        return matches[0] if matches else None
     rows = conn_content.execute("SELECT title, transcript FROM content").fetchall()
     best = None
     best_score = -1.0
@@ -39,28 +54,64 @@ def best_match(conn_content: sqlite3.Connection, known_words: set[str]):
     return best
 
 
+def top_matches(
+    conn_content: sqlite3.Connection,
+    known_words: set[str],
+    k: int = 5,
+    index: CoverageIndex | None = None,
+) -> list[tuple[str, str, float]]:
+    """Return up to *k* ``(title, transcript, score)`` tuples, best first.
+
+    Uses the index saved at ingest time, or builds one from ``conn_content``
+    if none exists yet.
+    """
+
+    if index is None:
+        index = load_index() or CoverageIndex.build(conn_content)
+    ranked = index.top_k(known_words, k)
+    if not ranked:
+        return []
+    ids = [content_id for content_id, _ in ranked]
+    placeholders = ",".join("?" * len(ids))
+    rows = {
+        row[0]: row[1:]
+        for row in conn_content.execute(
+            f"SELECT id, title, transcript FROM content WHERE id IN ({placeholders})",
+            ids,
+        )
+    }
+    return [
+        (*rows[content_id], score)
+        for content_id, score in ranked
+        if content_id in rows
+    ]
+
+
 def main() -> None:
     """CLI entry point for recommending content by known vocabulary."""
 
-    with sqlite3.connect(CONTENT_DB) as conn_content, sqlite3.connect(
-        USER_DB
-    ) as conn_user:
+    parser = argparse.ArgumentParser(description="Recommend transcript by known words")
+    parser.add_argument(
+        "--top", type=int, default=1, help="Number of transcripts to show"
+    )
+    args = parser.parse_args()
+
+    with connect(CONTENT_DB) as conn_content, connect(USER_DB) as conn_user:
         known_words = load_known_words(conn_user)
         if not known_words:
             print(
                 "No known words stored. Add words using 'python -m langdb.manage_words'."
             )
             return
-        match = best_match(conn_content, known_words)
+        matches = top_matches(conn_content, known_words, args.top)
 
-    if match:
-        title, transcript, score = match
+    if not matches:
+        print("No content available")
+    for title, transcript, score in matches:
         print(f"Recommended content: {title}")
         print(f"Known word coverage: {score*100:.1f}%")
         print("--- Transcript ---")
         print(transcript)
-    else:
-        print("No content available")
 
 
 if __name__ == "__main__":
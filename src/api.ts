@@ -2,3 +2,28 @@ export const API_BASE = (window as any).API_BASE || '';
 export function apiFetch(path: string, options?: RequestInit) {
   return fetch(`${API_BASE}${path}`, options);
 }
+
+export interface UserWord {
+  word_id: number;
+  text: string;
+  mastery_level: 'unknown' | 'learning' | 'mastered';
+  seen_count: number;
+  last_seen_at: string | null;
+}
+
+// Follows /api/user/words pages to the end. With `since`, only rows changed
+// after that watermark are returned (including words reset to unknown).
+export async function fetchUserWords(userId: number, since?: string) {
+  const words: UserWord[] = [];
+  let after: number | null = 0;
+  let watermark = '';
+  while (after !== null) {
+    const params = new URLSearchParams({ user_id: String(userId), after: String(after) });
+    if (since) params.set('since', since);
+    const page = await apiFetch(`/api/user/words?${params}`).then(r => r.json());
+    words.push(...page.words);
+    watermark = watermark || page.watermark;
+    after = page.next_after;
+  }
+  return { words, watermark };
+}
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { apiFetch } from '../api';
+import { fetchUserWords } from '../api';
 
 interface Props {
   userId: number;
@@ -12,21 +12,33 @@ interface Counts {
   mastered: number;
 }
 
+interface StoredWords {
+  watermark: string;
+  levels: Record<number, keyof Counts>;
+}
+
 export default function ProfilePage({ userId, onBack }: Props) {
   const [total, setTotal] = useState(0);
   const [counts, setCounts] = useState<Counts>({ unknown: 0, learning: 0, mastered: 0 });
 
   useEffect(() => {
-    apiFetch(`/api/user/words?user_id=${userId}`)
-      .then(res => res.json())
-      .then(data => {
-        const c = { unknown: 0, learning: 0, mastered: 0 } as Counts;
-        data.forEach((w: any) => {
-          if (c[w.mastery_level] !== undefined) c[w.mastery_level] += 1;
-        });
-        setTotal(data.length);
-        setCounts(c);
+    // Keep the last synced vocabulary locally and fetch only what changed.
+    const storageKey = `userWords:${userId}`;
+    const stored: StoredWords | null = JSON.parse(localStorage.getItem(storageKey) || 'null');
+    fetchUserWords(userId, stored?.watermark).then(({ words, watermark }) => {
+      const levels: Record<number, keyof Counts> = stored ? { ...stored.levels } : {};
+      words.forEach(w => {
+        if (w.mastery_level === 'unknown') delete levels[w.word_id];
+        else levels[w.word_id] = w.mastery_level;
+      });
+      localStorage.setItem(storageKey, JSON.stringify({ watermark, levels }));
+      const c = { unknown: 0, learning: 0, mastered: 0 } as Counts;
+      Object.values(levels).forEach(level => {
+        c[level] += 1;
       });
+      setTotal(Object.keys(levels).length);
+      setCounts(c);
+    });
   }, [userId]);
 
   return (
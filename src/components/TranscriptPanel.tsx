@@ -1,5 +1,5 @@
 import React, { useEffect, useRef, useState } from 'react';
-import { apiFetch } from '../api';
+import { apiFetch, fetchUserWords } from '../api';
 
 interface Token {
   word_id: number;
@@ -32,7 +32,7 @@ export default function TranscriptPanel({ videoId, userId, player, onWordUpdated
     Promise.all([
       apiFetch(`/api/videos/${videoId}/transcript`).then(r => r.json()),
       apiFetch(`/api/videos/${videoId}/tokens`).then(r => r.json()),
-      apiFetch(`/api/user/words?user_id=${userId}`).then(r => r.json())
+      fetchUserWords(userId).then(r => r.words)
     ]).then(([l, t, w]) => {
       setLines(l);
       setTokens(t);
@@ -11,7 +11,9 @@ describe('TranscriptPanel', () => {
     fetchMock
       .mockResolvedValueOnce({ json: () => Promise.resolve([{ start_sec: 0, end_sec: 2 }]) })
       .mockResolvedValueOnce({ json: () => Promise.resolve([{ word_id: 1, text: 'Hi', start_sec: 0, end_sec: 2 }]) })
-      .mockResolvedValueOnce({ json: () => Promise.resolve([{ word_id: 1 }]) });
+      .mockResolvedValueOnce({
+        json: () => Promise.resolve({ words: [{ word_id: 1 }], next_after: null, watermark: 'w' })
+      });
 
     render(<TranscriptPanel videoId={1} userId={1} player={null} onWordUpdated={jest.fn()} />);
 
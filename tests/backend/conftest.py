@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+import pytest
+
+# Point the backend at a throwaway database and an unreachable Redis before
+# ``backend.main`` is imported by any test module.
+_tmpdir = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/test.db")
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1")
+os.environ.setdefault("TOKEN_BLOB_DIR", f"{_tmpdir}/token_blobs")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("HASH_WORKERS", "1")
+
+# The schema is no longer created on import; apply it the way deployments do.
+from fastapi.testclient import TestClient  # noqa: E402
+from backend.main import app, engine  # noqa: E402
+from backend.migrations import upgrade  # noqa: E402
+
+upgrade(engine)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _release_app_resources():
+    """Most tests skip the lifespan, so run its shutdown once at the end to
+    close the pooled connections they opened lazily."""
+    yield
+    with TestClient(app):
+        pass
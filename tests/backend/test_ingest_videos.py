@@ -0,0 +1,130 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from backend import main
+from backend.ingest import ingest_videos
+from backend.main import (
+    app,
+    SessionLocal,
+    TranscriptToken,
+    Video,
+    VideoTranscript,
+    VideoWord,
+    Word,
+    check_video_stats,
+    segment_tokens,
+    token_blob_cache,
+)
+
+client = TestClient(app)
+
+
+def _line(video_id, segments, title="ingested"):
+    return json.dumps(
+        {
+            "id": video_id,
+            "title": title,
+            "segments": [
+                {"text": text, "start_sec": start, "end_sec": end}
+                for text, start, end in segments
+            ],
+        }
+    )
+
+
+def _counts(video_ids):
+    with SessionLocal() as db:
+        return [
+            db.scalar(
+                select(func.count()).select_from(model).where(model.video_id.in_(video_ids))
+            )
+            for model in (VideoTranscript, TranscriptToken, VideoWord)
+        ]
+
+
+def test_segment_tokens_drop_punctuation_and_interpolate():
+    assert segment_tokens("Hello, World! Let's go-kart.", 10, 18) == [
+        ("hello", 10, 12),
+        ("world", 12, 14),
+        ("let's", 14, 16),
+        ("go-kart", 16, 18),
+    ]
+    assert segment_tokens("...", 0, 5) == []
+
+
+def test_ingest_fills_token_tables_and_is_idempotent():
+    lines = [
+        _line(9001, [("Ingest alpha beta.", 0, 3), ("Beta gamma!", 3, 5)]),
+        "",
+        _line(9002, [("Alpha delta", 0, 4)]),
+    ]
+    report = ingest_videos(lines, chunk_size=1)
+    assert (report.videos, report.segments, report.tokens) == (2, 3, 7)
+    assert report.errors == []
+    assert _counts([9001, 9002]) == [3, 7, 6]
+
+    rows = client.get("/api/videos/9001/tokens").json()
+    assert [(r["text"], r["start_sec"], r["end_sec"]) for r in rows] == [
+        ("ingest", 0, 1),
+        ("alpha", 1, 2),
+        ("beta", 2, 3),
+        ("beta", 3, 4),
+        ("gamma", 4, 5),
+    ]
+
+    with SessionLocal() as db:
+        words = db.scalar(select(func.count()).select_from(Word))
+    again = ingest_videos(lines, chunk_size=2)
+    assert (again.videos, again.tokens) == (2, 7)
+    assert _counts([9001, 9002]) == [3, 7, 6]
+    assert client.get("/api/videos/9001/tokens").json() == rows
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(Word)) == words
+        assert check_video_stats(db) == []
+
+
+def test_reingest_replaces_a_video_and_reports_bad_lines():
+    ingest_videos([_line(9003, [("one two three", 0, 3)])])
+    report = ingest_videos(
+        [
+            "not json",
+            json.dumps({"id": 9003, "title": "no segments"}),
+            _line(9003, [("four five", 0, 2)], title="first"),
+            _line(9003, [("six", 0, 1)], title="second"),
+        ]
+    )
+    assert [number for number, _ in report.errors] == [1, 2]
+    assert report.videos == 1
+    assert _counts([9003]) == [1, 1, 1]
+    with SessionLocal() as db:
+        assert db.get(Video, 9003).title == "second"
+    assert [r["text"] for r in client.get("/api/videos/9003/tokens").json()] == ["six"]
+
+
+def test_reingest_during_a_compile_is_not_served_stale(monkeypatch):
+    ingest_videos([_line(9004, [("old words", 0, 2)])])
+    insert_texts = main._insert_texts
+
+    def reingest_before_writing(rows, texts):
+        # The compile has read the old rows; the new ones land before it
+        # writes its artifact.
+        monkeypatch.setattr(main, "_insert_texts", insert_texts)
+        ingest_videos([_line(9004, [("new words", 0, 2)])])
+        return insert_texts(rows, texts)
+
+    token_blob_cache.clear()
+    monkeypatch.setattr(main, "_insert_texts", reingest_before_writing)
+    raced = client.get("/api/videos/9004/tokens").json()
+    assert [r["text"] for r in raced] == ["old", "words"]
+
+    # Once this process's LRU entry lapses, Redis and the artifact on disk
+    # must not bring the old tokens back.
+    token_blob_cache.clear()
+    rows = client.get("/api/videos/9004/tokens").json()
+    assert [r["text"] for r in rows] == ["new", "words"]
@@ -0,0 +1,59 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.cache import MemoryCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_stays_bounded_under_many_users():
+    cache = MemoryCache(max_entries=500, max_bytes=256 * 1024)
+
+    async def workload():
+        for user_id in range(20_000):
+            payload = json.dumps([{"word_id": i, "text": "x" * 20} for i in range(user_id % 40)])
+            await cache.set(f"user_words:{user_id}", payload, ex=3600)
+            await cache.get(f"user_words:{user_id // 2}")
+            assert len(cache.store) <= 500
+            assert cache.store.total_bytes <= 256 * 1024
+
+    asyncio.run(workload())
+    stats = cache.stats()
+    assert stats["evictions"] > 0
+    assert stats["hits"] > 0 and stats["misses"] > 0
+    assert stats["bytes"] == sum(size for _, size, _ in cache.store._entries.values())
+
+
+def test_lru_order_and_ttl():
+    clock = FakeClock()
+    cache = MemoryCache(max_entries=2, sweep_interval=10, clock=clock)
+
+    async def scenario():
+        await cache.set("a", "1")
+        await cache.set("b", "2", ex=5)
+        assert await cache.get("a") == "1"
+        await cache.set("c", "3")
+        assert await cache.get("b") is None  # least recently used
+        assert await cache.get("a") == "1"
+
+        await cache.set("d", "4", ex=5)
+        clock.now = 6
+        assert await cache.get("d") is None
+        await cache.set("e", "5", ex=1)
+        clock.now = 20
+        await cache.get("a")  # triggers the lazy sweep
+        assert "e" not in cache.store._entries
+        assert await cache.delete("a", "missing") == 1
+
+    asyncio.run(scenario())
+    assert cache.stats()["expirations"] == 2
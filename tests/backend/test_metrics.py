@@ -0,0 +1,98 @@
+import logging
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from backend import metrics
+from backend.main import app, SessionLocal, User, UserWord, Word
+from backend.metrics import Counter, Histogram, Registry
+
+client = TestClient(app)
+
+
+def test_text_format():
+    registry = Registry()
+    hits = Counter("hits_total", "Hits.", ["cache"], registry=registry)
+    latency = Histogram(
+        "latency_seconds", "Latency.", ["route"], buckets=(0.1, 1.0), registry=registry
+    )
+    hits.inc("a")
+    hits.inc("a", amount=2)
+    hits.inc('b"\n')
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "/x")
+    assert registry.render() == "\n".join(
+        [
+            "# HELP hits_total Hits.",
+            "# TYPE hits_total counter",
+            'hits_total{cache="a"} 3',
+            'hits_total{cache="b\\"\\n"} 1',
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{route="/x",le="0.1"} 2',
+            'latency_seconds_bucket{route="/x",le="1.0"} 3',
+            'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+            'latency_seconds_sum{route="/x"} 3.65',
+            'latency_seconds_count{route="/x"} 4',
+        ]
+    ) + "\n"
+
+
+def _user_with_words():
+    with SessionLocal() as db:
+        user = User(username="metrics-user", password_hash="x")
+        word = Word(text="metrics-word")
+        db.add_all([user, word])
+        db.flush()
+        db.add(UserWord(user_id=user.id, word_id=word.id, mastery_level="mastered"))
+        db.commit()
+        return user.id
+
+
+def test_requests_queries_and_cache_are_recorded():
+    user_id = _user_with_words()
+    route = "/api/user/words"
+    requests_before = metrics.http_request_duration.count("GET", route)
+    misses = metrics.cache_requests.value("user_words", "miss")
+    hits = metrics.cache_requests.value("user_words", "hit")
+
+    for _ in range(2):
+        assert client.get(route, params={"user_id": user_id}).status_code == 200
+    assert client.get("/api/videos/999999/tokens").status_code == 404
+
+    assert metrics.http_request_duration.count("GET", route) == requests_before + 2
+    assert metrics.cache_requests.value("user_words", "miss") == misses + 1
+    assert metrics.cache_requests.value("user_words", "hit") == hits + 1
+    assert metrics.cache_fallbacks.value() >= 1
+
+    body = client.get("/metrics").text
+    assert 'cache_backend{backend="memory"} 1' in body
+    stats = app.state.redis.stats()
+    assert stats["hits"] >= 1 and stats["misses"] >= 1
+    for sample in (
+        f'memory_cache_lookups_total{{result="hit"}} {stats["hits"]}',
+        f'memory_cache_lookups_total{{result="miss"}} {stats["misses"]}',
+        f'memory_cache_removals_total{{reason="evicted"}} {stats["evictions"]}',
+        f"memory_cache_entries {stats['entries']}",
+        f"memory_cache_bytes {stats['bytes']}",
+    ):
+        assert sample in body.splitlines()
+    assert (
+        'http_requests_total{method="GET",route="/api/videos/{video_id}/tokens",'
+        'status="404"}'
+    ) in body
+    # The miss ran the page queries; the hit ran none.
+    queries = metrics.http_request_queries._values[(route,)][0]
+    assert queries[0] >= 1 and sum(queries[1:]) >= 1
+
+
+def test_slow_queries_are_logged(monkeypatch, caplog):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_SECONDS", 0.0)
+    slow = metrics.db_slow_queries.value("sync")
+    with caplog.at_level(logging.WARNING, logger="backend.sql"):
+        with SessionLocal() as db:
+            db.query(Word).filter(Word.text == "metrics-slow").first()
+    assert metrics.db_slow_queries.value("sync") > slow
+    assert any("FROM words" in record.getMessage() for record in caplog.records)
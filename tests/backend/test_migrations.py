@@ -0,0 +1,152 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, inspect, text
+from backend.main import Base
+from backend import wordsets
+from backend.migrations import HEAD, current_version, upgrade
+
+
+def test_fresh_database_is_created_at_head(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/fresh.db")
+    assert upgrade(engine)
+    with engine.connect() as conn:
+        assert current_version(conn) == HEAD
+        assert set(Base.metadata.tables) <= set(inspect(conn).get_table_names())
+    assert upgrade(engine) == []
+
+
+def test_unversioned_database_runs_every_revision(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR NOT NULL,"
+            " password_hash VARCHAR NOT NULL)"
+        ))
+        conn.execute(text("INSERT INTO users (username, password_hash) VALUES ('a', 'x')"))
+        conn.execute(text("CREATE TABLE words (id INTEGER PRIMARY KEY, text VARCHAR NOT NULL UNIQUE)"))
+        conn.execute(text(
+            "CREATE TABLE videos (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL,"
+            " thumbnail_url VARCHAR NOT NULL, score INTEGER NOT NULL)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE video_words (id INTEGER PRIMARY KEY, video_id INTEGER NOT NULL,"
+            " word_id INTEGER NOT NULL)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE user_words (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL,"
+            " word_id INTEGER NOT NULL, seen_count INTEGER NOT NULL,"
+            " last_seen_at DATETIME, mastery_level VARCHAR(8) NOT NULL)"
+        ))
+        conn.execute(text("INSERT INTO words (id, text) VALUES (1, 'hola'), (2, 'adios')"))
+        conn.execute(text("INSERT INTO videos (id, title, thumbnail_url, score) VALUES (1, 'v', 't', 1)"))
+        conn.execute(text("INSERT INTO video_words (video_id, word_id) VALUES (1, 1), (1, 2)"))
+        conn.execute(text(
+            "INSERT INTO user_words (user_id, word_id, seen_count, last_seen_at, mastery_level)"
+            " VALUES (1, 1, 1, NULL, 'mastered')"
+        ))
+    applied = upgrade(engine)
+    assert [v for v, _ in applied] == list(range(1, HEAD + 1))
+    with engine.connect() as conn:
+        assert current_version(conn) == HEAD
+        assert conn.scalar(text("SELECT count(*) FROM users")) == 1
+        assert "user_words" in inspect(conn).get_table_names()
+        assert conn.execute(text("SELECT video_id, word_count FROM video_stats")).all() == [(1, 2)]
+        assert conn.execute(text(
+            "SELECT user_id, video_id, unknown_count FROM user_video_stats"
+        )).all() == [(1, 1, 1)]
+
+
+def test_duplicate_user_words_are_collapsed(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/dupes.db")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE words (id INTEGER PRIMARY KEY, text VARCHAR NOT NULL UNIQUE)"))
+        conn.execute(text(
+            "CREATE TABLE user_words (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL,"
+            " word_id INTEGER NOT NULL, seen_count INTEGER NOT NULL,"
+            " last_seen_at DATETIME, mastery_level VARCHAR(8) NOT NULL)"
+        ))
+        conn.execute(text("CREATE INDEX ix_user_words_user_id ON user_words (user_id)"))
+        conn.execute(text("INSERT INTO words (id, text) VALUES (1, 'hola')"))
+        conn.execute(text(
+            "INSERT INTO user_words (user_id, word_id, seen_count, last_seen_at, mastery_level)"
+            " VALUES (7, 1, 2, '2024-01-01 00:00:00', 'learning'),"
+            " (7, 1, 3, '2024-02-01 00:00:00', 'mastered'),"
+            " (7, 1, 1, NULL, 'unknown'),"
+            " (8, 1, 1, NULL, 'unknown')"
+        ))
+    upgrade(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT user_id, seen_count, mastery_level FROM user_words ORDER BY user_id"
+        )).all()
+        indexes = {ix["name"] for ix in inspect(conn).get_indexes("user_words")}
+    assert rows == [(7, 6, "mastered"), (8, 1, "unknown")]
+    assert "uq_user_words_user_word" in indexes
+    assert "ix_user_words_user_id" not in indexes
+
+
+def test_existing_user_words_get_schedules_from_their_level(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/schedule.db")
+    upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_user_words_user_due"))
+        for name in ("ease", "interval_days", "repetitions", "due_at"):
+            conn.execute(text(f"ALTER TABLE user_words DROP COLUMN {name}"))
+        conn.execute(text("UPDATE schema_version SET version = 3"))
+        conn.execute(text("INSERT INTO words (id, text) VALUES (1, 'hola'), (2, 'adios')"))
+        conn.execute(text(
+            "INSERT INTO user_words (user_id, word_id, seen_count, last_seen_at,"
+            " mastery_level, updated_at)"
+            " VALUES (7, 1, 3, '2024-02-01 00:00:00', 'mastered', '2024-02-01 00:00:00'),"
+            " (7, 2, 0, NULL, 'unknown', '2024-03-01 00:00:00')"
+        ))
+    assert [v for v, _ in upgrade(engine)] == list(range(4, HEAD + 1))
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT word_id, interval_days, repetitions, due_at, updated_at"
+            " FROM user_words ORDER BY word_id"
+        )).all()
+        indexes = {ix["name"] for ix in inspect(conn).get_indexes("user_words")}
+    assert [tuple(r) for r in rows] == [
+        (1, 6, 2, "2024-02-07 00:00:00.000000", "2024-02-01 00:00:00"),
+        (2, 0, 0, "2024-03-01 00:00:00.000000", "2024-03-01 00:00:00"),
+    ]
+    assert "ix_user_words_user_due" in indexes
+
+
+def test_users_get_a_vocabulary_version(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/versions.db")
+    upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE catalogue_version"))
+        conn.execute(text("ALTER TABLE users DROP COLUMN vocab_version"))
+        conn.execute(text("UPDATE schema_version SET version = 4"))
+        conn.execute(text("INSERT INTO users (username, password_hash) VALUES ('a', 'x')"))
+    assert [v for v, _ in upgrade(engine)] == list(range(5, HEAD + 1))
+    with engine.connect() as conn:
+        assert conn.scalar(text("SELECT vocab_version FROM users")) == 0
+        assert "catalogue_version" in inspect(conn).get_table_names()
+
+
+def test_video_word_sets_are_encoded_from_video_words(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/word_sets.db")
+    upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE video_word_sets"))
+        conn.execute(text("UPDATE schema_version SET version = 5"))
+        conn.execute(text("INSERT INTO words (id, text) VALUES (1, 'hola'), (70000, 'adios')"))
+        conn.execute(text(
+            "INSERT INTO video_words (video_id, word_id) VALUES (3, 70000), (3, 1), (4, 1)"
+        ))
+    assert [v for v, _ in upgrade(engine)] == list(range(6, HEAD + 1))
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT video_id, word_ids FROM video_word_sets ORDER BY video_id"
+        )).all()
+    assert [(v, list(wordsets.decode(blob))) for v, blob in rows] == [
+        (3, [1, 70000]),
+        (4, [1]),
+    ]
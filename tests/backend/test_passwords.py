@@ -0,0 +1,72 @@
+import asyncio
+import os
+import signal
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from backend.main import app, SessionLocal, User, password_hasher
+from backend.passwords import PasswordHasher
+
+client = TestClient(app)
+
+
+def _stored_hash(username):
+    with SessionLocal() as db:
+        return db.query(User).filter_by(username=username).one().password_hash
+
+
+def test_signup_and_login_round_trip():
+    creds = {"username": "pw-roundtrip", "password": "s3cret"}
+    assert client.post("/signup", json=creds).status_code == 200
+    assert _stored_hash("pw-roundtrip").startswith("$2b$04$")
+
+    assert client.post("/login", json=creds).status_code == 200
+    bad = dict(creds, password="wrong")
+    assert client.post("/login", json=bad).status_code == 400
+
+
+def test_login_rehashes_when_cost_changes():
+    creds = {"username": "pw-rehash", "password": "s3cret"}
+    assert client.post("/signup", json=creds).status_code == 200
+    old_rounds = password_hasher.rounds
+    password_hasher.rounds = 5
+    try:
+        assert client.post("/login", json=creds).status_code == 200
+    finally:
+        password_hasher.rounds = old_rounds
+    assert _stored_hash("pw-rehash").startswith("$2b$05$")
+    assert client.post("/login", json=creds).status_code == 200
+
+
+def test_saturated_hasher_sheds_load():
+    old_limit = password_hasher.max_pending
+    password_hasher.max_pending = 0
+    try:
+        response = client.post(
+            "/login", json={"username": "pw-roundtrip", "password": "x"}
+        )
+    finally:
+        password_hasher.max_pending = old_limit
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(password_hasher.retry_after)
+
+
+def test_pool_is_replaced_after_a_worker_dies():
+    hasher = PasswordHasher(rounds=4, workers=1)
+
+    async def scenario():
+        hashed = await hasher.hash("s3cret")
+        broken = hasher._executor
+        for process in list(broken._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        assert (await hasher.verify("s3cret", hashed))[0]
+        assert hasher._executor is not broken
+        assert (await hasher.verify("s3cret", hashed))[0]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,90 @@
+import re
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from backend.main import (
+    app,
+    engine,
+    rebuild_video_stats,
+    SessionLocal,
+    TranscriptToken,
+    User,
+    Video,
+    VideoTranscript,
+    VideoWord,
+    Word,
+)
+
+
+def _make_fixture():
+    with SessionLocal() as db:
+        user = User(username="plans", password_hash="x")
+        video = Video(title="plans", thumbnail_url="t", score=1)
+        words = [Word(text=f"plans-{i}") for i in range(5)]
+        db.add_all([user, video] + words)
+        db.flush()
+        db.add_all(VideoWord(video_id=video.id, word_id=w.id) for w in words)
+        db.add_all(
+            TranscriptToken(video_id=video.id, word_id=w.id, start_sec=i, end_sec=i + 1)
+            for i, w in enumerate(words)
+        )
+        db.add_all(
+            VideoTranscript(video_id=video.id, text="x", start_sec=i, end_sec=i + 1)
+            for i in range(3)
+        )
+        db.commit()
+        rebuild_video_stats(db, video_ids=[video.id])
+        return user.id, video.id, [w.id for w in words]
+
+
+def _endpoint_statements(client, user_id, video_id, word_ids):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    sync_engine = app.state.async_engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        client.post(
+            "/api/user/quiz",
+            json={"user_id": user_id, "answers": [{"word_id": word_ids[0], "correct": True}]},
+        )
+        client.patch(
+            f"/api/user/words/{word_ids[1]}",
+            json={"user_id": user_id, "mastery_level": 2},
+        )
+        client.get("/api/user/words", params={"user_id": user_id})
+        client.get(
+            "/api/user/words",
+            params={"user_id": user_id, "since": "2000-01-01T00:00:00"},
+        )
+        client.get("/api/user/review-queue", params={"user_id": user_id})
+        client.get("/api/videos/recommendations", params={"user_id": user_id})
+        client.get(f"/api/videos/{video_id}/transcript", params={"start_sec": 1})
+        client.get(f"/api/videos/{video_id}/tokens", params={"start_sec": 1})
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+    return statements
+
+
+def test_endpoint_queries_use_indexes():
+    user_id, video_id, word_ids = _make_fixture()
+    with TestClient(app) as client:
+        statements = _endpoint_statements(client, user_id, video_id, word_ids)
+    assert statements
+
+    scans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            if statement.lstrip().upper().startswith("INSERT"):
+                continue
+            plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+            for *_, detail in plan:
+                if re.match(r"SCAN (?!CONSTANT ROW)\w+", detail):
+                    scans.append((detail, " ".join(statement.split())[:120]))
+    assert scans == []
@@ -0,0 +1,176 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from backend.main import (
+    app,
+    engine,
+    SessionLocal,
+    MasteryLevel,
+    QuizAnswer,
+    User,
+    UserVideoStat,
+    UserWord,
+    Video,
+    VideoWord,
+    Word,
+    check_video_stats,
+    rebuild_video_stats,
+    record_word_interaction,
+    record_word_interactions,
+)
+
+client = TestClient(app)
+
+
+def _make_user(name):
+    with SessionLocal() as db:
+        user = User(username=name, password_hash="x")
+        words = [Word(text=f"{name}-{i}") for i in range(3)]
+        db.add(user)
+        db.add_all(words)
+        db.commit()
+        return user.id, [w.id for w in words]
+
+
+def _levels(user_id):
+    with SessionLocal() as db:
+        rows = db.query(UserWord).filter_by(user_id=user_id).all()
+        return {r.word_id: (r.mastery_level, r.seen_count) for r in rows}
+
+
+def test_quiz_batch_matches_sequential_semantics():
+    batch_user, (a, b, c) = _make_user("batch")
+    answers = [
+        (a, True), (a, True), (a, True),
+        (b, True), (b, False),
+        (c, False),
+    ]
+    response = client.post(
+        "/api/user/quiz",
+        json={
+            "user_id": batch_user,
+            "answers": [{"word_id": w, "correct": ok} for w, ok in answers],
+        },
+    )
+    assert response.status_code == 200
+
+    seq_user, (sa, sb, sc) = _make_user("sequential")
+    remap = {a: sa, b: sb, c: sc}
+    with SessionLocal() as db:
+        for w, ok in answers:
+            record_word_interaction(db, seq_user, remap[w], ok)
+
+    batch = _levels(batch_user)
+    sequential = _levels(seq_user)
+    assert batch == {w: sequential[remap[w]] for w in (a, b, c)}
+    assert batch[a] == (MasteryLevel.mastered, 3)
+    assert batch[b] == (MasteryLevel.unknown, 2)
+
+
+def test_quiz_batch_updates_existing_rows():
+    user_id, (a, _, _) = _make_user("existing")
+    with SessionLocal() as db:
+        record_word_interaction(db, user_id, a, True)
+    client.post(
+        "/api/user/quiz",
+        json={"user_id": user_id, "answers": [{"word_id": a, "correct": True}]},
+    )
+    assert _levels(user_id) == {a: (MasteryLevel.mastered, 2)}
+
+
+def test_unknown_words_are_not_listed():
+    user_id, (a, b, c) = _make_user("listing")
+    client.post(
+        "/api/user/quiz",
+        json={
+            "user_id": user_id,
+            "answers": [
+                {"word_id": a, "correct": True},
+                {"word_id": b, "correct": False},
+            ],
+        },
+    )
+    listed = client.get("/api/user/words", params={"user_id": user_id}).json()
+    assert [w["word_id"] for w in listed["words"]] == [a]
+
+
+def test_concurrent_quizzes_introducing_the_same_word():
+    user_id, (a, b, _) = _make_user("concurrent")
+    with SessionLocal() as db:
+        video = Video(title="concurrent video", thumbnail_url="t", score=1)
+        db.add(video)
+        db.flush()
+        db.add_all(VideoWord(video_id=video.id, word_id=w) for w in (a, b))
+        db.commit()
+        video_id = video.id
+        rebuild_video_stats(db)
+
+    # Hold each submission just before it writes its user_words rows until
+    # both have read them; with the users row locked the second one cannot
+    # get that far, and the first goes on once the barrier times out.
+    barrier = threading.Barrier(2, timeout=1)
+
+    def before_upsert(conn, cursor, statement, *_):
+        if statement.startswith("INSERT INTO user_words"):
+            try:
+                barrier.wait()
+            except threading.BrokenBarrierError:
+                pass
+
+    def submit():
+        with SessionLocal() as db:
+            record_word_interactions(db, user_id, [QuizAnswer(word_id=a, correct=True)])
+
+    event.listen(engine, "before_cursor_execute", before_upsert)
+    try:
+        threads = [threading.Thread(target=submit) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_upsert)
+
+    assert _levels(user_id) == {a: (MasteryLevel.mastered, 2)}
+    with SessionLocal() as db:
+        assert db.get(UserVideoStat, (user_id, video_id)).unknown_count == 1
+        assert check_video_stats(db, [user_id]) == []
+
+
+def test_answers_for_unknown_words_are_rejected():
+    user_id, (a, _, _) = _make_user("unknown-words")
+    response = client.post(
+        "/api/user/quiz",
+        json={
+            "user_id": user_id,
+            "answers": [
+                {"word_id": a, "correct": True},
+                {"word_id": 10**9, "correct": True},
+            ],
+        },
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == f"unknown word_id {10**9}"
+    patched = client.patch(
+        f"/api/user/words/{10**9}",
+        json={"user_id": user_id, "mastery_level": 1},
+    )
+    assert patched.status_code == 404
+    assert _levels(user_id) == {}
+
+    signup = client.post(
+        "/signup",
+        json={
+            "username": "unknown-words-signup",
+            "password": "pw",
+            "quiz_answers": [{"word_id": 10**9, "correct": True}],
+        },
+    )
+    assert signup.status_code == 404
+    with SessionLocal() as db:
+        assert not db.query(User).filter_by(username="unknown-words-signup").count()
@@ -0,0 +1,109 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from backend import metrics
+from backend.main import (
+    app,
+    SessionLocal,
+    CatalogueVersion,
+    User,
+    Video,
+    VideoWord,
+    Word,
+    rebuild_video_stats,
+)
+
+client = TestClient(app)
+
+
+def _setup(prefix):
+    with SessionLocal() as db:
+        words = [Word(text=f"{prefix}-{i}") for i in range(2)]
+        video = Video(title=f"{prefix} video", thumbnail_url="t", score=5)
+        user = User(username=f"{prefix}-user", password_hash="x")
+        db.add_all(words + [video, user])
+        db.flush()
+        db.add_all(VideoWord(video_id=video.id, word_id=word.id) for word in words)
+        db.commit()
+        rebuild_video_stats(db)
+        return user.id, [word.id for word in words], video.id
+
+
+def _recommended(user_id, video_id):
+    response = client.get(
+        "/api/videos/recommendations", params={"user_id": user_id, "limit": 100}
+    )
+    assert response.status_code == 200
+    return [v["new_word_count"] for v in response.json() if v["id"] == video_id]
+
+
+def _lookups():
+    return (
+        metrics.cache_requests.value("recommendations", "hit"),
+        metrics.cache_requests.value("recommendations", "miss"),
+    )
+
+
+def _vocab_version(user_id):
+    with SessionLocal() as db:
+        return db.get(User, user_id).vocab_version
+
+
+def _set_level(user_id, word_id, level):
+    response = client.patch(
+        f"/api/user/words/{word_id}",
+        json={"user_id": user_id, "mastery_level": level},
+    )
+    assert response.status_code == 200
+
+
+def test_known_state_changes_move_to_a_new_key():
+    user_id, (w0, w1), video_id = _setup("reccache")
+    hits, misses = _lookups()
+    assert _recommended(user_id, video_id) == []
+    assert _recommended(user_id, video_id) == []
+    assert _lookups() == (hits + 1, misses + 1)
+
+    _set_level(user_id, w0, 1)
+    assert _vocab_version(user_id) == 1
+    assert _recommended(user_id, video_id) == [1]
+    assert _lookups() == (hits + 1, misses + 2)
+
+    # learning -> mastered keeps the word known: same version, cached result.
+    _set_level(user_id, w0, 2)
+    assert _vocab_version(user_id) == 1
+    assert _recommended(user_id, video_id) == [1]
+    assert _lookups() == (hits + 2, misses + 2)
+
+    client.post(
+        "/api/user/quiz",
+        json={"user_id": user_id, "answers": [{"word_id": w1, "correct": True}]},
+    )
+    assert _vocab_version(user_id) == 2
+    assert _recommended(user_id, video_id) == [0]
+
+
+def test_rebuilding_stats_bumps_the_catalogue_version():
+    user_id, _, video_id = _setup("reccache-catalogue")
+    with SessionLocal() as db:
+        before = db.get(CatalogueVersion, 1).version
+        assert _recommended(user_id, video_id) == []
+        db.add(Video(title="reccache new", thumbnail_url="t", score=1))
+        db.commit()
+        rebuild_video_stats(db)
+        db.expire_all()
+        assert db.get(CatalogueVersion, 1).version == before + 1
+    hits, misses = _lookups()
+    _recommended(user_id, video_id)
+    assert _lookups() == (hits, misses + 1)
+
+
+def test_unknown_users_are_not_cached():
+    hits, misses = _lookups()
+    assert client.get(
+        "/api/videos/recommendations", params={"user_id": 987654}
+    ).status_code == 200
+    assert _lookups() == (hits, misses)
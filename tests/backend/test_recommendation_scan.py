@@ -0,0 +1,140 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from backend import metrics
+from backend.main import (
+    app,
+    RECOMMENDATION_MAX_LIMIT,
+    SessionLocal,
+    User,
+    UserWord,
+    Video,
+    VideoWord,
+    Word,
+    rebuild_video_stats,
+    video_catalogue,
+)
+
+client = TestClient(app)
+
+
+def _setup(prefix):
+    """Six videos over five words, two sharing a score, and a user knowing
+    the first two words."""
+    with SessionLocal() as db:
+        words = [Word(text=f"{prefix}-{i}") for i in range(5)]
+        videos = [
+            Video(title=f"{prefix} video {i}", thumbnail_url="t", score=score)
+            for i, score in enumerate((900, 800, 800, 700, 600, 500))
+        ]
+        user = User(username=f"{prefix}-user", password_hash="x")
+        db.add_all(words + videos + [user])
+        db.flush()
+        w = [word.id for word in words]
+        layout = [w[:2], w[:3], w[1:4], w[2:5], w[:1], w[3:4]]
+        db.add_all(
+            VideoWord(video_id=video.id, word_id=word_id)
+            for video, word_ids in zip(videos, layout)
+            for word_id in word_ids
+        )
+        db.add_all(
+            UserWord(user_id=user.id, word_id=word_id, mastery_level=level)
+            for word_id, level in ((w[0], "mastered"), (w[1], "learning"), (w[2], "unknown"))
+        )
+        db.commit()
+        rebuild_video_stats(db)
+        return user.id, [video.id for video in videos]
+
+
+def _recommended(user_id, video_ids, **params):
+    response = client.get(
+        "/api/videos/recommendations",
+        params={"user_id": user_id, "limit": 1000, **params},
+    )
+    assert response.status_code == 200
+    return [(v["id"], v["new_word_count"]) for v in response.json() if v["id"] in video_ids]
+
+
+def test_scan_matches_stats_for_every_threshold():
+    user_id, vids = _setup("scan-modes")
+    expected = {
+        0: [(vids[0], 0), (vids[4], 0)],
+        1: [(vids[0], 0), (vids[1], 1), (vids[4], 0), (vids[5], 1)],
+        2: [(vids[0], 0), (vids[1], 1), (vids[2], 2), (vids[4], 0), (vids[5], 1)],
+    }
+    for max_new_words, videos in expected.items():
+        for mode in ("stats", "scan"):
+            assert _recommended(
+                user_id, vids, max_new_words=max_new_words, mode=mode
+            ) == videos
+
+
+def test_scan_stops_once_enough_videos_qualify():
+    user_id, vids = _setup("scan-early")
+    response = client.get(
+        "/api/videos/recommendations",
+        params={"user_id": user_id, "limit": 1, "mode": "scan"},
+    )
+    first = response.json()[0]
+    assert response.json() == client.get(
+        "/api/videos/recommendations", params={"user_id": user_id, "limit": 1}
+    ).json()
+
+    with SessionLocal() as db:
+        known = [
+            word_id for (word_id,) in db.query(UserWord.word_id).filter(
+                UserWord.user_id == user_id, UserWord.mastery_level != "unknown"
+            )
+        ]
+    found, examined = video_catalogue.top(known, 1, 1)
+    assert found == [(first["id"], first["new_word_count"])]
+    assert examined < len(video_catalogue)
+
+
+def test_catalogue_reloads_after_ingest():
+    user_id, vids = _setup("scan-reload")
+    assert (vids[3], 1) not in _recommended(user_id, vids, mode="scan")
+    with SessionLocal() as db:
+        db.query(VideoWord).filter(
+            VideoWord.video_id == vids[3],
+            VideoWord.word_id.notin_(
+                db.query(VideoWord.word_id)
+                .filter(VideoWord.video_id == vids[5])
+                .scalar_subquery()
+            ),
+        ).delete(synchronize_session=False)
+        db.commit()
+        rebuild_video_stats(db, video_ids=[vids[3]])
+    assert (vids[3], 1) in _recommended(user_id, vids, mode="scan")
+
+
+def test_scan_runs_on_the_request_session():
+    user_id, vids = _setup("scan-async")
+    sync_statements = metrics.db_query_duration.count("sync")
+    async_statements = metrics.db_query_duration.count("async")
+    assert _recommended(user_id, vids, mode="scan")
+    assert metrics.db_query_duration.count("sync") == sync_statements
+    assert metrics.db_query_duration.count("async") > async_statements
+
+
+def test_limit_is_validated_for_both_modes():
+    user_id, vids = _setup("scan-limit")
+    for mode in ("stats", "scan"):
+        for limit in (0, -1, RECOMMENDATION_MAX_LIMIT + 1):
+            response = client.get(
+                "/api/videos/recommendations",
+                params={"user_id": user_id, "limit": limit, "mode": mode},
+            )
+            assert response.status_code == 422
+    first = [
+        client.get(
+            "/api/videos/recommendations",
+            params={"user_id": user_id, "limit": 1, "mode": mode},
+        ).json()
+        for mode in ("stats", "scan")
+    ]
+    assert len(first[0]) == 1
+    assert first[0] == first[1]
@@ -0,0 +1,118 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from backend.main import (
+    app,
+    recompute_schedules,
+    SessionLocal,
+    User,
+    UserWord,
+    Word,
+)
+from backend.scheduler import INITIAL_EASE, MIN_EASE, review
+
+client = TestClient(app)
+
+
+def _make_user(name, n_words=4):
+    with SessionLocal() as db:
+        user = User(username=name, password_hash="x")
+        words = [Word(text=f"{name}-{i}") for i in range(n_words)]
+        db.add_all([user] + words)
+        db.commit()
+        return user.id, [w.id for w in words]
+
+
+def _quiz(user_id, answers):
+    response = client.post(
+        "/api/user/quiz",
+        json={
+            "user_id": user_id,
+            "answers": [{"word_id": w, "correct": c} for w, c in answers],
+        },
+    )
+    assert response.status_code == 200
+
+
+def _queue(user_id, **params):
+    response = client.get(
+        "/api/user/review-queue", params={"user_id": user_id, **params}
+    )
+    assert response.status_code == 200
+    return [w["word_id"] for w in response.json()["words"]]
+
+
+def _schedules(user_id):
+    with SessionLocal() as db:
+        rows = db.query(UserWord).filter_by(user_id=user_id).all()
+        return {
+            r.word_id: (r.repetitions, r.interval_days, r.due_at - r.last_seen_at)
+            for r in rows
+        }
+
+
+def test_sm2_intervals_grow_and_lapses_reset():
+    state = (INITIAL_EASE, 0, 0)
+    intervals = []
+    for _ in range(4):
+        state = review(*state, True)
+        intervals.append(state[1])
+    assert intervals == [1, 6, 15, 38]
+    ease, interval, repetitions = review(*state, False)
+    assert (interval, repetitions) == (1, 0)
+    assert MIN_EASE <= ease < INITIAL_EASE
+
+
+def test_quiz_answers_schedule_reviews():
+    user_id, (a, b, c, _) = _make_user("sched")
+    _quiz(user_id, [(a, True), (a, True), (b, True), (c, False)])
+    assert _schedules(user_id) == {
+        a: (2, 6, timedelta(days=6)),
+        b: (1, 1, timedelta(days=1)),
+        c: (0, 1, timedelta(days=1)),
+    }
+    assert _queue(user_id) == []
+
+
+def test_queue_returns_due_words_most_overdue_first():
+    user_id, (a, b, c, d) = _make_user("due")
+    _quiz(user_id, [(a, True), (b, True), (c, True), (d, True)])
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        for word_id, due_at in (
+            (a, now - timedelta(days=1)),
+            (b, now - timedelta(days=3)),
+            (c, now - timedelta(hours=1)),
+        ):
+            db.query(UserWord).filter_by(user_id=user_id, word_id=word_id).update(
+                {"due_at": due_at}
+            )
+        db.commit()
+    assert _queue(user_id) == [b, a, c]
+    assert _queue(user_id, limit=2) == [b, a]
+
+    # Answering a due word moves it out of the queue.
+    _quiz(user_id, [(b, True)])
+    assert _queue(user_id) == [a, c]
+
+
+def test_mastery_changes_reset_the_schedule():
+    user_id, (a, b, _, _) = _make_user("reset")
+    client.patch(f"/api/user/words/{a}", json={"user_id": user_id, "mastery_level": 0})
+    client.patch(f"/api/user/words/{b}", json={"user_id": user_id, "mastery_level": 2})
+    assert _queue(user_id) == [a]
+
+    with SessionLocal() as db:
+        db.query(UserWord).filter_by(user_id=user_id).update({"ease": 1.5})
+        db.commit()
+        assert recompute_schedules(db, user_ids=[user_id]) == 2
+        db.commit()
+        rows = db.query(UserWord).filter_by(user_id=user_id).all()
+    assert {r.word_id: (r.ease, r.interval_days) for r in rows} == {
+        a: (INITIAL_EASE, 0),
+        b: (INITIAL_EASE, 6),
+    }
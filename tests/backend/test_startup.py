@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from fastapi.testclient import TestClient
+from backend.main import app
+
+IMPORT_PROBE = """
+import sys
+import backend.main
+lazy = ["redis", "passlib", "bcrypt", "sqlalchemy.dialects.postgresql", "aiosqlite"]
+print(",".join(m for m in lazy if m in sys.modules))
+"""
+
+
+def test_import_does_no_io_or_heavy_imports(tmp_path):
+    db_path = tmp_path / "never-created.db"
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        SEED_DATA="true",
+        PYTHONPATH=str(ROOT),
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+    assert not db_path.exists()
+
+
+def test_lifespan_opens_and_releases_resources():
+    with TestClient(app) as client:
+        assert hasattr(app.state, "sessionmaker")
+        assert hasattr(app.state, "redis")
+        assert client.get("/health").status_code == 200
+    assert not hasattr(app.state, "sessionmaker")
+    assert not hasattr(app.state, "redis")
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from backend import main
+from backend.main import (
+    app,
+    get_redis,
+    get_sessionmaker,
+    SessionLocal,
+    User,
+    USER_WORDS_BLOCK,
+    USER_WORDS_PAGE_BLOCKS,
+    Word,
+    _current_versions,
+    _user_words_version_keys,
+    cached_json,
+)
+
+
+def _make_user(name, n_words=3):
+    with SessionLocal() as db:
+        user = User(username=name, password_hash="x")
+        words = [Word(text=f"{name}-{i}") for i in range(n_words)]
+        db.add_all([user] + words)
+        db.commit()
+        return user.id, [w.id for w in words]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, *args):
+        # The page query: known words for one user in word_id order.
+        if "ORDER BY user_words.word_id" in statement:
+            self.count += 1
+
+    def __enter__(self):
+        get_sessionmaker()
+        self.engine = app.state.async_engine.sync_engine
+        event.listen(self.engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self)
+
+
+async def _burst(client, user_id, n=25):
+    responses = await asyncio.gather(
+        *(client.get("/api/user/words", params={"user_id": user_id}) for _ in range(n))
+    )
+    assert all(r.status_code == 200 for r in responses)
+    return [r.json()["words"] for r in responses]
+
+
+def test_parallel_misses_share_one_query():
+    user_id, word_ids = _make_user("burst")
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            await client.post(
+                "/api/user/quiz",
+                json={
+                    "user_id": user_id,
+                    "answers": [{"word_id": w, "correct": True} for w in word_ids],
+                },
+            )
+            with QueryCounter() as counter:
+                results = await _burst(client, user_id)
+            assert counter.count == 1
+            assert all(len(r) == 3 for r in results)
+
+            # A quiz submission invalidates the cached payload.
+            await client.post(
+                "/api/user/quiz",
+                json={
+                    "user_id": user_id,
+                    "answers": [{"word_id": word_ids[0], "correct": True}],
+                },
+            )
+            with QueryCounter() as counter:
+                results = await _burst(client, user_id)
+            assert counter.count == 1
+            levels = {w["word_id"]: w["mastery_level"] for w in results[0]}
+            assert levels[word_ids[0]] == "mastered"
+
+    asyncio.run(scenario())
+
+
+def test_waits_for_lock_held_by_another_process():
+    user_id, _ = _make_user("locked")
+    key = f"user_words:{user_id}:0:500"
+
+    async def scenario():
+        r = await get_redis()
+        await r.set(f"{key}:lock", "other-process", ex=5)
+
+        async def other_process_fills():
+            await asyncio.sleep(0.2)
+            keys = _user_words_version_keys(
+                user_id, 1, USER_WORDS_BLOCK * USER_WORDS_PAGE_BLOCKS, tail=True
+            )
+            versions = await _current_versions(r, keys, mint=True)
+            page = {"words": [{"word_id": 1}], "next_after": None, "versions": versions}
+            await r.set(key, json.dumps(page))
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            with QueryCounter() as counter:
+                results, _ = await asyncio.gather(
+                    _burst(client, user_id, n=5), other_process_fills()
+                )
+            assert counter.count == 0
+            assert results == [[{"word_id": 1}]] * 5
+
+    asyncio.run(scenario())
+
+
+def test_page_loaded_across_a_change_is_not_served(monkeypatch):
+    user_id, word_ids = _make_user("overtaken")
+    load_page = main._user_words_page
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            async def answer_during_load(*args):
+                page = await load_page(*args)
+                response = await client.post(
+                    "/api/user/quiz",
+                    json={
+                        "user_id": user_id,
+                        "answers": [{"word_id": word_ids[0], "correct": True}],
+                    },
+                )
+                assert response.status_code == 200
+                return page
+
+            monkeypatch.setattr(main, "_user_words_page", answer_during_load)
+            [during] = await _burst(client, user_id, n=1)
+            monkeypatch.undo()
+            [after] = await _burst(client, user_id, n=1)
+        assert during == []
+        assert [w["word_id"] for w in after] == [word_ids[0]]
+
+    asyncio.run(scenario())
+
+
+def test_failed_load_releases_the_lock():
+    key = "user_words:failing:0:500"
+
+    async def failing():
+        raise RuntimeError("database unavailable")
+
+    async def loaded():
+        return {"words": []}
+
+    async def scenario():
+        r = await get_redis()
+        with pytest.raises(RuntimeError):
+            await cached_json(key, failing, ex=60)
+        assert await r.get(f"{key}:lock") is None
+        # The next caller loads straight away instead of polling until the
+        # lock expires.
+        return await asyncio.wait_for(cached_json(key, loaded, ex=60), timeout=1)
+
+    assert asyncio.run(scenario()) == {"words": []}
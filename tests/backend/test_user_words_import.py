@@ -0,0 +1,153 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import httpx
+from fastapi.testclient import TestClient
+from backend.main import (
+    app,
+    IMPORT_CHUNK_ROWS,
+    check_video_stats,
+    rebuild_video_stats,
+    SessionLocal,
+    User,
+    UserWord,
+    Video,
+    VideoWord,
+    Word,
+)
+
+client = TestClient(app)
+
+
+def _make_user(name):
+    with SessionLocal() as db:
+        user = User(username=name, password_hash="x")
+        words = [Word(text=f"{name}-{i}") for i in range(3)]
+        video = Video(title=name, thumbnail_url="t", score=0)
+        db.add_all([user, video] + words)
+        db.flush()
+        db.add_all(VideoWord(video_id=video.id, word_id=w.id) for w in words)
+        db.commit()
+        rebuild_video_stats(db, video_ids=[video.id])
+        return user.id, [w.id for w in words]
+
+
+def _ndjson(lines):
+    return "\n".join(l if isinstance(l, str) else json.dumps(l) for l in lines)
+
+
+def _import(user_id, lines):
+    response = client.post(
+        "/api/user/words/import",
+        params={"user_id": user_id},
+        content=_ndjson(lines),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_import_resolves_creates_and_reports_per_line():
+    user_id, (a, b, c) = _make_user("import")
+    results = _import(
+        user_id,
+        [
+            {"word_id": a, "mastery_level": "mastered"},
+            {"text": " Import-1 ", "mastery_level": 1},
+            {"text": "import-brand-new", "mastery_level": "learning"},
+            "not json",
+            {"word_id": 10**9, "mastery_level": "learning"},
+            {"word_id": c, "mastery_level": "fluent"},
+            {"word_id": a, "mastery_level": "learning"},
+        ],
+    )
+    *rows, summary = results
+    assert [r["status"] for r in rows] == [
+        "superseded", "created", "created", "error", "error", "error", "created",
+    ]
+    assert summary == {"summary": {"superseded": 1, "created": 3, "error": 3}}
+
+    with SessionLocal() as db:
+        new_id = db.query(Word.id).filter_by(text="import-brand-new").scalar()
+        levels = {
+            uw.word_id: uw.mastery_level.name
+            for uw in db.query(UserWord).filter_by(user_id=user_id)
+        }
+        assert levels == {a: "learning", b: "learning", new_id: "learning"}
+        assert check_video_stats(db, user_ids=[user_id]) == []
+
+    again = _import(user_id, [{"word_id": b, "mastery_level": "learning"}])
+    assert again[0]["status"] == "unchanged"
+
+
+def test_export_round_trips_through_import():
+    user_id, (a, b, c) = _make_user("export")
+    _import(
+        user_id,
+        [
+            {"word_id": a, "mastery_level": "mastered"},
+            {"word_id": b, "mastery_level": "unknown"},
+            {"word_id": c, "mastery_level": "learning"},
+        ],
+    )
+    response = client.get("/api/user/words/export", params={"user_id": user_id})
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert [(e["word_id"], e["mastery_level"]) for e in exported] == [
+        (a, "mastered"), (c, "learning"),
+    ]
+
+    other_id, _ = _make_user("export-copy")
+    results = _import(other_id, exported)
+    assert results[-1] == {"summary": {"created": 2}}
+
+    everything = client.get(
+        "/api/user/words/export", params={"user_id": user_id, "include_unknown": True}
+    )
+    assert len(everything.text.splitlines()) == 3
+
+
+def test_unknown_user_is_404():
+    response = client.post(
+        "/api/user/words/import", params={"user_id": 10**9}, content="{}"
+    )
+    assert response.status_code == 404
+
+
+def test_slow_upload_does_not_block_other_writes():
+    user_id, (a, _, _) = _make_user("slow-upload")
+    other_id, (other_word, _, _) = _make_user("slow-upload-other")
+    line = json.dumps({"word_id": a, "mastery_level": "learning"}) + "\n"
+    quiz = []
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+            async def upload():
+                # More than a chunk, then another user's write while the
+                # rest of the body is still on its way.
+                yield (line * (IMPORT_CHUNK_ROWS + 1)).encode()
+                quiz.append(await asyncio.wait_for(http.post(
+                    "/api/user/quiz",
+                    json={
+                        "user_id": other_id,
+                        "answers": [{"word_id": other_word, "correct": True}],
+                    },
+                ), timeout=2))
+                yield line.encode()
+
+            return await http.post(
+                "/api/user/words/import",
+                params={"user_id": user_id},
+                content=upload(),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.text.splitlines()[-1] == json.dumps(
+        {"summary": {"superseded": IMPORT_CHUNK_ROWS, "created": 1, "unchanged": 1}}
+    )
+    assert quiz[0].status_code == 200
@@ -0,0 +1,107 @@
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import backend.main
+from backend.main import app, get_sessionmaker, SessionLocal, User, Word
+
+client = TestClient(app)
+
+
+def _make_user(name, n_words):
+    with SessionLocal() as db:
+        user = User(username=name, password_hash="x")
+        words = [Word(text=f"{name}-{i}") for i in range(n_words)]
+        db.add_all([user] + words)
+        db.commit()
+        user_id, word_ids = user.id, [w.id for w in words]
+    client.post(
+        "/api/user/quiz",
+        json={
+            "user_id": user_id,
+            "answers": [{"word_id": w, "correct": True} for w in word_ids],
+        },
+    )
+    return user_id, word_ids
+
+
+def _walk(user_id, **params):
+    words, after, watermark = [], 0, None
+    while after is not None:
+        page = client.get(
+            "/api/user/words", params={"user_id": user_id, "after": after, **params}
+        ).json()
+        words.extend(page["words"])
+        watermark = watermark or page["watermark"]
+        after = page["next_after"]
+    return words, watermark
+
+
+class PageLoads:
+    def __enter__(self):
+        get_sessionmaker()
+        self.engine = app.state.async_engine.sync_engine
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self)
+        return self
+
+    def __call__(self, conn, cursor, statement, *args):
+        # The page query: known words for one user in word_id order.
+        if "ORDER BY user_words.word_id" in statement:
+            self.count += 1
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self)
+
+
+def test_keyset_pages_cover_the_vocabulary():
+    user_id, word_ids = _make_user("pages", 7)
+    client.patch(
+        f"/api/user/words/{word_ids[3]}", json={"user_id": user_id, "mastery_level": 0}
+    )
+    words, _ = _walk(user_id, limit=2)
+    assert [w["word_id"] for w in words] == word_ids[:3] + word_ids[4:]
+
+
+def test_mutation_reloads_only_the_page_it_touches(monkeypatch):
+    monkeypatch.setattr(backend.main, "USER_WORDS_BLOCK", 1)
+    user_id, word_ids = _make_user("touched", 6)
+    _walk(user_id, limit=2)
+    with PageLoads() as loads:
+        _walk(user_id, limit=2)
+    assert loads.count == 0
+
+    client.patch(
+        f"/api/user/words/{word_ids[5]}", json={"user_id": user_id, "mastery_level": 2}
+    )
+    with PageLoads() as loads:
+        words, _ = _walk(user_id, limit=2)
+    # The page holding the word plus the trailing empty page.
+    assert loads.count == 2
+    assert words[-1]["mastery_level"] == "mastered"
+
+
+def test_since_returns_only_changes(monkeypatch):
+    monkeypatch.setattr(backend.main, "SYNC_WATERMARK_LAG", timedelta(0))
+    user_id, word_ids = _make_user("delta", 4)
+    _, watermark = _walk(user_id)
+
+    client.patch(
+        f"/api/user/words/{word_ids[1]}", json={"user_id": user_id, "mastery_level": 0}
+    )
+    changed, _ = _walk(user_id, since=watermark)
+    assert [(w["word_id"], w["mastery_level"]) for w in changed] == [
+        (word_ids[1], "unknown")
+    ]
+
+
+@pytest.mark.parametrize("limit", [0, 100_000])
+def test_limit_is_bounded(limit):
+    response = client.get("/api/user/words", params={"user_id": 1, "limit": limit})
+    assert response.status_code == 422
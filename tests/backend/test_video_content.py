@@ -0,0 +1,120 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from backend.main import (
+    app,
+    SessionLocal,
+    TranscriptToken,
+    Video,
+    VideoTranscript,
+    Word,
+    _token_blob_path,
+    catalogue_version,
+    compile_token_blob,
+    evict_token_blobs,
+    token_blob_cache,
+)
+
+client = TestClient(app)
+
+
+def _make_video(tag):
+    with SessionLocal() as db:
+        video = Video(title=tag, thumbnail_url="t", score=0)
+        words = [Word(text=f"{tag}-{i}") for i in range(3)]
+        db.add_all([video] + words)
+        db.flush()
+        db.add_all(
+            VideoTranscript(video_id=video.id, text=f"line {i}", start_sec=i * 2, end_sec=i * 2 + 2)
+            for i in range(3)
+        )
+        db.add_all(
+            TranscriptToken(
+                video_id=video.id,
+                word_id=words[i % 3].id,
+                start_sec=i,
+                end_sec=i + 1,
+            )
+            for i in reversed(range(6))
+        )
+        db.commit()
+        return video.id, [w.id for w in words]
+
+
+def test_tokens_stream_window_and_columnar():
+    video_id, word_ids = _make_video("tokens")
+    rows = client.get(f"/api/videos/{video_id}/tokens").json()
+    assert [r["start_sec"] for r in rows] == list(range(6))
+    assert rows[1] == {
+        "word_id": word_ids[1],
+        "text": "tokens-1",
+        "start_sec": 1,
+        "end_sec": 2,
+    }
+
+    window = client.get(
+        f"/api/videos/{video_id}/tokens", params={"start_sec": 2, "end_sec": 4}
+    ).json()
+    assert window == rows[2:4]
+
+    columnar = client.get(
+        f"/api/videos/{video_id}/tokens", params={"format": "columnar"}
+    ).json()
+    assert columnar["word_id"] == [r["word_id"] for r in rows]
+    assert columnar["end_sec"] == [r["end_sec"] for r in rows]
+
+
+def test_etag_revalidation():
+    video_id, _ = _make_video("etag")
+    first = client.get(f"/api/videos/{video_id}/transcript")
+    assert first.status_code == 200
+    assert [r["text"] for r in first.json()] == ["line 0", "line 1", "line 2"]
+    etag = first.headers["etag"]
+
+    again = client.get(
+        f"/api/videos/{video_id}/transcript", headers={"If-None-Match": etag}
+    )
+    assert again.status_code == 304
+    assert again.content == b""
+
+    windowed = client.get(
+        f"/api/videos/{video_id}/transcript",
+        params={"start_sec": 2},
+        headers={"If-None-Match": etag},
+    )
+    assert windowed.status_code == 200
+    assert windowed.headers["etag"] != etag
+
+
+def test_missing_video_is_404():
+    assert client.get("/api/videos/999999/tokens").status_code == 404
+    assert client.get("/api/videos/999999/transcript").status_code == 404
+
+
+def test_tokens_served_from_precompiled_blob():
+    video_id, word_ids = _make_video("blob")
+    token_blob_cache.clear()
+    first = client.get(f"/api/videos/{video_id}/tokens")
+    streamed = client.get(f"/api/videos/{video_id}/tokens", params={"start_sec": 0})
+    assert first.content == streamed.content
+    with SessionLocal() as db:
+        assert _token_blob_path(video_id, catalogue_version(db)).exists()
+
+    hits = token_blob_cache.hits
+    assert client.get(f"/api/videos/{video_id}/tokens").content == first.content
+    assert token_blob_cache.hits == hits + 1
+
+    with SessionLocal() as db:
+        db.add(TranscriptToken(video_id=video_id, word_id=word_ids[0], start_sec=9, end_sec=10))
+        db.commit()
+        compile_token_blob(db, video_id)
+    asyncio.run(evict_token_blobs([video_id]))
+    refreshed = client.get(
+        f"/api/videos/{video_id}/tokens", headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert refreshed.status_code == 200
+    assert len(refreshed.json()) == 7
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from backend.main import (
+    app,
+    SessionLocal,
+    User,
+    Video,
+    VideoWord,
+    Word,
+    check_video_stats,
+    rebuild_video_stats,
+)
+
+client = TestClient(app)
+
+
+def _setup_catalogue():
+    with SessionLocal() as db:
+        words = [Word(text=f"stats-{i}") for i in range(4)]
+        videos = [
+            Video(title=f"stats video {i}", thumbnail_url="t", score=10 - i)
+            for i in range(3)
+        ]
+        user = User(username="stats-user", password_hash="x")
+        db.add_all(words + videos + [user])
+        db.flush()
+        w = [word.id for word in words]
+        layout = {videos[0].id: w[:1], videos[1].id: w[:3], videos[2].id: w[1:4]}
+        db.add_all(
+            VideoWord(video_id=vid, word_id=wid)
+            for vid, wids in layout.items()
+            for wid in wids
+        )
+        db.commit()
+        rebuild_video_stats(db)
+        return user.id, w, [v.id for v in videos]
+
+
+def _recommended(user_id, video_ids):
+    response = client.get(
+        "/api/videos/recommendations", params={"user_id": user_id, "limit": 100}
+    )
+    return [
+        (v["id"], v["new_word_count"])
+        for v in response.json()
+        if v["id"] in video_ids
+    ]
+
+
+def test_video_stats_follow_mutations():
+    user_id, w, vids = _setup_catalogue()
+    assert _recommended(user_id, vids) == [(vids[0], 1)]
+
+    client.post(
+        "/api/user/quiz",
+        json={
+            "user_id": user_id,
+            "answers": [
+                {"word_id": w[0], "correct": True},
+                {"word_id": w[1], "correct": True},
+                {"word_id": w[1], "correct": False},
+                {"word_id": w[2], "correct": True},
+            ],
+        },
+    )
+    with SessionLocal() as db:
+        assert check_video_stats(db, [user_id]) == []
+    assert _recommended(user_id, vids) == [(vids[0], 0), (vids[1], 1)]
+
+    for word_id, level in ((w[2], 0), (w[3], 2)):
+        response = client.patch(
+            f"/api/user/words/{word_id}",
+            json={"user_id": user_id, "mastery_level": level},
+        )
+        assert response.status_code == 200
+    with SessionLocal() as db:
+        assert check_video_stats(db, [user_id]) == []
+        rebuild_video_stats(db)
+        assert check_video_stats(db) == []
+    assert _recommended(user_id, vids) == [(vids[0], 0)]
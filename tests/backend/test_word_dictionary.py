@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from backend.main import Word
+from backend.words import WordDictionary
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/words.db")
+    Word.__table__.create(engine)
+    return engine
+
+
+def _add(engine, rows):
+    with engine.begin() as conn:
+        conn.execute(insert(Word.__table__), rows)
+
+
+def test_loads_lazily_and_refreshes_on_new_ids(tmp_path):
+    engine = _engine(tmp_path)
+    _add(engine, [{"text": f"w{i}"} for i in range(3000)])
+    words = WordDictionary(Word.__table__)
+    assert words.lookup([1]) == [None]
+
+    with Session(engine) as db:
+        assert words.texts(db, [1, 3000, 3001]) == ["w0", "w2999", None]
+        assert words.version == 3000
+        assert words.ids(db, ["w0", "w2999", "nope"]) == {"w0": 1, "w2999": 3000}
+
+        _add(engine, [{"text": f"new{i}"} for i in range(2000)])
+        assert words.ids(db, ["new1999"]) == {"new1999": 5000}
+        assert words.text(db, 3001) == "new0"
+    assert len(words) == 5000
+    assert words.find([f"w{i}" for i in range(3000)]) == {
+        f"w{i}": i + 1 for i in range(3000)
+    }
+
+
+def test_ids_committed_out_of_order_are_found(tmp_path):
+    engine = _engine(tmp_path)
+    _add(engine, [{"id": 1, "text": "one"}, {"id": 3, "text": "three"}])
+    words = WordDictionary(Word.__table__)
+    with Session(engine) as db:
+        assert words.texts(db, [1, 2, 3]) == ["one", None, "three"]
+        # id 2 was allocated before 3 but committed after it was loaded.
+        _add(engine, [{"id": 2, "text": "two"}])
+        assert words.text(db, 2) == "two"
+        _add(engine, [{"id": 2000, "text": "later"}])
+        words.texts(db, [2000])
+    assert words.find(["two", "later"]) == {"two": 2, "later": 2000}
+    assert len(words) == 4
+
+
+def test_uncommitted_words_are_not_cached(tmp_path):
+    engine = _engine(tmp_path)
+    words = WordDictionary(Word.__table__)
+    with Session(engine) as db:
+        db.add(Word(text="draft"))
+        db.flush()
+        assert words.ids(db, ["draft"]) == {}
+        db.rollback()
+    _add(engine, [{"text": "kept"}])
+    with Session(engine) as db:
+        assert words.ids(db, ["draft", "kept"]) == {"kept": 1}
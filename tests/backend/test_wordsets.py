@@ -0,0 +1,38 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend import wordsets
+
+
+def test_round_trip():
+    rng = random.Random(0)
+    cases = [
+        [],
+        [1],
+        [1, 2],
+        [65535, 65536, 131072],
+        # Deltas just above 16 bits, including one whose low half is 0.
+        [1, 1 + 0x10000, 2 + 0x20000, 2**31 - 1],
+        rng.sample(range(1, 200_000), 300),
+    ]
+    for word_ids in cases:
+        decoded = wordsets.decode(wordsets.encode(word_ids))
+        assert list(decoded) == sorted(word_ids)
+
+
+def test_rejects_ids_below_one():
+    for word_ids in ([0], [0, 5], [-3, 1]):
+        with pytest.raises(ValueError, match="word ids must be positive"):
+            wordsets.encode(word_ids)
+
+
+def test_two_bytes_a_word_without_escapes():
+    word_ids = range(5, 50_000, 7)
+    blob = wordsets.encode(reversed(word_ids))
+    assert len(blob) == 2 * len(word_ids)
+    assert wordsets.encode([3, 3, 1]) == wordsets.encode([1, 3])
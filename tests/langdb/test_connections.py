@@ -0,0 +1,86 @@
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from langdb.connections import ConnectionManager, connect
+from langdb.ingest import create_table
+
+
+def test_connect_applies_pragmas(tmp_path):
+    conn = connect(tmp_path / "content.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert conn.execute("PRAGMA synchronous").fetchone() == (1,)
+    assert conn.execute("PRAGMA mmap_size").fetchone()[0] > 0
+    conn.close()
+    # WAL is recorded in the file, so plain connections use it too.
+    plain = sqlite3.connect(tmp_path / "content.db")
+    assert plain.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    plain.close()
+
+
+def test_manager_reuses_one_connection_per_thread(tmp_path):
+    manager = ConnectionManager()
+    path = tmp_path / "content.db"
+    first = manager.get(path)
+    assert manager.get(str(path)) is first
+    assert manager.get(tmp_path / "users.db") is not first
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(manager.get(path)))
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+
+    manager.close_all()
+    assert manager.get(path) is not first
+    manager.close_all()
+
+
+def test_released_connections_are_pooled_and_bounded(tmp_path):
+    manager = ConnectionManager(max_idle=2)
+    path = tmp_path / "content.db"
+    first = manager.get(path)
+    manager.release()
+    assert manager.get(path) is first
+    manager.release()
+
+    # Threads that each check out a connection and release it, as a
+    # thread-per-request server does.
+    barrier = threading.Barrier(5)
+
+    def request():
+        manager.get(path)
+        barrier.wait()
+        manager.release()
+
+    threads = [threading.Thread(target=request) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert manager.open_connections == 2
+    manager.close_all()
+    assert manager.open_connections == 0
+
+
+def test_reads_continue_during_an_exclusive_write(tmp_path):
+    path = tmp_path / "content.db"
+    manager = ConnectionManager()
+    create_table(manager.get(path))
+    manager.get(path).execute("INSERT INTO content (title) VALUES ('old')")
+    manager.get(path).commit()
+
+    writer = connect(path)
+    writer.execute("BEGIN EXCLUSIVE")
+    writer.execute("INSERT INTO content (title) VALUES ('new')")
+    # Under the rollback journal this read would wait for the writer.
+    reader = connect(path, busy_timeout=0)
+    assert reader.execute("SELECT title FROM content").fetchall() == [("old",)]
+    writer.commit()
+    assert reader.execute("SELECT count(*) FROM content").fetchone() == (2,)
+    for conn in (reader, writer):
+        conn.close()
+    manager.close_all()
@@ -0,0 +1,57 @@
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from langdb.coverage import CoverageIndex
+from langdb.ingest import create_table
+from langdb.recommend_known import best_match, coverage_score, top_matches
+
+
+def _content_db(n_docs=200, seed=7):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(300)]
+    conn = sqlite3.connect(":memory:")
+    create_table(conn)
+    for i in range(n_docs):
+        length = rng.choice([0, 1, 5, 40, 120])
+        words = rng.choices(vocab, weights=[1 / (r + 1) for r in range(300)], k=length)
+        text = ". ".join(" ".join(words[j : j + 7]).capitalize() for j in range(0, length, 7))
+        conn.execute(
+            "INSERT INTO content (title, transcript, grade_level) VALUES (?, ?, ?)",
+            (f"doc{i}", text, 0.0),
+        )
+    # Duplicates of an existing transcript exercise tie-breaking.
+    conn.execute(
+        "INSERT INTO content (title, transcript, grade_level) "
+        "SELECT 'dup', transcript, 0.0 FROM content WHERE id = 3"
+    )
+    return conn, vocab
+
+
+def test_scores_match_coverage_score():
+    conn, vocab = _content_db()
+    index = CoverageIndex.build(conn)
+    transcripts = [t for (t,) in conn.execute("SELECT transcript FROM content ORDER BY id")]
+    rng = random.Random(1)
+    # Small sets take the postings path, large ones the forward scan.
+    for size in (0, 3, 30, 250, 300):
+        known = set(rng.sample(vocab, size)) | {"not-in-corpus"}
+        expected = [coverage_score(t, known) for t in transcripts]
+        assert index.scores(known).tolist() == expected
+
+
+def test_top_k_agrees_with_best_match(tmp_path):
+    conn, vocab = _content_db()
+    index = CoverageIndex.build(conn)
+    index.save(tmp_path / "index.npz")
+    loaded = CoverageIndex.load(tmp_path / "index.npz")
+    known = set(vocab[:20])
+    assert best_match(conn, known, index=loaded) == best_match(conn, known)
+
+    top = top_matches(conn, known, 10, loaded)
+    scores = [score for _, _, score in top]
+    assert scores == sorted(scores, reverse=True)
+    assert top[0] == best_match(conn, known)
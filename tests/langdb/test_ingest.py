@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from langdb.ingest import create_table, flesch_kincaid_grade, ingest_transcripts
+
+
+def _rows(conn):
+    return conn.execute(
+        "SELECT id, title, transcript, grade_level FROM content ORDER BY id"
+    ).fetchall()
+
+
+def test_reingest_skips_unchanged_and_updates_in_place(tmp_path):
+    for i in range(5):
+        (tmp_path / f"clip{i}.txt").write_text(f"Clip number {i}. It is short.")
+    conn = sqlite3.connect(":memory:")
+    create_table(conn)
+
+    report = ingest_transcripts(conn, tmp_path, workers=2, batch_size=2)
+    assert (report.inserted, report.updated, report.skipped) == (5, 0, 0)
+    first = _rows(conn)
+    assert [r[1] for r in first] == [f"clip{i}" for i in range(5)]
+
+    report = ingest_transcripts(conn, tmp_path)
+    assert (report.inserted, report.updated, report.skipped) == (0, 0, 5)
+    assert _rows(conn) == first
+
+    changed = tmp_path / "clip2.txt"
+    changed.write_text("A completely different transcript about elaborate vocabulary.")
+    os.utime(changed, (1, 1))
+    (tmp_path / "clip5.txt").write_text("Brand new.")
+    report = ingest_transcripts(conn, tmp_path, batch_size=1)
+    assert (report.inserted, report.updated, report.skipped) == (1, 1, 4)
+    rows = _rows(conn)
+    assert len(rows) == 6
+    assert rows[2][0] == first[2][0]
+    assert rows[2][3] == flesch_kincaid_grade(changed.read_text())
+
+
+def test_adopts_rows_ingested_before_tracking(tmp_path):
+    (tmp_path / "legacy.txt").write_text("Old content.")
+    conn = sqlite3.connect(":memory:")
+    create_table(conn)
+    conn.execute(
+        "INSERT INTO content (title, transcript, grade_level) VALUES ('legacy', 'Old content.', 0)"
+    )
+    report = ingest_transcripts(conn, tmp_path)
+    assert (report.inserted, report.updated) == (0, 1)
+    assert conn.execute("SELECT count(*) FROM content").fetchone() == (1,)
+
+
+def test_text_is_read_like_read_text(tmp_path):
+    path = tmp_path / "windows.txt"
+    path.write_bytes(b"First line.\r\nSecond line.\rThird line.\n")
+    conn = sqlite3.connect(":memory:")
+    create_table(conn)
+    ingest_transcripts(conn, tmp_path)
+    [(_, _, transcript, grade)] = _rows(conn)
+    assert transcript == path.read_text() == "First line.\nSecond line.\nThird line.\n"
+    assert grade == flesch_kincaid_grade(path.read_text())
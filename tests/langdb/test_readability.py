@@ -0,0 +1,63 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from langdb import readability
+from langdb.readability import flesch_kincaid_grade, flesch_kincaid_grades
+
+# Letters and vowels in both cases, characters whose case mapping changes
+# length or depends on context, Unicode whitespace and word characters that
+# are not letters, alongside the sentence terminators.
+ALPHABET = (
+    "aeiouyAEIOUYbcdfghEeeYy"
+    "éÉßẞİıΣσςΐﬁŉǅ́"
+    " \t\n\x0b\x0c\x1c\x85\xa0 　"
+    "0123456789_٣"
+    ".!?..!!??,;:'\"-()…¡¿🙂"
+)
+WORDS = ["the", "idea", "cafe", "rhythm", "queue", "eye", "be", "Ye", "área", "naïve"]
+
+
+def _random_text(rng):
+    parts = []
+    for _ in range(rng.randint(1, 40)):
+        if rng.random() < 0.5:
+            parts.append(rng.choice(WORDS))
+        else:
+            parts.append("".join(rng.choices(ALPHABET, k=rng.randint(1, 12))))
+    return rng.choice(["", " ", "\n"]).join(parts)
+
+
+def _bits(values):
+    return [value.hex() for value in values]
+
+
+def test_batch_grades_are_bit_identical():
+    rng = random.Random(0)
+    texts = []
+    while len(texts) < 3000:
+        text = _random_text(rng)
+        try:
+            flesch_kincaid_grade(text)
+        except ZeroDivisionError:
+            with pytest.raises(ZeroDivisionError):
+                flesch_kincaid_grades([text])
+            continue
+        texts.append(text)
+    expected = [flesch_kincaid_grade(t) for t in texts]
+    assert _bits(flesch_kincaid_grades(texts)) == _bits(expected)
+    for start in range(0, len(texts), 97):
+        batch = texts[start:start + 97]
+        assert _bits(flesch_kincaid_grades(batch)) == _bits(expected[start:start + 97])
+
+
+def test_memo_is_rebuilt_past_its_limit(monkeypatch):
+    monkeypatch.setattr(readability, "MEMO_LIMIT", 5)
+    monkeypatch.setattr(readability, "_syllables", {})
+    texts = [f"Word{i} another{i} cafe. Idea!" for i in range(20)]
+    assert flesch_kincaid_grades(texts) == [flesch_kincaid_grade(t) for t in texts]
+    assert len(readability._syllables) <= 5 + 4
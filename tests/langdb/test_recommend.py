@@ -0,0 +1,55 @@
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from langdb.ingest import create_table
+from langdb.recommend import get_recommendation, get_recommendations
+
+LEGACY_SQL = (
+    "SELECT title, transcript, grade_level, ABS(grade_level - ?) as diff "
+    "FROM content ORDER BY diff ASC, id ASC"
+)
+
+
+def _content_db():
+    rng = random.Random(3)
+    conn = sqlite3.connect(":memory:")
+    create_table(conn)
+    conn.executemany(
+        "INSERT INTO content (title, transcript, grade_level) VALUES (?, ?, ?)",
+        [
+            (f"doc{i}", "text", rng.choice([rng.uniform(-3, 14), float(rng.randint(0, 12))]))
+            for i in range(500)
+        ],
+    )
+    return conn
+
+
+def test_nearest_matches_full_scan():
+    conn = _content_db()
+    for level in [-5, -1, 0, 0.5, 2, 3.25, 7, 11, 20]:
+        legacy = conn.execute(LEGACY_SQL, (level + 1,)).fetchall()
+        assert get_recommendation(level, conn) == legacy[0]
+        assert get_recommendations(level, conn, k=25) == legacy[:25]
+
+
+def test_window_limits_candidates():
+    conn = _content_db()
+    recs = get_recommendations(4, conn, k=1000, window=0.5)
+    assert recs
+    assert all(abs(grade - 5) <= 0.5 for _, _, grade, _ in recs)
+    legacy = conn.execute(LEGACY_SQL, (5,)).fetchall()
+    assert recs == [r for r in legacy if r[3] <= 0.5]
+
+
+def test_plan_uses_grade_index():
+    conn = _content_db()
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM content WHERE grade_level <= ? "
+        "ORDER BY grade_level DESC, id ASC LIMIT 1",
+        (3,),
+    ).fetchall()
+    assert any("idx_content_grade_level" in row[-1] for row in plan)
@@ -0,0 +1,32 @@
+import sys
+import threading
+import urllib.request
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from werkzeug.serving import make_server
+
+from webapp import app as webapp
+
+
+def test_threaded_server_reuses_connections(tmp_path, monkeypatch):
+    monkeypatch.setattr(webapp, "CONTENT_DB", tmp_path / "content.db")
+    monkeypatch.setattr(webapp, "USER_DB", tmp_path / "user_words.db")
+    monkeypatch.setattr(webapp, "connections", webapp.ConnectionManager(max_idle=2))
+    monkeypatch.setattr(webapp, "_initialised", False)
+
+    # A new thread for every request, as the development server runs it.
+    server = make_server("127.0.0.1", 0, webapp.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        for _ in range(50):
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/") as response:
+                assert response.status == 200
+    finally:
+        server.shutdown()
+        thread.join()
+    # At most max_idle pooled connections per database remain open.
+    assert webapp.connections.open_connections <= 4
+    webapp.connections.close_all()
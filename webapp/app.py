@@ -1,9 +1,10 @@
 """Flask application exposing the language learning utilities via a web UI."""
 
 from pathlib import Path
-import sqlite3
 from flask import Flask, render_template, request, redirect, url_for
 
+from langdb.connections import ConnectionManager
+from langdb.coverage import build_index, load_index
 from langdb.ingest import create_table as create_content_table, ingest_transcripts
 from langdb.recommend import get_recommendation
 from langdb.recommend_known import best_match, load_known_words
@@ -13,6 +14,9 @@ CONTENT_DB = Path("data/content.db")
 USER_DB = Path("data/user_words.db")
 
 app = Flask(__name__)
+# Requests take pooled WAL-mode connections and hand them back on teardown.
+connections = ConnectionManager()
+_initialised = False
 
 
 def init_dbs() -> None:
@@ -20,24 +24,30 @@ def init_dbs() -> None:
 
     CONTENT_DB.parent.mkdir(exist_ok=True)
     USER_DB.parent.mkdir(exist_ok=True)
-    with sqlite3.connect(CONTENT_DB) as conn_content, sqlite3.connect(
-        USER_DB
-    ) as conn_user:
-        create_content_table(conn_content)
-        create_user_table(conn_user)
+    create_content_table(connections.get(CONTENT_DB))
+    create_user_table(connections.get(USER_DB))
 
 
-@app.before_first_request
+@app.before_request
 def setup() -> None:
-    init_dbs()
+    global _initialised
+    if not _initialised:
+        init_dbs()
+        _initialised = True
+
+
+@app.teardown_appcontext
+def release_connections(exc: BaseException | None) -> None:
+    connections.release()
 
 
 def list_known_words() -> list[str]:
     """Return all stored known words."""
 
-    with sqlite3.connect(USER_DB) as conn:
-        rows = conn.execute("SELECT word FROM known_words ORDER BY word").fetchall()
-        return [r[0] for r in rows]
+    rows = connections.get(USER_DB).execute(
+        "SELECT word FROM known_words ORDER BY word"
+    ).fetchall()
+    return [r[0] for r in rows]
 
 
 @app.route("/")
@@ -51,23 +61,27 @@ def index():
 def recommend_route():
     """Recommend content based on the level submitted by the user."""
     level = float(request.form.get("level", 0))
-    with sqlite3.connect(CONTENT_DB) as conn:
-        rec = get_recommendation(level, conn)
+    rec = get_recommendation(level, connections.get(CONTENT_DB))
     words = list_known_words()
+    if rec:
+        title, transcript, grade_level, _ = rec
+        rec = {
+            "title": title,
+            "transcript": transcript,
+            "grade_level": grade_level,
+            "score": None,
+        }
     return render_template("index.html", recommendation=rec, known_words=words)
 
 
 @app.route("/recommend_known", methods=["POST"])
 def recommend_known_route():
     """Recommend content using the user's known vocabulary."""
-    with sqlite3.connect(CONTENT_DB) as conn_content, sqlite3.connect(
-        USER_DB
-    ) as conn_user:
-        known = load_known_words(conn_user)
-        if not known:
-            rec = None
-        else:
-            rec = best_match(conn_content, known)
+    known = load_known_words(connections.get(USER_DB))
+    if not known:
+        rec = None
+    else:
+        rec = best_match(connections.get(CONTENT_DB), known, index=load_index())
     words = list_known_words()
     if rec:
         title, transcript, score = rec
@@ -86,8 +100,7 @@ def add_words_route():
     text = request.form.get("words", "")
     words = [w.strip() for w in text.split() if w.strip()]
     if words:
-        with sqlite3.connect(USER_DB) as conn:
-            add_words(conn, words)
+        add_words(connections.get(USER_DB), words)
     words = list_known_words()
     return render_template("index.html", recommendation=None, known_words=words)
 
@@ -95,8 +108,9 @@ def add_words_route():
 @app.route("/ingest", methods=["POST"])
 def ingest_route():
     """Ingest all transcript files into the content database."""
-    with sqlite3.connect(CONTENT_DB) as conn:
-        ingest_transcripts(conn)
+    conn = connections.get(CONTENT_DB)
+    ingest_transcripts(conn)
+    build_index(conn)
     words = list_known_words()
     return render_template("index.html", recommendation=None, known_words=words)
 